@@ -1,4 +1,11 @@
 from __future__ import annotations
 
-from app.presentation.app_factory import app, create_app  # re-export for uvicorn
 
+def __getattr__(name: str):
+    # Lazy re-export for uvicorn (``app:app``): process-pool workers import
+    # app.infrastructure.media.clip_worker and must not build the whole app
+    if name in {"app", "create_app"}:
+        from app.presentation import app_factory
+
+        return getattr(app_factory, name)
+    raise AttributeError(f"module 'app' has no attribute {name!r}")
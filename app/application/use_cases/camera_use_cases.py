@@ -4,15 +4,17 @@ from dataclasses import dataclass
 from typing import Optional
 
 from app.infrastructure.devices.enumerate import list_video_devices, list_video_devices_detailed
+from app.infrastructure.devices.registry import get_device_registry
 from app.infrastructure.obs.camera_config import get_camera_config, set_camera_config
 
 
 @dataclass(slots=True)
 class ListCameraDevices:
-    async def __call__(self) -> dict:
+    async def __call__(self, *, refresh: bool = False) -> dict:
         return {
-            "devices": list_video_devices(),
+            "devices": list_video_devices(refresh=refresh),
             "detail": list_video_devices_detailed(),
+            "registry": get_device_registry().stats(),
         }
 
 
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+
+from app.domain.ports.obs_service import IObsService
+from app.infrastructure.media.clip_pipeline import get_clip_pipeline
+
+
+async def _hand_off(path: str | None, kind: str, wait: bool) -> dict:
+    if not path:
+        return {"path": None, "clip": None}
+    fut = get_clip_pipeline().submit(path, kind=kind)
+    # Without wait the pipeline finishes on its own; see GET /api/clips/stats
+    return {"path": path, "clip": await asyncio.wrap_future(fut) if wait else "queued"}
+
+
+@dataclass(slots=True)
+class GetOutputsStatus:
+    svc: IObsService
+
+    async def __call__(self) -> dict:
+        record, replay = await asyncio.gather(
+            self.svc.get_record_status(), self.svc.get_replay_buffer_status(), return_exceptions=True
+        )
+        return {
+            "record": {"error": str(record)} if isinstance(record, BaseException) else record,
+            "replay_buffer": {"error": str(replay)} if isinstance(replay, BaseException) else replay,
+        }
+
+
+@dataclass(slots=True)
+class StartRecord:
+    svc: IObsService
+
+    async def __call__(self) -> None:
+        await self.svc.start_recording()
+
+
+@dataclass(slots=True)
+class StopRecord:
+    svc: IObsService
+
+    async def __call__(self, *, wait: bool = False) -> dict:
+        return await _hand_off(await self.svc.stop_recording(), "record", wait)
+
+
+@dataclass(slots=True)
+class ToggleRecord:
+    svc: IObsService
+
+    async def __call__(self, *, wait: bool = False) -> dict:
+        # Only a stop yields a file for the pipeline
+        return await _hand_off(await self.svc.toggle_recording(), "record", wait)
+
+
+@dataclass(slots=True)
+class StartReplayBuffer:
+    svc: IObsService
+
+    async def __call__(self) -> None:
+        await self.svc.start_replay_buffer()
+
+
+@dataclass(slots=True)
+class StopReplayBuffer:
+    svc: IObsService
+
+    async def __call__(self) -> None:
+        await self.svc.stop_replay_buffer()
+
+
+@dataclass(slots=True)
+class SaveReplay:
+    svc: IObsService
+
+    async def __call__(self, *, wait: bool = False) -> dict:
+        return await _hand_off(await self.svc.save_replay_buffer(), "replay", wait)
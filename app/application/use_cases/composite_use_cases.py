@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+from app.infrastructure.media.compositor import get_compositor
+
+
+@dataclass(slots=True)
+class ListComposites:
+    async def __call__(self, *, views: list[str] | None = None) -> dict:
+        compositor = get_compositor()
+        return {"pairs": await compositor.pairs(views), "cache": compositor.stats()}
+
+
+@dataclass(slots=True)
+class RenderComposite:
+    async def __call__(self, **options: Any) -> dict:
+        # ValueError for bad options, KeyError without a complete pair, CompositeUnavailable without Pillow/numpy
+        return await get_compositor().render(**options)
+
+
+@dataclass(slots=True)
+class ExportComposite:
+    async def __call__(self, **options: Any) -> dict:
+        return await get_compositor().export(**options)
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from app.infrastructure.obs.layout import apply_layout
+from app.infrastructure.obs.layout_profiles import layout_profiles
+
+
+@dataclass(slots=True)
+class ListLayouts:
+    async def __call__(self) -> dict:
+        return {"layouts": layout_profiles.names(), "dir": str(layout_profiles.directory)}
+
+
+@dataclass(slots=True)
+class ApplyLayout:
+    async def __call__(self, name: str, *, dry_run: bool = False) -> dict:
+        layout = layout_profiles.get(name)  # ValueError on a malformed profile
+        if layout is None:
+            raise KeyError(name)
+        return await apply_layout(layout, name=name, dry_run=dry_run)
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from app.infrastructure.obs.macros import get_macro_engine
+
+
+@dataclass(slots=True)
+class ListMacros:
+    async def __call__(self) -> dict:
+        engine = get_macro_engine()
+        return {"macros": {name: engine.raw(name).get("description", "") for name in engine.names()}}
+
+
+@dataclass(slots=True)
+class RunMacro:
+    async def __call__(self, name: str, *, trigger: str = "api") -> dict:
+        # KeyError for an unknown macro, ValueError for a malformed one
+        return await get_macro_engine().run(name, trigger=trigger)
@@ -56,12 +56,79 @@ class Settings(BaseSettings):
 
     # Auto bootstrap OBS layout on startup
     auto_bootstrap: bool = True
+    # Also create missing STANDARD_SOURCES (camera kind by platform, empty image sources)
+    bootstrap_create_sources: bool = False
 
     # ELK / Kibana
     elk_auto_import: bool = True
     kibana_url: str = "http://localhost:5601"
     kibana_import_timeout_sec: int = 300
 
+    # Metrics sampler (comma-separated collectors: system,process,threads,gc,loop,tasks)
+    metrics_collectors: str = "system,process,threads,gc,loop,tasks"
+    metrics_sample_interval: float = 2.0
+    metrics_sample_interval_max: float = 10.0
+    # Fraction of the interval one sample may cost before the interval backs off
+    metrics_overhead_budget: float = 0.01
+
+    # Event-loop lag monitor / blocking-call detector
+    loop_monitor_enabled: bool = True
+    loop_monitor_interval_ms: int = 50
+    loop_monitor_block_threshold_ms: int = 100
+
+    # Sampling profiler (/api/diagnostics/profile) upper bounds
+    profiler_max_seconds: int = 60
+    profiler_max_hz: int = 1000
+
+    # Background process table for /api/diagnostics/processes (starts on first request, stops when unread)
+    process_sampler_interval_sec: float = 2.0
+    process_sampler_idle_stop_sec: float = 120.0
+
+    # Hot reload of config/*.json (backend: auto|inotify|poll)
+    config_watch_enabled: bool = True
+    config_watch_backend: str = "auto"
+    config_watch_debounce_ms: int = 300
+    config_watch_poll_sec: float = 1.0
+
+    # Hotkey input backend: auto|keyboard|evdev|simulated|none
+    hotkeys_backend: str = "auto"
+    # Press script replayed by the simulated backend ("<seconds> <combo>" per line or JSON)
+    hotkeys_simulated_script: str | None = None
+
+    # Camera device registry (backend: auto|dshow|ffmpeg|v4l2|none); cached until TTL or hot-plug event
+    devices_backend: str = "auto"
+    devices_cache_ttl_sec: float = 30.0
+    devices_hotplug_watch: bool = True
+
+    # Scene warm-up: keep the likely-next scenes (learned from hotkey switches) in the studio-mode preview
+    scene_warmup_enabled: bool = False  # env: SCENE_WARMUP_ENABLED
+    scene_warmup_top_k: int = 2  # more than 1 nests the predicted scenes in a holder scene
+    scene_warmup_holder_scene: str = "__warmup"
+    scene_warmup_studio_mode: bool = True  # turn studio mode on if it is off
+
+    # Macros (config/macros.json): waits up to this long ride inside an OBS request batch as Sleep
+    macro_batch_sleep_max_ms: int = 500
+
+    # Replay/recording clips: moved into clip_dir/YYYY/MM/DD and post-processed in a process pool
+    clip_dir: str = str(Path.home() / "Videos" / "OBS-Clips")
+    clip_workers: int = 2
+    clip_remux_format: str = "mp4"  # "" keeps the container OBS wrote (needs ffmpeg otherwise)
+    clip_thumbnails: bool = True  # needs ffmpeg
+    clip_keep_original: bool = False  # keep the OBS file next to the remuxed one
+    ffmpeg_path: str = "ffmpeg"  # name on PATH or full path; clips are only indexed without it
+
+    # Before/after composites (needs `pip install pillow numpy`): rendered in a process pool, cached by input files
+    composite_workers: int = 2
+    composite_cache_dir: str = ""  # "" = <screenshot_dir>/.composites
+    composite_cache_max: int = 64  # rendered files kept; least recently used are evicted
+    composite_scan_days: int = 7  # date-tree fallback window when OBS image inputs have no file
+
+    # API response encoding: orjson for JSON bodies (opt-in, needs `pip install orjson`) and gzip above a size threshold
+    api_orjson: bool = False  # env: API_ORJSON
+    api_gzip_enabled: bool = True  # env: API_GZIP_ENABLED
+    api_gzip_min_size: int = 1024  # env: API_GZIP_MIN_SIZE (bytes)
+    api_gzip_level: int = 6  # env: API_GZIP_LEVEL (1-9)
+
     # Optional diagnostics/token protection
     diag_token: str | None = None
 
@@ -72,6 +139,10 @@ class Settings(BaseSettings):
     overlay_brand: str = "MIRRORLESS"  # env: OVERLAY_BRAND
     overlay_clock_enabled: bool = True  # env: OVERLAY_CLOCK_ENABLED
     overlay_brand_color: str = "#ffffff"  # env: OVERLAY_BRAND_COLOR
+    # Rendered overlay pages kept in memory (one per distinct query/settings combination)
+    overlay_cache_size: int = 64  # env: OVERLAY_CACHE_SIZE
+    # /assets files up to this size are kept in memory with gzip/brotli variants; larger ones stream from disk
+    assets_memory_max_kb: int = 256  # env: ASSETS_MEMORY_MAX_KB
 
     # Screenshot root directory (unified location)
     screenshot_dir: str = str(Path.home() / "Pictures" / "OBS-Screenshots")
@@ -24,6 +24,18 @@ from app.application.use_cases.camera_use_cases import (
     GetCameraConfig,
     ApplyCameraConfig,
 )
+from app.application.use_cases.layout_use_cases import ListLayouts, ApplyLayout
+from app.application.use_cases.macro_use_cases import ListMacros, RunMacro
+from app.application.use_cases.clip_use_cases import (
+    GetOutputsStatus,
+    StartRecord,
+    StopRecord,
+    ToggleRecord,
+    StartReplayBuffer,
+    StopReplayBuffer,
+    SaveReplay,
+)
+from app.application.use_cases.composite_use_cases import ListComposites, RenderComposite, ExportComposite
 
 
 @lru_cache(maxsize=1)
@@ -75,6 +87,41 @@ def toggle_stream() -> ToggleStream:
     return ToggleStream(svc=obs_service())
 
 
+@lru_cache(maxsize=None)
+def get_outputs_status() -> GetOutputsStatus:
+    return GetOutputsStatus(svc=obs_service())
+
+
+@lru_cache(maxsize=None)
+def start_record() -> StartRecord:
+    return StartRecord(svc=obs_service())
+
+
+@lru_cache(maxsize=None)
+def stop_record() -> StopRecord:
+    return StopRecord(svc=obs_service())
+
+
+@lru_cache(maxsize=None)
+def toggle_record() -> ToggleRecord:
+    return ToggleRecord(svc=obs_service())
+
+
+@lru_cache(maxsize=None)
+def start_replay_buffer() -> StartReplayBuffer:
+    return StartReplayBuffer(svc=obs_service())
+
+
+@lru_cache(maxsize=None)
+def stop_replay_buffer() -> StopReplayBuffer:
+    return StopReplayBuffer(svc=obs_service())
+
+
+@lru_cache(maxsize=None)
+def save_replay() -> SaveReplay:
+    return SaveReplay(svc=obs_service())
+
+
 @lru_cache(maxsize=None)
 def list_camera_devices() -> ListCameraDevices:
     return ListCameraDevices()
@@ -90,6 +137,41 @@ def apply_camera_config() -> ApplyCameraConfig:
     return ApplyCameraConfig()
 
 
+@lru_cache(maxsize=None)
+def list_layouts() -> ListLayouts:
+    return ListLayouts()
+
+
+@lru_cache(maxsize=None)
+def apply_layout() -> ApplyLayout:
+    return ApplyLayout()
+
+
+@lru_cache(maxsize=None)
+def list_macros() -> ListMacros:
+    return ListMacros()
+
+
+@lru_cache(maxsize=None)
+def run_macro() -> RunMacro:
+    return RunMacro()
+
+
+@lru_cache(maxsize=None)
+def list_composites() -> ListComposites:
+    return ListComposites()
+
+
+@lru_cache(maxsize=None)
+def render_composite() -> RenderComposite:
+    return RenderComposite()
+
+
+@lru_cache(maxsize=None)
+def export_composite() -> ExportComposite:
+    return ExportComposite()
+
+
 # Toast use-cases
 @lru_cache(maxsize=None)
 def toast_success() -> ToastSuccess:
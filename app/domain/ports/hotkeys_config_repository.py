@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Protocol, Dict, Any
+from typing import Protocol, Dict, Any, Callable, Optional
 
 
 class IHotkeysConfigRepository(Protocol):
@@ -10,4 +10,8 @@ class IHotkeysConfigRepository(Protocol):
     def save(self, cfg: Dict[str, Any]) -> None:
         ...
 
+    def subscribe(self, callback: Callable[[Dict[str, Any], Optional[Dict[str, Any]]], None]) -> Callable[[], None]:
+        """Register a change listener called with ``(new, old)``; returns an unsubscribe function."""
+        ...
+
 
@@ -31,3 +31,19 @@ class IObsService(Protocol):
     async def get_stream_status(self) -> dict: ...
 
     async def toggle_streaming(self) -> None: ...
+
+    async def get_record_status(self) -> dict: ...
+
+    async def start_recording(self) -> None: ...
+
+    async def stop_recording(self) -> str | None: ...
+
+    async def toggle_recording(self) -> str | None: ...
+
+    async def get_replay_buffer_status(self) -> dict: ...
+
+    async def start_replay_buffer(self) -> None: ...
+
+    async def stop_replay_buffer(self) -> None: ...
+
+    async def save_replay_buffer(self) -> str: ...
@@ -6,18 +6,31 @@ import logging
 from datetime import datetime
 from pathlib import Path
 
-try:
-    import keyboard  # type: ignore
-    _KEYBOARD_AVAILABLE = True
-except Exception:
-    keyboard = None  # type: ignore
-    _KEYBOARD_AVAILABLE = False
+from prometheus_client import Histogram
 
 from .obs_client import obs_manager
 from app.config import settings
-from app.container import toast_success, toast_error, toast_warning
+from app.container import toast_success, toast_error, toast_warning, save_replay, toggle_record
 from app.utils.screenshot import build_screenshot_path
-from app.container import get_hotkeys_config as uc_get_hotkeys_config
+from app.container import get_hotkeys_config as uc_get_hotkeys_config, hotkeys_repo
+from app.infrastructure.hotkeys.actions import HotkeyAction, compile_actions
+from app.infrastructure.hotkeys.policies import PressGate, compile_policies
+from app.infrastructure.hotkeys.backends import InputBackend, create_backend
+from app.infrastructure.obs.macros import get_macro_engine
+from app.infrastructure.obs.scene_warmup import get_scene_warmup
+
+
+HIST_HOTKEY_RELOAD_SECONDS = Histogram(
+    "app_hotkeys_reload_seconds",
+    "Time to re-apply hotkeys.json and rebind changed combos",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+HIST_HOTKEY_PRESS_TO_ACTION_SECONDS = Histogram(
+    "app_hotkey_press_to_action_seconds",
+    "Time from the input backend reporting a press until its action finished",
+    ["kind"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
 
 
 class HotkeyManager:
@@ -25,7 +38,16 @@ class HotkeyManager:
         self._log = logging.getLogger(__name__)
         self._thread: threading.Thread | None = None
         self._stop = threading.Event()
-        self._registered: list[int | str] = []
+        # combo -> backend hook handle, and combo -> action the hook dispatches to
+        self._registered: dict[str, object] = {}
+        self._table: dict[str, HotkeyAction] = {}
+        self._bind_lock = threading.Lock()
+        self.last_reload: dict | None = None
+        self._action_listeners: list = []
+        # keyboard / evdev / simulated; see app/infrastructure/hotkeys/backends.py
+        self._backend: InputBackend = create_backend(
+            settings.hotkeys_backend, script=settings.hotkeys_simulated_script or None
+        )
 
         # Unified screenshot root from settings (env SCREENSHOT_DIR still respected by settings)
         self.ss_dir = Path(getattr(settings, "screenshot_dir", str(Path.home() / "Pictures" / "OBS-Screenshots")))
@@ -34,33 +56,25 @@ class HotkeyManager:
         self.ss_format = os.getenv("SCREENSHOT_FORMAT", "png")
         self.ss_width = int(os.getenv("SCREENSHOT_WIDTH", "1080"))
         self.ss_height = int(os.getenv("SCREENSHOT_HEIGHT", "1920"))
+        self._img_reset_armed_at: float | None = None
+        self._handlers = {
+            "scene": self._run_scene,
+            "screenshot": self._run_screenshot,
+            "img_reset": self._on_img_reset_hotkey,
+            "stream": lambda _a: self._toggle_stream(),
+            "replay": lambda _a: self._save_replay(),
+            "record": lambda _a: self._toggle_record(),
+            "macro": self._run_macro,
+        }
+        # Debounce / in-flight / last-wins policies per action kind
+        self._gate = PressGate(lambda fn, *args: self._backend.spawn(fn, *args))
         # Load JSON config for hotkeys via use-case (after env defaults ready)
         self._apply_config(self._load_config())
-        # Dimension constraints
-        self.CAM_MIN_W, self.CAM_MIN_H = 320, 240
-        self.CAM_MAX_W, self.CAM_MAX_H = 1080, 1920
-        self.WIN_MIN_W, self.WIN_MIN_H = 320, 180
-        self.WIN_MAX_W, self.WIN_MAX_H = 1920, 1080
-        # 기본 업데이트 입력(프론트용) will be set by _apply_config
-
-        # After-shot (시술 후) will be set by _apply_config
-
-        # Side will be set by _apply_config
-
-        # After-shot side set by _apply_config
-
-        # Rear set by _apply_config
-
-        # After-shot rear set by _apply_config
-
-        # Hair config will be set by _apply_config
-
-        # Reset config will be set by _apply_config
-        self._img_reset_armed_at: float | None = None
-
-        # Stream toggle set by _apply_config
-
-        # Maps set by _apply_config
+        # Rebind whenever hotkeys.json changes (API save or external edit)
+        try:
+            hotkeys_repo().subscribe(self._on_config_changed)
+        except Exception:
+            pass
 
     def _load_config(self) -> dict:
         try:
@@ -68,87 +82,52 @@ class HotkeyManager:
         except Exception:
             return {}
 
-    def _apply_config(self, _cfg: dict) -> None:
-        # scene: no global default; optional if provided
-        self.scene_key = str((_cfg.get("scene") or {}).get("key", ""))
-        self.scene_name = str((_cfg.get("scene") or {}).get("name", ""))
-
-        sc = (_cfg.get("screenshot") or {})
-        pb = (sc.get("procedure_before") or {})
-        pa = (sc.get("procedure_after") or {})
-
-        d = (pb.get("front") or {})
-        self.ss_key = str(d.get("key", "F5"))
-        self.ss_source = str(d.get("source", "cam_front"))
-        self.ss_update_input = str(d.get("update_input", "img_before_front"))
-        self.ss_front_width = int(str(d.get("width", self.ss_width)))
-        self.ss_front_height = int(str(d.get("height", self.ss_height)))
-
-        s = (pb.get("side") or {})
-        self.ss_side_key = str(s.get("key", "F6"))
-        self.ss_side_source = str(s.get("source", "cam_side"))
-        self.ss_side_update_input = str(s.get("update_input", "img_before_side"))
-        self.ss_side_width = int(str(s.get("width", self.ss_width)))
-        self.ss_side_height = int(str(s.get("height", self.ss_height)))
-
-        r = (pb.get("rear") or {})
-        self.ss_rear_key = str(r.get("key", "F7"))
-        self.ss_rear_source = str(r.get("source", "cam_rear"))
-        self.ss_rear_update_input = str(r.get("update_input", "img_before_rear"))
-        self.ss_rear_width = int(str(r.get("width", self.ss_width)))
-        self.ss_rear_height = int(str(r.get("height", self.ss_height)))
-
-        af = (pa.get("front") or {})
-        self.ss_after_key = str(af.get("key", "shift+F5"))
-        self.ss_after_source = str(af.get("source", "cam_front"))
-        self.ss_after_update_input = str(af.get("update_input", "img_after_front"))
-        self.ss_after_front_width = int(str(af.get("width", self.ss_width)))
-        self.ss_after_front_height = int(str(af.get("height", self.ss_height)))
-
-        sa = (pa.get("side") or {})
-        self.ss_side_after_key = str(sa.get("key", "shift+F6"))
-        self.ss_side_after_source = str(sa.get("source", "cam_side"))
-        self.ss_side_after_update_input = str(sa.get("update_input", "img_after_side"))
-        self.ss_side_after_width = int(str(sa.get("width", self.ss_width)))
-        self.ss_side_after_height = int(str(sa.get("height", self.ss_height)))
-
-        ra = (pa.get("rear") or {})
-        self.ss_rear_after_key = str(ra.get("key", "shift+F7"))
-        self.ss_rear_after_source = str(ra.get("source", "cam_rear"))
-        self.ss_rear_after_update_input = str(ra.get("update_input", "img_after_rear"))
-        self.ss_rear_after_width = int(str(ra.get("width", self.ss_width)))
-        self.ss_rear_after_height = int(str(ra.get("height", self.ss_height)))
-
-        h = (sc.get("hair_reference") or {})
-        self.ss_hair_key = str(h.get("key", "F8"))
-        self.ss_hair_source = str(h.get("source", "window_capture"))
-        self.ss_hair_update_input = str(h.get("update_input", "img_hair_reference"))
-        self.ss_hair_width = int(str(h.get("width", 1920)))
-        self.ss_hair_height = int(str(h.get("height", 1080)))
-
-        imr = (_cfg.get("img_reset") or {})
-        self.img_reset_key = str(imr.get("key", "ctrl+F8"))
-        self.img_reset_targets = str(
-            imr.get(
-                "targets",
-                "img_before_front,img_after_front,img_before_side,img_after_side,img_before_rear,img_after_rear,img_hair_reference",
-            )
-        )
-        self.img_reset_confirm_window_sec = int(str(imr.get("confirm_window_sec", 5)))
+    def _on_config_changed(self, _new: dict, _old: dict | None) -> None:
+        try:
+            self.reload_config()
+        except Exception as exc:
+            self._log.warning("hotkeys reload after config change failed: %s", exc)
 
-        self.stream_toggle_key = str(_cfg.get("stream_toggle_key", "F9"))
-        self.scene_map = (_cfg.get("scene_map") or {})
-        self.screenshot_map = (_cfg.get("screenshot_map") or {})
+    def _apply_config(self, _cfg: dict) -> None:
+        # Precompile every binding once; presses only look up the combo
+        self._table = compile_actions(_cfg, default_size=(self.ss_width, self.ss_height))
+        self._gate.policies = compile_policies(_cfg)
+        # Scenes bound to hotkeys are the warm-up candidates before any history exists
+        get_scene_warmup().set_fallback(a.target for a in self._table.values() if a.kind == "scene")
 
     def reload_config(self) -> None:
-        # Stop listener, re-apply config, and restart
-        was_alive = bool(self._thread and self._thread.is_alive())
-        self.stop()
-        self._apply_config(self._load_config())
-        if was_alive:
-            self.start()
-
-        # _registered initialized in __init__
+        """Re-apply hotkeys.json and rebind only the combos that changed.
+
+        The dispatch table is swapped in one assignment, so hotkeys whose combo
+        is unchanged keep working throughout; backend hooks are only added for
+        new combos and removed for dropped ones.
+        """
+        t0 = time.perf_counter()
+        listening = bool(self._thread and self._thread.is_alive())
+        with self._bind_lock:
+            old_table = self._table
+            self._apply_config(self._load_config())
+            new_table = self._table
+            added, removed = self._sync_hooks() if listening else (0, 0)
+        changed = sum(1 for c, a in new_table.items() if c in old_table and old_table[c] != a)
+        elapsed = time.perf_counter() - t0
+        HIST_HOTKEY_RELOAD_SECONDS.observe(elapsed)
+        self.last_reload = {
+            "at": datetime.now().isoformat(timespec="seconds"),
+            "ms": round(elapsed * 1000.0, 2),
+            "added": added,
+            "removed": removed,
+            "changed": changed,
+            "bindings": len(new_table),
+        }
+        self._log.info(
+            "hotkeys reloaded in %.1f ms (+%d -%d ~%d)",
+            elapsed * 1000.0,
+            added,
+            removed,
+            changed,
+            extra={"hotkey.reload_ms": self.last_reload["ms"]},
+        )
 
     @staticmethod
     def _parse_map_env(var_name: str) -> dict[str, str]:
@@ -169,35 +148,92 @@ class HotkeyManager:
                 result[k] = v
         return result
 
-    def _wrap_hotkey(self, combo: str, category: str, target: str | None, action: callable) -> callable:
-        def _cb() -> None:
-            def _execute() -> None:
-                try:
-                    self._log.info(
-                        "hotkey pressed: %s -> %s",
-                        combo,
-                        target or category,
-                        extra={
-                            "hotkey.combo": combo,
-                            "hotkey.category": category,
-                            "hotkey.target": target,
-                        },
-                    )
-                except Exception:
-                    pass
+    def _dispatch(self, combo: str) -> None:
+        # Looked up per press so a reload that only retargets a combo needs no rehook
+        action = self._table.get(combo)
+        if action is not None:
+            t_press = time.perf_counter()
+            self._gate.submit(action, lambda a: self._execute(a, t_press))
+
+    def _execute(self, action: HotkeyAction, t_press: float | None = None) -> None:
+        try:
+            self._log.info(
+                "hotkey pressed: %s -> %s",
+                action.combo,
+                action.target or action.kind,
+                extra={
+                    "hotkey.combo": action.combo,
+                    "hotkey.category": action.kind,
+                    "hotkey.target": action.target,
+                },
+            )
+        except Exception:
+            pass
+        try:
+            self._handlers[action.kind](action)
+        except Exception:
+            pass
+        if t_press is not None:
+            elapsed = time.perf_counter() - t_press
+            HIST_HOTKEY_PRESS_TO_ACTION_SECONDS.labels(action.kind).observe(elapsed)
+            for listener in list(self._action_listeners):
                 try:
-                    action()
+                    listener(action, elapsed)
                 except Exception:
                     pass
-            if _KEYBOARD_AVAILABLE:
-                keyboard.call_later(_execute)
-            else:
-                _execute()
-        return _cb
+
+    def add_action_listener(self, listener) -> callable:
+        """Call ``listener(action, press_to_done_seconds)`` after each action; returns a remover."""
+        self._action_listeners.append(listener)
+        return lambda: self._action_listeners.remove(listener) if listener in self._action_listeners else None
+
+    @property
+    def backend(self) -> InputBackend:
+        return self._backend
+
+    def use_backend(self, backend: InputBackend) -> None:
+        """Swap the input backend (e.g. a SimulatedBackend in benchmarks); restarts the listener."""
+        was_alive = bool(self._thread and self._thread.is_alive())
+        if was_alive:
+            self.stop()
+        self._backend = backend
+        if was_alive:
+            self.start()
+
+    def describe_bindings(self) -> dict[str, dict]:
+        return {combo: action.describe() for combo, action in self._table.items()}
+
+    def press_stats(self) -> dict:
+        return self._gate.stats()
+
+    def _sync_hooks(self) -> tuple[int, int]:
+        """Make backend hooks match the table's combos; caller holds ``_bind_lock``."""
+        if not self._backend.available:
+            return 0, 0
+        wanted = set(self._table)
+        added = removed = 0
+        for combo in [c for c in self._registered if c not in wanted]:
+            try:
+                self._backend.remove_hotkey(self._registered.pop(combo))
+                removed += 1
+                self._log.info("unbind %s", combo)
+            except Exception as exc:
+                self._log.warning("failed unbind for hotkey %s: %s", combo, exc)
+        for combo in self._table:
+            if combo in self._registered:
+                continue
+            action = self._table[combo]
+            try:
+                self._registered[combo] = self._backend.add_hotkey(combo, lambda c=combo: self._dispatch(c))
+                added += 1
+                self._log.info("bind %s -> %s '%s'", combo, action.kind, action.target)
+            except Exception as exc:
+                self._log.warning("failed bind for %s hotkey %s -> %s: %s", action.kind, combo, action.target, exc)
+        return added, removed
 
     def start(self) -> None:
-        if not _KEYBOARD_AVAILABLE:
-            self._log.warning("hotkeys disabled: keyboard module unavailable or permission denied")
+        if not self._backend.available:
+            self._log.warning("hotkeys disabled: no input backend (keyboard/evdev unavailable or permission denied)")
             return
         if self._thread and self._thread.is_alive():
             return
@@ -207,10 +243,15 @@ class HotkeyManager:
 
     def stop(self) -> None:
         self._stop.set()
+        with self._bind_lock:
+            try:
+                for hk in self._registered.values():
+                    self._backend.remove_hotkey(hk)
+            except Exception:
+                pass
+            self._registered.clear()
         try:
-            if _KEYBOARD_AVAILABLE:
-                for hk in self._registered:
-                    keyboard.remove_hotkey(hk)
+            self._backend.stop()
         except Exception:
             pass
         # Ensure listener thread fully stops before returning to allow immediate restart
@@ -219,8 +260,6 @@ class HotkeyManager:
                 self._thread.join(timeout=1.0)
         except Exception:
             pass
-        # Reset state
-        self._registered.clear()
         self._thread = None
         self._log.info("hotkeys listener stopped")
 
@@ -231,203 +270,22 @@ class HotkeyManager:
         except Exception:
             pass
 
-        self._log.info("hotkeys listener starting")
-        # Scene map registrations (from config maps + explicit scene_hotkeys)
-        sc_map = dict(self.scene_map)
+        self._log.info("hotkeys listener starting (%s)", self._backend.name)
+        with self._bind_lock:
+            self._sync_hooks()
+        # Hooks first, so a simulated script replay never presses unbound keys
         try:
-            cfg = self._load_config()
-            for scene_name, key_combo in (cfg.get("scene_hotkeys") or {}).items():
-                kc = str(key_combo or '').strip()
-                if kc:
-                    sc_map[kc] = str(scene_name)
-        except Exception:
-            pass
-        for key_combo, scene in sc_map.items():
-            try:
-                cb = self._wrap_hotkey(key_combo, "scene", scene, lambda s=scene: self._switch_scene_name(s))
-                self._registered.append(keyboard.add_hotkey(key_combo, cb))
-                self._log.info("bind %s -> scene '%s'", key_combo, scene)
-            except Exception as exc:
-                self._log.warning("failed bind for scene hotkey %s -> %s: %s", key_combo, scene, exc)
-
-        # Screenshot map registrations (generic)
-        for key_combo, source in self.screenshot_map.items():
-            cb = self._wrap_hotkey(key_combo, "screenshot", source, lambda src=source: self._take_screenshot_source(src))
-            self._registered.append(keyboard.add_hotkey(key_combo, cb))
-            self._log.info("bind %s -> screenshot '%s'", key_combo, source)
-
-        # Backward-compatible single bindings (front default)
-        if self.scene_name:
-            self._registered.append(
-                keyboard.add_hotkey(self.scene_key, lambda: keyboard.call_later(self._switch_scene))
-            )
-        if self.ss_source:
-            cb = self._wrap_hotkey(self.ss_key, "screenshot", self.ss_source, self._take_screenshot)
-            self._registered.append(keyboard.add_hotkey(self.ss_key, cb))
-            extra = f", update_input='{self.ss_update_input}'" if self.ss_update_input else ""
-            self._log.info(
-                "bind %s -> screenshot '%s' %sx%s%s",
-                self.ss_key,
-                self.ss_source,
-                getattr(self, "ss_front_width", self.ss_width),
-                getattr(self, "ss_front_height", self.ss_height),
-                extra,
-            )
-
-        # After-shot front
-        if self.ss_after_source and self.ss_after_key:
-            cb = self._wrap_hotkey(
-                self.ss_after_key,
-                "screenshot",
-                self.ss_after_source,
-                lambda: self._take_screenshot_source_custom(
-                    self.ss_after_source,
-                    self.ss_after_update_input,
-                    self.ss_after_front_width,
-                    self.ss_after_front_height,
-                ),
-            )
-            self._registered.append(keyboard.add_hotkey(self.ss_after_key, cb))
-            self._log.info(
-                "bind %s -> screenshot(after) '%s' %sx%s (update '%s')",
-                self.ss_after_key,
-                self.ss_after_source,
-                getattr(self, "ss_after_front_width", self.ss_width),
-                getattr(self, "ss_after_front_height", self.ss_height),
-                self.ss_after_update_input,
-            )
-
-        # New: side/rear dedicated keys
-        if self.ss_side_source and self.ss_side_key:
-            cb = self._wrap_hotkey(
-                self.ss_side_key,
-                "screenshot",
-                self.ss_side_source,
-                lambda: self._take_screenshot_source_custom(
-                    self.ss_side_source,
-                    self.ss_side_update_input,
-                    self.ss_side_width,
-                    self.ss_side_height,
-                ),
-            )
-            self._registered.append(keyboard.add_hotkey(self.ss_side_key, cb))
-            self._log.info(
-                "bind %s -> screenshot '%s' %sx%s (update '%s')",
-                self.ss_side_key,
-                self.ss_side_source,
-                getattr(self, "ss_side_width", self.ss_width),
-                getattr(self, "ss_side_height", self.ss_height),
-                self.ss_side_update_input,
-            )
-        # After-shot side
-        if self.ss_side_after_source and self.ss_side_after_key:
-            cb = self._wrap_hotkey(
-                self.ss_side_after_key,
-                "screenshot",
-                self.ss_side_after_source,
-                lambda: self._take_screenshot_source_custom(
-                    self.ss_side_after_source,
-                    self.ss_side_after_update_input,
-                    self.ss_side_after_width,
-                    self.ss_side_after_height,
-                ),
-            )
-            self._registered.append(keyboard.add_hotkey(self.ss_side_after_key, cb))
-            self._log.info(
-                "bind %s -> screenshot(after) '%s' %sx%s (update '%s')",
-                self.ss_side_after_key,
-                self.ss_side_after_source,
-                getattr(self, "ss_side_after_width", self.ss_width),
-                getattr(self, "ss_side_after_height", self.ss_height),
-                self.ss_side_after_update_input,
-            )
-        if self.ss_rear_source and self.ss_rear_key:
-            cb = self._wrap_hotkey(
-                self.ss_rear_key,
-                "screenshot",
-                self.ss_rear_source,
-                lambda: self._take_screenshot_source_custom(
-                    self.ss_rear_source,
-                    self.ss_rear_update_input,
-                    self.ss_rear_width,
-                    self.ss_rear_height,
-                ),
-            )
-            self._registered.append(keyboard.add_hotkey(self.ss_rear_key, cb))
-            self._log.info(
-                "bind %s -> screenshot '%s' %sx%s (update '%s')",
-                self.ss_rear_key,
-                self.ss_rear_source,
-                getattr(self, "ss_rear_width", self.ss_width),
-                getattr(self, "ss_rear_height", self.ss_height),
-                self.ss_rear_update_input,
-            )
-        # After-shot rear
-        if self.ss_rear_after_source and self.ss_rear_after_key:
-            cb = self._wrap_hotkey(
-                self.ss_rear_after_key,
-                "screenshot",
-                self.ss_rear_after_source,
-                lambda: self._take_screenshot_source_custom(
-                    self.ss_rear_after_source,
-                    self.ss_rear_after_update_input,
-                    self.ss_rear_after_width,
-                    self.ss_rear_after_height,
-                ),
-            )
-            self._registered.append(keyboard.add_hotkey(self.ss_rear_after_key, cb))
-            self._log.info(
-                "bind %s -> screenshot(after) '%s' %sx%s (update '%s')",
-                self.ss_rear_after_key,
-                self.ss_rear_after_source,
-                getattr(self, "ss_rear_after_width", self.ss_width),
-                getattr(self, "ss_rear_after_height", self.ss_height),
-                self.ss_rear_after_update_input,
-            )
-
-        # Hair reference hotkey: window_capture screenshot -> update img_hair_reference
-        if self.ss_hair_source and self.ss_hair_key:
-            cb = self._wrap_hotkey(
-                self.ss_hair_key,
-                "screenshot",
-                self.ss_hair_source,
-                lambda: self._take_screenshot_source_custom(
-                    self.ss_hair_source,
-                    self.ss_hair_update_input,
-                    self.ss_hair_width,
-                    self.ss_hair_height,
-                ),
-            )
-            self._registered.append(keyboard.add_hotkey(self.ss_hair_key, cb))
-            self._log.info(
-                "bind %s -> screenshot '%s' %sx%s (update '%s')",
-                self.ss_hair_key,
-                self.ss_hair_source,
-                self.ss_hair_width,
-                self.ss_hair_height,
-                self.ss_hair_update_input,
-            )
-
-        # Reset all image inputs hotkey
-        if self.img_reset_key:
-            cb = self._wrap_hotkey(self.img_reset_key, "img_reset", self.img_reset_targets, self._on_img_reset_hotkey)
-            self._registered.append(keyboard.add_hotkey(self.img_reset_key, cb))
-            self._log.info("bind %s -> reset all image inputs (2-step confirm)", self.img_reset_key)
-
-        if self.stream_toggle_key:
-            cb = self._wrap_hotkey(self.stream_toggle_key, "stream", "toggle", self._toggle_stream)
-            self._registered.append(keyboard.add_hotkey(self.stream_toggle_key, cb))
+            self._backend.start()
+        except Exception as exc:
+            self._log.warning("hotkey backend %s failed to start: %s", self._backend.name, exc)
 
         # Keep the thread alive until stop
         while not self._stop.is_set():
             time.sleep(0.2)
 
     # Actions
-    def _switch_scene(self):
-        if not self.scene_name:
-            return
-        import asyncio
-        asyncio.run(self._async_switch_scene(self.scene_name))
+    def _run_scene(self, action: HotkeyAction) -> None:
+        self._switch_scene_name(action.target or "")
 
     def _switch_scene_name(self, scene_name: str):
         import asyncio
@@ -437,15 +295,18 @@ class HotkeyManager:
             self._log.error("scene switch failed: %s — %s", scene_name, exc)
 
     async def _async_switch_scene(self, scene_name: str):
+        warmup = get_scene_warmup()
+        outcome = warmup.outcome_for(scene_name)
+        t0 = time.perf_counter()
         await obs_manager.set_current_scene(scene_name)
+        try:
+            # Learns the transition and re-points the preview in the background
+            warmup.on_switch(scene_name, outcome, time.perf_counter() - t0)
+        except Exception as exc:
+            self._log.debug("scene warm-up bookkeeping failed: %s", exc)
 
-    def _take_screenshot(self):
-        self._take_screenshot_source_custom(self.ss_source, self.ss_update_input, self.ss_front_width, self.ss_front_height)
-
-    def _take_screenshot_source(self, source_name: str):
-        self._take_screenshot_source_custom(source_name, self.ss_update_input, None, None)
-
-    def _take_screenshot_source_custom(self, source_name: str, update_input: str | None, width: int | None, height: int | None):
+    def _run_screenshot(self, action: HotkeyAction) -> None:
+        source_name = action.source or ""
         out_str = build_screenshot_path(
             source_name,
             image_format=self.ss_format,
@@ -456,51 +317,33 @@ class HotkeyManager:
         import asyncio
         try:
             self._log.info("screenshot request: %s -> %s", source_name, out)
-            # 해상도 결정: 우선 명시값, 다음 헤어 소스, 마지막 글로벌 기본
-            w = int(width) if width else self.ss_width
-            h = int(height) if height else self.ss_height
-            if not width and not height and source_name == self.ss_hair_source:
-                w = self.ss_hair_width
-                h = self.ss_hair_height
-
-            # Clamp by source type
-            req_w, req_h = int(w), int(h)
-            if source_name == self.ss_hair_source:
-                clamped_w = max(self.WIN_MIN_W, min(req_w, self.WIN_MAX_W))
-                clamped_h = max(self.WIN_MIN_H, min(req_h, self.WIN_MAX_H))
-                kind = "window"
-            else:
-                clamped_w = max(self.CAM_MIN_W, min(req_w, self.CAM_MAX_W))
-                clamped_h = max(self.CAM_MIN_H, min(req_h, self.CAM_MAX_H))
-                kind = "camera"
-            if clamped_w != req_w or clamped_h != req_h:
+            if action.clamped:
                 self._log.info(
                     "screenshot size clamp (%s): requested=%sx%s -> effective=%sx%s",
-                    kind,
-                    req_w,
-                    req_h,
-                    clamped_w,
-                    clamped_h,
+                    action.clamp,
+                    action.requested[0],
+                    action.requested[1],
+                    action.width,
+                    action.height,
                 )
             else:
-                self._log.info("screenshot size (%s): %sx%s", kind, req_w, req_h)
-            w, h = clamped_w, clamped_h
+                self._log.info("screenshot size (%s): %sx%s", action.clamp, action.width, action.height)
             saved = asyncio.run(
                 obs_manager.save_source_screenshot(
                     source_name=source_name,
                     image_file_path=str(out),
                     image_format=self.ss_format,
-                    image_width=w,
-                    image_height=h,
+                    image_width=action.width,
+                    image_height=action.height,
                 )
             )
             self._log.info("screenshot saved: %s", saved)
-            if update_input:
+            if action.update_input:
                 try:
-                    asyncio.run(obs_manager.update_image_source_file(update_input, str(saved)))
-                    self._log.info("image input update: %s -> %s", update_input, saved)
+                    asyncio.run(obs_manager.update_image_source_file(action.update_input, str(saved)))
+                    self._log.info("image input update: %s -> %s", action.update_input, saved)
                 except Exception as exc:
-                    self._log.error("image input update failed: %s — %s", update_input, exc)
+                    self._log.error("image input update failed: %s — %s", action.update_input, exc)
             try:
                 asyncio.run(toast_success()(f"스크린샷 저장됨: {saved}", timeout_ms=2000))
             except Exception:
@@ -512,10 +355,9 @@ class HotkeyManager:
             except Exception:
                 pass
 
-    def _reset_all_img_inputs(self):
+    def _reset_all_img_inputs(self, targets: tuple[str, ...]):
         import asyncio
         try:
-            targets = [t.strip() for t in re.split(r"[,;\s]+", self.img_reset_targets) if t.strip()]
             if not targets:
                 return
             for name in targets:
@@ -534,6 +376,21 @@ class HotkeyManager:
             except Exception:
                 pass
 
+    def _run_macro(self, action: HotkeyAction) -> None:
+        import asyncio
+        name = action.target or ""
+        try:
+            report = asyncio.run(get_macro_engine().run(name, trigger="hotkey"))
+        except Exception as exc:
+            report = {"ok": False, "error": str(exc)}
+        if report["ok"]:
+            return
+        self._log.error("macro failed: %s — %s", name, report["error"])
+        try:
+            asyncio.run(toast_error()(f"매크로 실패: {name} — {report['error']}", timeout_ms=2500))
+        except Exception:
+            pass
+
     def _toggle_stream(self):
         import asyncio
         try:
@@ -542,15 +399,40 @@ class HotkeyManager:
         except Exception as exc:
             self._log.error("stream toggle failed: %s", exc)
 
-    def _on_img_reset_hotkey(self) -> None:
+    def _save_replay(self):
+        import asyncio
+        try:
+            # Returns once OBS reports the file; post-processing continues in the clip pool
+            res = asyncio.run(save_replay()())
+            self._log.info("replay saved: %s", res["path"])
+            try:
+                asyncio.run(toast_success()(f"리플레이 저장됨: {res['path']}", timeout_ms=2000))
+            except Exception:
+                pass
+        except Exception as exc:
+            self._log.error("replay save failed: %s", exc)
+            try:
+                asyncio.run(toast_error()(f"리플레이 저장 실패: {exc}", timeout_ms=2500))
+            except Exception:
+                pass
+
+    def _toggle_record(self):
+        import asyncio
+        try:
+            res = asyncio.run(toggle_record()())
+            self._log.info("record toggle requested%s", f"; stopped -> {res['path']}" if res["path"] else "")
+        except Exception as exc:
+            self._log.error("record toggle failed: %s", exc)
+
+    def _on_img_reset_hotkey(self, action: HotkeyAction) -> None:
         import asyncio
         try:
             now = time.time()
-            window = max(1, int(self.img_reset_confirm_window_sec))
+            window = action.confirm_window_sec
             if self._img_reset_armed_at is not None and (now - self._img_reset_armed_at) <= window:
                 # Confirmed within window
                 self._img_reset_armed_at = None
-                self._reset_all_img_inputs()
+                self._reset_all_img_inputs(action.targets)
                 return
             # Arm and prompt
             self._img_reset_armed_at = now
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 import os
 from dataclasses import asdict, dataclass
@@ -9,11 +8,18 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Iterable
 
+from app.infrastructure.config.store import JsonConfigStore
+
 
 _log = logging.getLogger(__name__)
 
 _DEFAULT_CONFIG_DIR = Path("config")
 _DEFAULT_CONFIG_FILE = _DEFAULT_CONFIG_DIR / "screenshot_retention.json"
+_CLIP_CONFIG_FILE = _DEFAULT_CONFIG_DIR / "clip_retention.json"
+
+IMAGE_EXTS = frozenset({".png", ".jpg", ".jpeg", ".bmp", ".webp"})
+# Replay/recording clips plus their thumbnails and per-day index files
+CLIP_EXTS = frozenset({".mkv", ".mp4", ".mov", ".m4v", ".flv", ".ts", ".jpg", ".jsonl"})
 
 
 @dataclass
@@ -23,47 +29,47 @@ class ScreenshotRetention:
     interval_sec: int = 3600
 
 
-_settings_lock = asyncio.Lock()
-
-
-async def load_settings() -> ScreenshotRetention:
-    async with _settings_lock:
-        try:
-            if not _DEFAULT_CONFIG_FILE.exists():
-                try:
-                    _DEFAULT_CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-                except Exception:
-                    pass
-                default_value = ScreenshotRetention()
-                try:
-                    _DEFAULT_CONFIG_FILE.write_text(
-                        json.dumps(asdict(default_value), ensure_ascii=False, indent=2),
-                        encoding="utf-8",
-                    )
-                except Exception:
-                    pass
-                return default_value
-            data = json.loads(_DEFAULT_CONFIG_FILE.read_text(encoding="utf-8"))
-            return ScreenshotRetention(
+def _normalize(data: dict) -> dict:
+    try:
+        return asdict(
+            ScreenshotRetention(
                 enabled=bool(data.get("enabled", True)),
                 days=int(data.get("days", 90)),
                 interval_sec=int(data.get("interval_sec", 3600)),
             )
-        except Exception:
-            return ScreenshotRetention()
+        )
+    except Exception:
+        return asdict(ScreenshotRetention())
+
+
+retention_store = JsonConfigStore(
+    _DEFAULT_CONFIG_FILE,
+    default=lambda: asdict(ScreenshotRetention()),
+    normalize=_normalize,
+)
+
+# Same schema and engine for the clip directory (app/infrastructure/media/clip_pipeline.py)
+clip_retention_store = JsonConfigStore(
+    _CLIP_CONFIG_FILE,
+    default=lambda: asdict(ScreenshotRetention(days=30)),
+    normalize=_normalize,
+)
+
+
+async def load_settings() -> ScreenshotRetention:
+    # Cached; the file is only re-read after it changes on disk
+    try:
+        return ScreenshotRetention(**retention_store.load())
+    except Exception:
+        return ScreenshotRetention()
 
 
 async def save_settings(value: ScreenshotRetention) -> None:
-    async with _settings_lock:
-        try:
-            _DEFAULT_CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-        except Exception:
-            pass
-        _DEFAULT_CONFIG_FILE.write_text(json.dumps(asdict(value), ensure_ascii=False, indent=2), encoding="utf-8")
+    await asyncio.to_thread(retention_store.save, asdict(value))
 
 
-def _iter_image_files(paths: Iterable[os.PathLike[str] | str]) -> Iterable[Path]:
-    exts = {".png", ".jpg", ".jpeg", ".bmp", ".webp"}
+def _iter_image_files(paths: Iterable[os.PathLike[str] | str], exts: Iterable[str] = IMAGE_EXTS) -> Iterable[Path]:
+    exts = frozenset(exts)
     for p in paths:
         root = Path(p)
         if not root.exists():
@@ -75,12 +81,12 @@ def _iter_image_files(paths: Iterable[os.PathLike[str] | str]) -> Iterable[Path]
                     yield d / name
 
 
-def cleanup_once(paths: Iterable[os.PathLike[str] | str], *, days: int) -> dict:
+def cleanup_once(paths: Iterable[os.PathLike[str] | str], *, days: int, exts: Iterable[str] = IMAGE_EXTS) -> dict:
     cutoff = datetime.now() - timedelta(days=int(days))
     deleted = 0
     checked = 0
     bytes_deleted = 0
-    for f in _iter_image_files(paths):
+    for f in _iter_image_files(paths, exts):
         try:
             checked += 1
             mtime = datetime.fromtimestamp(f.stat().st_mtime)
@@ -101,26 +107,45 @@ def cleanup_once(paths: Iterable[os.PathLike[str] | str], *, days: int) -> dict:
     }
 
 
-async def retention_loop(stop_event: asyncio.Event, paths: list[str]) -> None:
-    while not stop_event.is_set():
-        try:
-            cfg = await load_settings()
-            if cfg.enabled and cfg.days > 0:
-                result = await asyncio.to_thread(cleanup_once, paths, days=cfg.days)
-                _log.info(
-                    "screenshot retention: checked=%s deleted=%s bytes=%s cutoff=%s",
-                    result.get("checked"),
-                    result.get("deleted"),
-                    result.get("bytes_deleted"),
-                    result.get("cutoff"),
-                )
-            wait_sec = max(30, int(cfg.interval_sec))
-        except Exception as exc:
-            _log.error("screenshot retention error: %s", exc)
-            wait_sec = 300
-        try:
-            await asyncio.wait_for(stop_event.wait(), timeout=wait_sec)
-        except asyncio.TimeoutError:
-            pass
+async def _wait_first(stop_event: asyncio.Event, wake: asyncio.Event, timeout: float) -> None:
+    waiters = [asyncio.ensure_future(stop_event.wait()), asyncio.ensure_future(wake.wait())]
+    try:
+        await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for w in waiters:
+            w.cancel()
 
 
+async def retention_loop(stop_event: asyncio.Event, paths: list[str]) -> None:
+    # Config changes (API save or file watcher) wake the loop to reschedule
+    loop = asyncio.get_running_loop()
+    wake = asyncio.Event()
+    unsubscribe = retention_store.subscribe(lambda _new, _old: loop.call_soon_threadsafe(wake.set))
+    last_run: float | None = None
+    try:
+        while not stop_event.is_set():
+            wake.clear()
+            try:
+                cfg = await load_settings()
+                interval = max(30, int(cfg.interval_sec))
+                due_in = 0.0 if last_run is None else last_run + interval - loop.time()
+                if due_in <= 0:
+                    last_run = loop.time()
+                    if cfg.enabled and cfg.days > 0:
+                        result = await asyncio.to_thread(cleanup_once, paths, days=cfg.days)
+                        _log.info(
+                            "screenshot retention: checked=%s deleted=%s bytes=%s cutoff=%s",
+                            result.get("checked"),
+                            result.get("deleted"),
+                            result.get("bytes_deleted"),
+                            result.get("cutoff"),
+                        )
+                    wait_sec = float(interval)
+                else:
+                    wait_sec = due_in
+            except Exception as exc:
+                _log.error("screenshot retention error: %s", exc)
+                wait_sec = 300.0
+            await _wait_first(stop_event, wake, wait_sec)
+    finally:
+        unsubscribe()
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
-import json
 from copy import deepcopy
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict
 from app.domain.ports.hotkeys_config_repository import IHotkeysConfigRepository
+from app.infrastructure.config.store import JsonConfigStore, ChangeCallback
 
 
 CONFIG_DIR = Path("config")
@@ -55,8 +55,23 @@ DEFAULT_HOTKEY_CONFIG: Dict[str, Any] = {
         "confirm_window_sec": 5,
     },
     "stream_toggle_key": "F9",
+    # Replay buffer save (clip goes through the clip pipeline) and record toggle
+    "replay_save_key": "ctrl+F9",
+    "record_toggle_key": "shift+F9",
     "scene_map": {},
     "screenshot_map": {},
+    # Macros from config/macros.json (macro name -> key combo)
+    "macro_hotkeys": {},
+    # Per action kind press handling (see app/infrastructure/hotkeys/policies.py)
+    "policies": {
+        "screenshot": {"debounce_ms": 300, "drop_in_flight": True},
+        "scene": {"coalesce": True},
+        "img_reset": {"debounce_ms": 250},
+        "stream": {"debounce_ms": 1000, "drop_in_flight": True},
+        "macro": {"debounce_ms": 300, "drop_in_flight": True},
+        "replay": {"debounce_ms": 1000, "drop_in_flight": True},
+        "record": {"debounce_ms": 1000, "drop_in_flight": True},
+    },
 }
 
 
@@ -70,40 +85,26 @@ def _deep_merge(defaults: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str
     return out
 
 
+hotkeys_store = JsonConfigStore(
+    HOTKEYS_CONFIG_PATH,
+    default=lambda: deepcopy(DEFAULT_HOTKEY_CONFIG),
+    normalize=lambda data: _deep_merge(DEFAULT_HOTKEY_CONFIG, data),
+)
+
+
 def ensure_hotkeys_config_exists() -> None:
-    try:
-        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-        if not HOTKEYS_CONFIG_PATH.exists():
-            HOTKEYS_CONFIG_PATH.write_text(
-                json.dumps(DEFAULT_HOTKEY_CONFIG, ensure_ascii=False, indent=2),
-                encoding="utf-8",
-            )
-    except Exception:
-        pass
+    hotkeys_store.ensure_exists()
 
 
 def load_hotkey_config() -> Dict[str, Any]:
-    ensure_hotkeys_config_exists()
-    try:
-        data = json.loads(HOTKEYS_CONFIG_PATH.read_text(encoding="utf-8"))
-        if not isinstance(data, dict):
-            data = {}
-    except Exception:
-        data = {}
-    return _deep_merge(DEFAULT_HOTKEY_CONFIG, data)
+    # Cached merged config; only re-parsed when hotkeys.json changes on disk
+    return hotkeys_store.load()
 
 
 def save_hotkey_config(cfg: Dict[str, Any]) -> None:
-    ensure_hotkeys_config_exists()
-    try:
-        # Merge to ensure required defaults present
-        merged = _deep_merge(DEFAULT_HOTKEY_CONFIG, cfg or {})
-        HOTKEYS_CONFIG_PATH.write_text(
-            json.dumps(merged, ensure_ascii=False, indent=2), encoding="utf-8"
-        )
-    except Exception:
-        # swallow to avoid crashing callers; API should report failure if needed
-        raise
+    # Merge to ensure required defaults present
+    merged = _deep_merge(DEFAULT_HOTKEY_CONFIG, cfg or {})
+    hotkeys_store.save(merged)
 
 
 class FileHotkeysConfigRepository(IHotkeysConfigRepository):
@@ -113,4 +114,6 @@ class FileHotkeysConfigRepository(IHotkeysConfigRepository):
     def save(self, cfg: Dict[str, Any]) -> None:
         save_hotkey_config(cfg)
 
+    def subscribe(self, callback: ChangeCallback) -> Callable[[], None]:
+        return hotkeys_store.subscribe(callback)
 
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
-import json
 from pathlib import Path
 from typing import Any, Dict
 
 from app.config import settings
+from app.infrastructure.config.store import JsonConfigStore
 
 
 CONFIG_DIR = Path("config")
@@ -19,25 +19,7 @@ DEFAULT_WS_CONFIG: Dict[str, Any] = {
 }
 
 
-def ensure_obs_ws_config_exists() -> None:
-    try:
-        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-        if not OBS_WS_CONFIG_PATH.exists():
-            OBS_WS_CONFIG_PATH.write_text(
-                json.dumps(DEFAULT_WS_CONFIG, ensure_ascii=False, indent=2), encoding="utf-8"
-            )
-    except Exception:
-        pass
-
-
-def load_obs_ws_config() -> Dict[str, Any]:
-    ensure_obs_ws_config_exists()
-    try:
-        data = json.loads(OBS_WS_CONFIG_PATH.read_text(encoding="utf-8"))
-        if not isinstance(data, dict):
-            data = {}
-    except Exception:
-        data = {}
+def _normalize(data: Dict[str, Any]) -> Dict[str, Any]:
     # Fill defaults
     out: Dict[str, Any] = dict(DEFAULT_WS_CONFIG)
     out.update({k: v for k, v in (data or {}).items() if v is not None})
@@ -55,13 +37,26 @@ def load_obs_ws_config() -> Dict[str, Any]:
     return out
 
 
+obs_ws_store = JsonConfigStore(
+    OBS_WS_CONFIG_PATH,
+    default=lambda: dict(DEFAULT_WS_CONFIG),
+    normalize=_normalize,
+)
+
+
+def ensure_obs_ws_config_exists() -> None:
+    obs_ws_store.ensure_exists()
+
+
+def load_obs_ws_config() -> Dict[str, Any]:
+    # Cached; only re-parsed when obs_ws.json changes on disk
+    return obs_ws_store.load()
+
+
 def save_obs_ws_config(cfg: Dict[str, Any]) -> Dict[str, Any]:
-    ensure_obs_ws_config_exists()
     # Merge and normalize
     cur = load_obs_ws_config()
     merged: Dict[str, Any] = {**cur, **(cfg or {})}
-    # Persist
-    OBS_WS_CONFIG_PATH.write_text(json.dumps(merged, ensure_ascii=False, indent=2), encoding="utf-8")
+    # Persist (atomic) and notify subscribers such as OBSConnectionManager
+    obs_ws_store.save(merged)
     return merged
-
-
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+
+_log = logging.getLogger(__name__)
+
+ChangeCallback = Callable[[Dict[str, Any], Optional[Dict[str, Any]]], None]
+
+
+def atomic_write_json(path: Path, data: Any) -> None:
+    """Write JSON via temp file + rename so readers never see a half-written file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(json.dumps(data, ensure_ascii=False, indent=2))
+            f.flush()
+            os.fsync(f.fileno())
+        # Windows refuses to replace a file another process holds open; retry briefly
+        for attempt in range(5):
+            try:
+                os.replace(tmp, path)
+                break
+            except PermissionError:
+                if attempt == 4:
+                    raise
+                time.sleep(0.05)
+    except Exception:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class JsonConfigStore:
+    """Cached view of one JSON config file.
+
+    ``load()`` only re-reads the file when its mtime/size signature changed, so the
+    hot path is a single ``stat``. The normalized result is shared between callers
+    and must be treated as read-only. Subscribers are called with ``(new, old)``
+    whenever the normalized value changes, whether through ``save()`` or an
+    external edit picked up by ``load()``/``check()``.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        default: Callable[[], Dict[str, Any]],
+        normalize: Callable[[Dict[str, Any]], Dict[str, Any]],
+    ) -> None:
+        self.path = Path(path)
+        self._default = default
+        self._normalize = normalize
+        self._lock = threading.RLock()
+        self._value: Optional[Dict[str, Any]] = None
+        self._sig: Optional[tuple[int, int]] = None
+        self._subscribers: list[ChangeCallback] = []
+        # Set by a file watcher that calls check() on change; load() then skips the stat
+        self.watched = False
+
+    def _stat_sig(self) -> Optional[tuple[int, int]]:
+        try:
+            st = self.path.stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def ensure_exists(self) -> None:
+        try:
+            if not self.path.exists():
+                atomic_write_json(self.path, self._default())
+        except Exception:
+            pass
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if not isinstance(data, dict):
+                data = {}
+        except Exception:
+            data = {}
+        return self._normalize(data)
+
+    def _refresh(self, force: bool = False) -> tuple[Dict[str, Any], Optional[Dict[str, Any]], bool]:
+        with self._lock:
+            sig = self._stat_sig()
+            if sig is None:
+                self.ensure_exists()
+                sig = self._stat_sig()
+            if not force and self._value is not None and sig == self._sig:
+                return self._value, self._value, False
+            old = self._value
+            self._value = self._read()
+            self._sig = sig
+            return self._value, old, old is not None and old != self._value
+
+    def load(self) -> Dict[str, Any]:
+        if self.watched and self._value is not None:
+            return self._value
+        value, old, changed = self._refresh()
+        if changed:
+            self._notify(value, old)
+        return value
+
+    def check(self) -> bool:
+        """Re-validate against disk and notify subscribers; returns True if the value changed."""
+        value, old, changed = self._refresh()
+        if changed:
+            self._notify(value, old)
+        return changed
+
+    def save(self, raw: Dict[str, Any]) -> Dict[str, Any]:
+        """Persist ``raw`` atomically and return its normalized form."""
+        with self._lock:
+            old = self._value
+            atomic_write_json(self.path, raw)
+            self._value = self._normalize(dict(raw))
+            self._sig = self._stat_sig()
+            value = self._value
+        if old != value:
+            self._notify(value, old)
+        return value
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._sig = None
+
+    def subscribe(self, callback: ChangeCallback) -> Callable[[], None]:
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def _unsubscribe() -> None:
+            with self._lock:
+                try:
+                    self._subscribers.remove(callback)
+                except ValueError:
+                    pass
+
+        return _unsubscribe
+
+    def _notify(self, value: Dict[str, Any], old: Optional[Dict[str, Any]]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for cb in subscribers:
+            try:
+                cb(value, old)
+            except Exception as exc:
+                _log.warning("config subscriber failed for %s: %s", self.path.name, exc)
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import platform
+import select
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+
+_log = logging.getLogger(__name__)
+
+FileCallback = Callable[[Path], None]
+
+# <sys/inotify.h>
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+_MISSING = object()
+
+
+class _Inotify:
+    """Minimal ctypes binding: one directory watch, non-blocking reads."""
+
+    def __init__(self, directory: Path) -> None:
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(str(directory)), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, f"inotify_add_watch failed for {directory}")
+
+    def read_names(self, timeout: float) -> list[str]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        names: list[str] = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(buf):
+            _wd, _mask, _cookie, length = _EVENT_HEADER.unpack_from(buf, offset)
+            offset += _EVENT_HEADER.size
+            raw = buf[offset : offset + length]
+            offset += length
+            name = raw.split(b"\0", 1)[0].decode("utf-8", "replace")
+            if name:
+                names.append(name)
+        return names
+
+    def close(self) -> None:
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+class DirectoryWatcher:
+    """Watch files in one directory and dispatch debounced per-file callbacks.
+
+    Uses inotify on Linux and falls back to polling ``stat`` signatures elsewhere
+    (or when inotify is unavailable). Bursts of events for the same file, such as
+    an editor's write + rename, are coalesced: a callback fires once the file has
+    been quiet for ``debounce`` seconds. Callbacks run on the watcher thread.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        debounce: float = 0.3,
+        poll_interval: float = 1.0,
+        backend: str = "auto",
+        name: str = "config-watcher",
+    ) -> None:
+        self.directory = Path(directory)
+        self.debounce = max(0.0, float(debounce))
+        self.poll_interval = max(0.1, float(poll_interval))
+        self.backend_pref = (backend or "auto").strip().lower()
+        self.backend = "none"
+        self._name = name
+        self._callbacks: Dict[str, list[FileCallback]] = {}
+        self._prefix_callbacks: list[tuple[str, FileCallback]] = []
+        self._pending: Dict[str, float] = {}
+        self._sigs: Dict[str, Optional[tuple[int, int]]] = {}
+        self._primed = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def watch(self, filename: str, callback: FileCallback) -> None:
+        with self._lock:
+            self._callbacks.setdefault(filename, []).append(callback)
+            self._sigs[filename] = self._stat(filename)
+
+    def watch_prefix(self, prefix: str, callback: FileCallback) -> None:
+        """Dispatch for every file whose name starts with ``prefix``, including files
+        created or removed after the watcher started."""
+        with self._lock:
+            self._prefix_callbacks.append((prefix, callback))
+
+    def _stat(self, filename: str) -> Optional[tuple[int, int]]:
+        try:
+            st = (self.directory / filename).stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _relevant(self, name: str) -> bool:
+        return name in self._callbacks or any(name.startswith(p) for p, _ in self._prefix_callbacks)
+
+    def _mark(self, names: list[str]) -> None:
+        now = time.monotonic()
+        for name in names:
+            if self._relevant(name):
+                self._pending[name] = now
+
+    def _poll_changes(self) -> list[str]:
+        with self._lock:
+            names = set(self._callbacks)
+            has_prefix = bool(self._prefix_callbacks)
+        if has_prefix:
+            try:
+                names.update(n for n in os.listdir(self.directory) if self._relevant(n))
+            except OSError:
+                pass
+            # Previously seen files that disappeared
+            names.update(self._sigs)
+        changed: list[str] = []
+        for name in names:
+            sig = self._stat(name)
+            prev = self._sigs.get(name, _MISSING)
+            self._sigs[name] = sig
+            if prev is _MISSING:
+                # New file matching a prefix; the first pass only records a baseline
+                if self._primed:
+                    changed.append(name)
+            elif prev != sig:
+                changed.append(name)
+        self._primed = True
+        return changed
+
+    def _dispatch_due(self) -> None:
+        if not self._pending:
+            return
+        now = time.monotonic()
+        due = [n for n, t in self._pending.items() if now - t >= self.debounce]
+        for name in due:
+            self._pending.pop(name, None)
+            path = self.directory / name
+            with self._lock:
+                callbacks = list(self._callbacks.get(name, []))
+                callbacks.extend(cb for p, cb in self._prefix_callbacks if name.startswith(p))
+            for cb in callbacks:
+                try:
+                    cb(path)
+                except Exception as exc:
+                    _log.warning("watch callback failed for %s: %s", name, exc)
+
+    def _tick_timeout(self) -> float:
+        if self._pending:
+            return max(0.01, self.debounce / 2.0)
+        return self.poll_interval
+
+    def _run_inotify(self, ino: _Inotify) -> None:
+        try:
+            while not self._stop.is_set():
+                self._mark(ino.read_names(self._tick_timeout()))
+                self._dispatch_due()
+        finally:
+            ino.close()
+
+    def _run_poll(self) -> None:
+        while not self._stop.wait(self._tick_timeout()):
+            self._mark(self._poll_changes())
+            self._dispatch_due()
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        except Exception:
+            pass
+        self._stop.clear()
+        target: Callable[[], None] = self._run_poll
+        self.backend = "poll"
+        if self.backend_pref in {"auto", "inotify"} and platform.system().lower() == "linux":
+            try:
+                ino = _Inotify(self.directory)
+                target = lambda: self._run_inotify(ino)  # noqa: E731
+                self.backend = "inotify"
+            except Exception as exc:
+                _log.info("inotify unavailable for %s, polling instead: %s", self.directory, exc)
+        self._thread = threading.Thread(target=target, name=self._name, daemon=True)
+        self._thread.start()
+        _log.info("watching %s (%s)", self.directory, self.backend)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=2.0)
+        self._thread = None
+
+
+def build_config_watcher() -> DirectoryWatcher:
+    """Watcher for ``config/`` wired to the cached config stores.
+
+    Each store's ``check()`` re-reads the file and notifies its own subscribers:
+    hotkeys.json rebinds hotkeys, obs_ws.json drops the OBS client when the
+    connection settings changed, screenshot_retention.json reschedules cleanup.
+    While watched, the stores stop stat-ing the file on every ``load()``.
+    """
+    from app.config import settings
+    from app.infrastructure.config.hotkeys_config import hotkeys_store, CONFIG_DIR
+    from app.infrastructure.config.obs_ws_config import obs_ws_store
+    from app.infrastructure.cleanup.screenshot_retention import retention_store
+
+    watcher = DirectoryWatcher(
+        CONFIG_DIR,
+        debounce=float(settings.config_watch_debounce_ms) / 1000.0,
+        poll_interval=float(settings.config_watch_poll_sec),
+        backend=settings.config_watch_backend,
+    )
+    for store in (hotkeys_store, obs_ws_store, retention_store):
+        store.load()  # prime cache before the watcher takes over freshness checks
+        store.watched = True
+        watcher.watch(store.path.name, lambda _p, s=store: s.check())
+    return watcher
+
+
+def unwatch_config_stores() -> None:
+    from app.infrastructure.config.hotkeys_config import hotkeys_store
+    from app.infrastructure.config.obs_ws_config import obs_ws_store
+    from app.infrastructure.cleanup.screenshot_retention import retention_store
+
+    for store in (hotkeys_store, obs_ws_store, retention_store):
+        store.watched = False
@@ -0,0 +1,504 @@
+from __future__ import annotations
+
+import logging
+import os
+import platform
+import re
+import shutil
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Protocol
+
+from prometheus_client import Counter, Histogram
+
+from app.infrastructure.devices.resolver import DeviceIndex, normalize_label, path_tokens
+
+
+_log = logging.getLogger(__name__)
+
+HIST_DEVICE_ENUM_SECONDS = Histogram(
+    "app_device_enumeration_seconds",
+    "Time one video-device enumeration took",
+    ["backend"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+COUNTER_DEVICE_ENUMS = Counter(
+    "app_device_enumerations_total",
+    "Video-device enumerations by the registry, by what triggered them",
+    ["backend", "reason"],
+)
+
+
+@dataclass(frozen=True, slots=True)
+class VideoDevice:
+    name: str
+    path: str
+    source: str
+    norm: str = ""
+    path_lc: str = ""
+    tokens: frozenset[str] = frozenset()
+
+    @classmethod
+    def make(cls, name: str, path: str, source: str, tokens: Optional[frozenset[str]] = None) -> "VideoDevice":
+        return cls(
+            name=str(name or ""),
+            path=str(path or ""),
+            source=source,
+            norm=normalize_label(name),
+            path_lc=str(path or "").lower(),
+            tokens=tokens if tokens is not None else path_tokens(path),
+        )
+
+    def as_dict(self) -> Dict[str, str]:
+        return {"name": self.name, "path": self.path}
+
+
+@dataclass(frozen=True, slots=True)
+class DeviceSnapshot:
+    devices: tuple[VideoDevice, ...]
+    method: str
+    enumerated_at: float
+    index: DeviceIndex = field(default_factory=DeviceIndex)
+
+    @property
+    def names(self) -> list[str]:
+        return [d.name for d in self.devices if d.name]
+
+
+class DeviceBackend(Protocol):
+    name: str
+
+    def available(self) -> bool: ...
+
+    def enumerate(self) -> list[VideoDevice]: ...
+
+
+class DShowBackend:
+    """DirectShow video-input category via COM (names + moniker display names)."""
+
+    name = "dshow-com"
+
+    def available(self) -> bool:
+        return platform.system().lower() == "windows"
+
+    def enumerate(self) -> list[VideoDevice]:
+        from app.infrastructure.devices.dshow_enum import list_dshow_devices_detailed
+
+        return [VideoDevice.make(d.get("name", ""), d.get("path", ""), self.name) for d in list_dshow_devices_detailed() or []]
+
+
+class FfmpegDShowBackend:
+    """``ffmpeg -list_devices`` fallback; names only, no monikers."""
+
+    name = "ffmpeg"
+
+    def available(self) -> bool:
+        return platform.system().lower() == "windows" and shutil.which("ffmpeg") is not None
+
+    def enumerate(self) -> list[VideoDevice]:
+        ffmpeg = shutil.which("ffmpeg")
+        if not ffmpeg:
+            return []
+        proc = subprocess.run(
+            [ffmpeg, "-hide_banner", "-f", "dshow", "-list_devices", "true", "-i", "dummy"],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        out = proc.stderr or proc.stdout or ""
+        devices: list[VideoDevice] = []
+        in_video_section = False
+        for line in out.splitlines():
+            if "DirectShow video devices" in line:
+                in_video_section = True
+                continue
+            if in_video_section and "DirectShow audio devices" in line:
+                break
+            if in_video_section:
+                m = re.search(r'\"(.+?)\"', line)
+                if m:
+                    devices.append(VideoDevice.make(m.group(1), "", self.name))
+        return devices
+
+
+class V4L2Backend:
+    """Linux capture devices from sysfs (``/sys/class/video4linux``).
+
+    Only index-0 nodes are listed (UVC cameras also expose metadata nodes). The
+    path is the stable ``/dev/v4l/by-id`` link when present, else ``/dev/videoN``;
+    VID/PID come from the parent USB device's ``idVendor``/``idProduct``.
+    """
+
+    name = "v4l2"
+
+    def __init__(self, sys_root: Path | str = "/sys/class/video4linux", dev_root: Path | str = "/dev") -> None:
+        self.sys_root = Path(sys_root)
+        self.dev_root = Path(dev_root)
+
+    def available(self) -> bool:
+        return self.sys_root.is_dir()
+
+    @staticmethod
+    def _read(path: Path) -> str:
+        try:
+            return path.read_text(encoding="utf-8", errors="replace").strip()
+        except OSError:
+            return ""
+
+    def _usb_ids(self, node: Path) -> frozenset[str]:
+        try:
+            cur = (node / "device").resolve()
+        except OSError:
+            return frozenset()
+        for _ in range(4):
+            vid = self._read(cur / "idVendor")
+            if vid:
+                return frozenset(t.lower() for t in (vid, self._read(cur / "idProduct")) if t)
+            cur = cur.parent
+        return frozenset()
+
+    def _by_id_links(self) -> Dict[str, str]:
+        links: Dict[str, str] = {}
+        by_id = self.dev_root / "v4l" / "by-id"
+        try:
+            for link in by_id.iterdir():
+                try:
+                    links[os.path.realpath(link)] = str(link)
+                except OSError:
+                    continue
+        except OSError:
+            pass
+        return links
+
+    def enumerate(self) -> list[VideoDevice]:
+        try:
+            nodes = sorted(self.sys_root.iterdir(), key=lambda p: (len(p.name), p.name))
+        except OSError:
+            return []
+        links = self._by_id_links()
+        devices: list[VideoDevice] = []
+        for node in nodes:
+            if not node.name.startswith("video"):
+                continue
+            if self._read(node / "index") not in ("", "0"):
+                continue
+            dev = str(self.dev_root / node.name)
+            name = self._read(node / "name") or node.name
+            devices.append(VideoDevice.make(name, links.get(os.path.realpath(dev), dev), self.name, self._usb_ids(node)))
+        return devices
+
+
+class NullBackend:
+    name = "none"
+
+    def available(self) -> bool:
+        return True
+
+    def enumerate(self) -> list[VideoDevice]:
+        return []
+
+
+def create_backends(name: str) -> list[DeviceBackend]:
+    """Backends in preference order; the registry uses the first that returns devices."""
+    choice = (name or "auto").strip().lower()
+    table: Dict[str, Callable[[], DeviceBackend]] = {
+        "dshow": DShowBackend,
+        "ffmpeg": FfmpegDShowBackend,
+        "v4l2": V4L2Backend,
+        "none": NullBackend,
+    }
+    if choice in table:
+        return [table[choice]()]
+    if choice != "auto":
+        _log.warning("unknown devices backend %r, using auto", name)
+    return [DShowBackend(), FfmpegDShowBackend(), V4L2Backend()]
+
+
+class DeviceRegistry:
+    """Cached video-device enumeration shared by the camera routes and resolvers.
+
+    The device list (with normalized labels, VID/PID tokens and a resolver
+    ``DeviceIndex``) is built once and reused until ``ttl`` expires or ``invalidate()`` is called by a
+    hot-plug notifier. Concurrent callers during a refresh wait for the same
+    enumeration instead of starting their own.
+    """
+
+    def __init__(self, backends: list[DeviceBackend], *, ttl: float = 30.0) -> None:
+        self.backends = list(backends)
+        self.ttl = max(0.0, float(ttl))
+        self._snapshot: Optional[DeviceSnapshot] = None
+        self._stale_reason: Optional[str] = "initial"
+        self._lock = threading.Lock()
+        self._listeners: list[Callable[[DeviceSnapshot], None]] = []
+        self.enumerations = 0
+        self.hits = 0
+        self.invalidations = 0
+        self.last_reason: Optional[str] = None
+
+    def invalidate(self, reason: str = "manual") -> None:
+        self.invalidations += 1
+        self._stale_reason = reason
+
+    def add_listener(self, listener: Callable[[DeviceSnapshot], None]) -> None:
+        self._listeners.append(listener)
+
+    def _expired(self, snap: DeviceSnapshot) -> bool:
+        return self.ttl > 0 and time.monotonic() - snap.enumerated_at > self.ttl
+
+    def _enumerate(self, reason: str) -> DeviceSnapshot:
+        devices: list[VideoDevice] = []
+        method = "none"
+        for backend in self.backends:
+            try:
+                if not backend.available():
+                    continue
+                t0 = time.perf_counter()
+                devices = backend.enumerate()
+                HIST_DEVICE_ENUM_SECONDS.labels(backend=backend.name).observe(time.perf_counter() - t0)
+                COUNTER_DEVICE_ENUMS.labels(backend=backend.name, reason=reason).inc()
+            except Exception as exc:
+                _log.debug("device backend %s failed: %s", backend.name, exc)
+                continue
+            if devices:
+                method = backend.name
+                break
+        return DeviceSnapshot(
+            devices=tuple(devices),
+            method=method,
+            enumerated_at=time.monotonic(),
+            index=DeviceIndex.build(devices),
+        )
+
+    def snapshot(self, *, refresh: bool = False) -> DeviceSnapshot:
+        snap = self._snapshot
+        if snap is not None and not refresh and self._stale_reason is None and not self._expired(snap):
+            self.hits += 1
+            return snap
+        with self._lock:
+            # Another caller may have refreshed while we waited for the lock
+            snap = self._snapshot
+            if snap is not None and not refresh and self._stale_reason is None and not self._expired(snap):
+                self.hits += 1
+                return snap
+            if refresh:
+                reason = "refresh"
+            elif self._stale_reason is not None:
+                reason = self._stale_reason
+            else:
+                reason = "ttl"
+            self._stale_reason = None
+            snap = self._enumerate(reason)
+            self._snapshot = snap
+            self.enumerations += 1
+            self.last_reason = reason
+        for listener in list(self._listeners):
+            try:
+                listener(snap)
+            except Exception as exc:
+                _log.debug("device registry listener failed: %s", exc)
+        return snap
+
+    def stats(self) -> Dict[str, Any]:
+        snap = self._snapshot
+        return {
+            "method": snap.method if snap else None,
+            "devices": len(snap.devices) if snap else 0,
+            "age_s": round(time.monotonic() - snap.enumerated_at, 1) if snap else None,
+            "ttl_s": self.ttl,
+            "enumerations": self.enumerations,
+            "hits": self.hits,
+            "invalidations": self.invalidations,
+            "last_reason": self.last_reason,
+        }
+
+
+class _WindowsDeviceNotifier:
+    """Hidden message-only window receiving ``WM_DEVICECHANGE`` arrival/removal."""
+
+    WM_CLOSE = 0x0010
+    WM_DESTROY = 0x0002
+    WM_DEVICECHANGE = 0x0219
+    DBT_DEVICEARRIVAL = 0x8000
+    DBT_DEVICEREMOVECOMPLETE = 0x8004
+    DBT_DEVTYP_DEVICEINTERFACE = 5
+    DEVICE_NOTIFY_ALL_INTERFACE_CLASSES = 0x4
+
+    def __init__(self, on_change: Callable[[str], None]) -> None:
+        self._on_change = on_change
+        self._hwnd: Any = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._proc_ref: Any = None
+
+    def _run(self) -> None:
+        import ctypes
+        from ctypes import wintypes
+
+        user32 = ctypes.WinDLL("user32", use_last_error=True)
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        LRESULT = ctypes.c_ssize_t
+        WNDPROC = ctypes.WINFUNCTYPE(LRESULT, wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM)
+
+        class WNDCLASSW(ctypes.Structure):
+            _fields_ = [
+                ("style", wintypes.UINT),
+                ("lpfnWndProc", WNDPROC),
+                ("cbClsExtra", ctypes.c_int),
+                ("cbWndExtra", ctypes.c_int),
+                ("hInstance", wintypes.HINSTANCE),
+                ("hIcon", wintypes.HICON),
+                ("hCursor", wintypes.HANDLE),
+                ("hbrBackground", wintypes.HBRUSH),
+                ("lpszMenuName", wintypes.LPCWSTR),
+                ("lpszClassName", wintypes.LPCWSTR),
+            ]
+
+        class DEV_BROADCAST_DEVICEINTERFACE_W(ctypes.Structure):
+            _fields_ = [
+                ("dbcc_size", wintypes.DWORD),
+                ("dbcc_devicetype", wintypes.DWORD),
+                ("dbcc_reserved", wintypes.DWORD),
+                ("dbcc_classguid", ctypes.c_byte * 16),
+                ("dbcc_name", ctypes.c_wchar * 1),
+            ]
+
+        user32.DefWindowProcW.argtypes = [wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
+        user32.DefWindowProcW.restype = LRESULT
+        user32.CreateWindowExW.argtypes = [
+            wintypes.DWORD, wintypes.LPCWSTR, wintypes.LPCWSTR, wintypes.DWORD,
+            ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+            wintypes.HWND, wintypes.HMENU, wintypes.HINSTANCE, wintypes.LPVOID,
+        ]
+        user32.CreateWindowExW.restype = wintypes.HWND
+        user32.RegisterDeviceNotificationW.argtypes = [wintypes.HANDLE, ctypes.c_void_p, wintypes.DWORD]
+        user32.RegisterDeviceNotificationW.restype = wintypes.HANDLE
+        user32.UnregisterDeviceNotification.argtypes = [wintypes.HANDLE]
+        user32.GetMessageW.argtypes = [ctypes.POINTER(wintypes.MSG), wintypes.HWND, wintypes.UINT, wintypes.UINT]
+        user32.GetMessageW.restype = ctypes.c_int
+        user32.DispatchMessageW.argtypes = [ctypes.POINTER(wintypes.MSG)]
+        user32.DispatchMessageW.restype = LRESULT
+        user32.TranslateMessage.argtypes = [ctypes.POINTER(wintypes.MSG)]
+        user32.DestroyWindow.argtypes = [wintypes.HWND]
+        kernel32.GetModuleHandleW.argtypes = [wintypes.LPCWSTR]
+        kernel32.GetModuleHandleW.restype = wintypes.HMODULE
+
+        def proc(hwnd, msg, wparam, lparam):
+            if msg == self.WM_DEVICECHANGE and wparam in (self.DBT_DEVICEARRIVAL, self.DBT_DEVICEREMOVECOMPLETE):
+                try:
+                    self._on_change("arrival" if wparam == self.DBT_DEVICEARRIVAL else "removal")
+                except Exception:
+                    pass
+                return 1
+            if msg == self.WM_CLOSE:
+                user32.DestroyWindow(hwnd)
+                return 0
+            if msg == self.WM_DESTROY:
+                user32.PostQuitMessage(0)
+                return 0
+            return user32.DefWindowProcW(hwnd, msg, wparam, lparam)
+
+        self._proc_ref = WNDPROC(proc)  # must outlive the window
+        hinst = kernel32.GetModuleHandleW(None)
+        wc = WNDCLASSW()
+        wc.lpfnWndProc = self._proc_ref
+        wc.hInstance = hinst
+        wc.lpszClassName = "ObsControlDeviceWatch"
+        user32.RegisterClassW(ctypes.byref(wc))
+        HWND_MESSAGE = wintypes.HWND(-3)
+        hwnd = user32.CreateWindowExW(0, wc.lpszClassName, "", 0, 0, 0, 0, 0, HWND_MESSAGE, None, hinst, None)
+        if not hwnd:
+            _log.info("device notifier: CreateWindowExW failed (%s)", ctypes.get_last_error())
+            self._ready.set()
+            return
+        flt = DEV_BROADCAST_DEVICEINTERFACE_W()
+        flt.dbcc_size = ctypes.sizeof(DEV_BROADCAST_DEVICEINTERFACE_W)
+        flt.dbcc_devicetype = self.DBT_DEVTYP_DEVICEINTERFACE
+        hnotify = user32.RegisterDeviceNotificationW(hwnd, ctypes.byref(flt), self.DEVICE_NOTIFY_ALL_INTERFACE_CLASSES)
+        self._hwnd = hwnd
+        self._ready.set()
+        msg = wintypes.MSG()
+        try:
+            while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+                user32.TranslateMessage(ctypes.byref(msg))
+                user32.DispatchMessageW(ctypes.byref(msg))
+        finally:
+            if hnotify:
+                user32.UnregisterDeviceNotification(hnotify)
+            self._hwnd = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="device-notifier", daemon=True)
+        self._thread.start()
+        self._ready.wait(2.0)
+
+    def stop(self) -> None:
+        hwnd = self._hwnd
+        if hwnd:
+            import ctypes
+
+            ctypes.windll.user32.PostMessageW(hwnd, self.WM_CLOSE, 0, 0)  # type: ignore[attr-defined]
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=2.0)
+        self._thread = None
+
+
+class HotplugWatcher:
+    """Invalidate the registry when capture devices come and go.
+
+    Windows: ``WM_DEVICECHANGE`` on a message-only window. Linux: a
+    ``DirectoryWatcher`` on ``/dev`` for ``video*`` nodes. Elsewhere the TTL is
+    the only refresh.
+    """
+
+    def __init__(self, registry: DeviceRegistry, *, dev_root: Path | str = "/dev") -> None:
+        self.registry = registry
+        self.dev_root = Path(dev_root)
+        self.kind = "none"
+        self._impl: Any = None
+
+    def _changed(self, reason: str) -> None:
+        _log.info("video devices changed (%s), invalidating device cache", reason)
+        self.registry.invalidate(f"hotplug:{reason}")
+
+    def start(self) -> None:
+        system = platform.system().lower()
+        try:
+            if system == "windows":
+                self._impl = _WindowsDeviceNotifier(self._changed)
+                self._impl.start()
+                self.kind = "wm_devicechange"
+            elif system == "linux" and self.dev_root.is_dir():
+                from app.infrastructure.config.watcher import DirectoryWatcher
+
+                watcher = DirectoryWatcher(self.dev_root, debounce=0.5, poll_interval=2.0, name="device-watcher")
+                watcher.watch_prefix("video", lambda p: self._changed(p.name))
+                watcher.start()
+                self._impl = watcher
+                self.kind = f"dev-{watcher.backend}"
+        except Exception as exc:
+            _log.warning("device hot-plug watch unavailable: %s", exc)
+            self._impl = None
+            self.kind = "none"
+
+    def stop(self) -> None:
+        impl, self._impl = self._impl, None
+        if impl is not None:
+            try:
+                impl.stop()
+            except Exception:
+                pass
+
+
+_REGISTRY: Optional[DeviceRegistry] = None
+
+
+def get_device_registry() -> DeviceRegistry:
+    global _REGISTRY
+    if _REGISTRY is None:
+        from app.config import settings
+
+        _REGISTRY = DeviceRegistry(create_backends(settings.devices_backend), ttl=float(settings.devices_cache_ttl_sec))
+    return _REGISTRY
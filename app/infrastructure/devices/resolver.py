@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Iterable, Optional
+
+if TYPE_CHECKING:  # pragma: no cover
+    from app.infrastructure.devices.registry import VideoDevice
+
+
+_TRAILING_PAREN = re.compile(r"\s*\([^)]*\)\s*$")
+_SPACES = re.compile(r"\s+")
+_LABEL_TOKEN = re.compile(r"\(([0-9a-fA-F]{3,8})(?::([0-9a-fA-F]{3,8}))?\)")
+_DECIMAL = re.compile(r"[0-9]{3,8}")
+_PATH_IDS = re.compile(r"(?:vid|pid)_([0-9a-f]{4})")
+_PATH_SPLIT = re.compile(r"[^0-9a-z]+")
+_HEXISH = re.compile(r"[0-9a-f]{3,8}")
+
+
+def normalize_label(s: str) -> str:
+    """Friendly name without a trailing ``(...)`` group, single-spaced, lowercase."""
+    base = _TRAILING_PAREN.sub("", s or "")
+    return _SPACES.sub(" ", base).strip().lower()
+
+
+def label_tokens(label: str) -> list[str]:
+    """Identifier tokens from a UI label such as ``"Cam (1bcf)"`` or ``"Cam (046d:0825)"``.
+
+    Purely decimal tokens also yield their zero-padded hex form (``3564`` -> ``0dec``).
+    """
+    tokens: list[str] = []
+    for m in _LABEL_TOKEN.finditer(str(label or "")):
+        for tok in m.groups():
+            if not tok:
+                continue
+            tok = tok.lower()
+            if tok not in tokens:
+                tokens.append(tok)
+            if _DECIMAL.fullmatch(tok):
+                hx = f"{int(tok, 10):04x}"
+                if hx not in tokens:
+                    tokens.append(hx)
+    return tokens
+
+
+def path_tokens(path: str) -> frozenset[str]:
+    """USB VID/PID values embedded in a DirectShow moniker (``...#vid_046d&pid_0825#...``)."""
+    return frozenset(_PATH_IDS.findall((path or "").lower()))
+
+
+def path_words(path: str) -> frozenset[str]:
+    """Every hex-looking segment of a device path (VID/PID, serials, instance ids)."""
+    return frozenset(w for w in _PATH_SPLIT.split((path or "").lower()) if _HEXISH.fullmatch(w))
+
+
+# Ranks, best first; ties go to enumeration order
+RANK_PATH = 0
+RANK_ID_TOKEN = 1
+RANK_PATH_WORD = 2
+RANK_NAME = 3
+RANK_CONTAINS = 4
+
+
+@dataclass(frozen=True, slots=True)
+class Resolution:
+    device: "VideoDevice"
+    rank: int
+    reason: str
+    score: int = 0
+
+
+@dataclass(slots=True)
+class DeviceIndex:
+    """Lookup tables built once per enumeration.
+
+    ``resolve`` tries, in order: exact path/moniker, VID/PID tokens from the label
+    (devices matching more tokens first), other hex segments of the path, exact
+    normalized name, and only then a substring scan over precomputed names. Each
+    of the first four is a dict lookup; results are memoized per label.
+    """
+
+    devices: tuple["VideoDevice", ...] = ()
+    by_path: Dict[str, int] = field(default_factory=dict)
+    by_norm: Dict[str, list[int]] = field(default_factory=dict)
+    by_id_token: Dict[str, list[int]] = field(default_factory=dict)
+    by_path_word: Dict[str, list[int]] = field(default_factory=dict)
+    _memo: Dict[str, Optional[Resolution]] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, devices: Iterable["VideoDevice"]) -> "DeviceIndex":
+        idx = cls(devices=tuple(d for d in devices if d.path))
+        for i, d in enumerate(idx.devices):
+            idx.by_path.setdefault(d.path, i)
+            idx.by_path.setdefault(d.path_lc, i)
+            if d.norm:
+                idx.by_norm.setdefault(d.norm, []).append(i)
+            for tok in d.tokens:
+                idx.by_id_token.setdefault(tok, []).append(i)
+            for word in path_words(d.path):
+                idx.by_path_word.setdefault(word, []).append(i)
+        return idx
+
+    def _best_by_tokens(self, table: Dict[str, list[int]], tokens: list[str]) -> Optional[tuple[int, int]]:
+        counts: Dict[int, int] = {}
+        for tok in tokens:
+            for i in table.get(tok, ()):
+                counts[i] = counts.get(i, 0) + 1
+        if not counts:
+            return None
+        i = min(counts, key=lambda k: (-counts[k], k))
+        return i, counts[i]
+
+    def _resolve(self, label: str) -> Optional[Resolution]:
+        raw = str(label or "")
+        i = self.by_path.get(raw)
+        if i is None:
+            i = self.by_path.get(raw.lower())
+        if i is not None:
+            return Resolution(self.devices[i], RANK_PATH, "path")
+
+        tokens = label_tokens(raw)
+        if tokens:
+            hit = self._best_by_tokens(self.by_id_token, tokens)
+            if hit is not None:
+                return Resolution(self.devices[hit[0]], RANK_ID_TOKEN, "vid_pid", hit[1])
+            hit = self._best_by_tokens(self.by_path_word, tokens)
+            if hit is not None:
+                return Resolution(self.devices[hit[0]], RANK_PATH_WORD, "path_token", hit[1])
+
+        norm = normalize_label(raw)
+        if not norm:
+            return None
+        hits = self.by_norm.get(norm)
+        if hits:
+            return Resolution(self.devices[hits[0]], RANK_NAME, "name")
+
+        for d in self.devices:
+            if d.norm and (norm in d.norm or d.norm in norm):
+                return Resolution(d, RANK_CONTAINS, "contains")
+        return None
+
+    def resolve(self, label: str) -> Optional[Resolution]:
+        key = str(label or "")
+        if key in self._memo:
+            return self._memo[key]
+        res = self._resolve(key)
+        if len(self._memo) < 1024:
+            self._memo[key] = res
+        return res
@@ -0,0 +1,2 @@
+# Package marker for runtime diagnostics utilities
+
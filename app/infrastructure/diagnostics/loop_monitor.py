@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Optional
+
+from prometheus_client import Counter, Histogram
+
+
+_log = logging.getLogger(__name__)
+
+HIST_LOOP_DELAY_SECONDS = Histogram(
+    "app_event_loop_scheduling_delay_seconds",
+    "How late the loop monitor's periodic tick woke up compared to its schedule",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+COUNTER_LOOP_BLOCKED = Counter(
+    "app_event_loop_blocked_total",
+    "Number of times a callback blocked the event loop longer than the threshold",
+)
+
+
+class LoopMonitor:
+    """Measure event-loop scheduling delay and catch blocking callbacks.
+
+    A task on the loop ticks every ``interval`` seconds and records how late each
+    tick was. A watchdog thread checks the last tick; once the loop has been silent
+    for longer than ``block_threshold`` it snapshots the loop thread's stack, which
+    is the stack of the callback currently holding the loop.
+    """
+
+    def __init__(self, *, interval: float = 0.05, block_threshold: float = 0.1, max_events: int = 50) -> None:
+        self.interval = max(0.005, float(interval))
+        self.block_threshold = max(self.interval, float(block_threshold))
+        self._delays: deque[float] = deque(maxlen=2000)
+        self._events: deque[dict] = deque(maxlen=max(1, int(max_events)))
+        self._last_beat: float = 0.0
+        self._loop_thread_id: Optional[int] = None
+        self._open_event: Optional[dict] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def _tick_loop(self) -> None:
+        while not self._stop.is_set():
+            t0 = time.perf_counter()
+            self._last_beat = t0
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            delay = max(0.0, now - t0 - self.interval)
+            self._last_beat = now
+            self._delays.append(delay)
+            HIST_LOOP_DELAY_SECONDS.observe(delay)
+            ev = self._open_event
+            if ev is not None:
+                # Blocking episode ended: record its full length
+                ev["duration_ms"] = round(delay * 1000.0, 1)
+                self._open_event = None
+                _log.warning(
+                    "event loop blocked for %.0f ms (stack captured)",
+                    ev["duration_ms"],
+                    extra={"loop.blocked_ms": ev["duration_ms"]},
+                )
+
+    def _watch(self) -> None:
+        poll = max(0.005, self.block_threshold / 4.0)
+        while not self._stop.wait(poll):
+            beat = self._last_beat
+            if not beat or self._open_event is not None:
+                continue
+            silent = time.perf_counter() - beat
+            if silent < self.interval + self.block_threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id or -1)  # type: ignore[attr-defined]
+            stack = traceback.format_stack(frame, limit=30) if frame is not None else []
+            event = {
+                "ts": datetime.now().isoformat(timespec="milliseconds"),
+                "duration_ms": None,
+                "detected_after_ms": round((silent - self.interval) * 1000.0, 1),
+                "stack": stack,
+            }
+            COUNTER_LOOP_BLOCKED.inc()
+            self._events.append(event)
+            self._open_event = event
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = 0.0
+        self._task = asyncio.get_running_loop().create_task(self._tick_loop())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+        if self._watchdog is not None and self._watchdog.is_alive():
+            self._watchdog.join(timeout=1.0)
+        self._task = None
+        self._watchdog = None
+
+    def snapshot(self, *, include_stacks: bool = True) -> dict:
+        delays = sorted(self._delays)
+
+        def pct(p: float) -> float | None:
+            if not delays:
+                return None
+            idx = min(len(delays) - 1, int(round(p * (len(delays) - 1))))
+            return round(delays[idx] * 1000.0, 2)
+
+        events = list(self._events)
+        if not include_stacks:
+            events = [{k: v for k, v in e.items() if k != "stack"} for e in events]
+        return {
+            "running": self.running,
+            "interval_ms": round(self.interval * 1000.0, 1),
+            "block_threshold_ms": round(self.block_threshold * 1000.0, 1),
+            "delay_ms": {
+                "samples": len(delays),
+                "p50": pct(0.50),
+                "p95": pct(0.95),
+                "p99": pct(0.99),
+                "max": round(delays[-1] * 1000.0, 2) if delays else None,
+            },
+            "blocked_events": list(reversed(events)),
+        }
+
+
+_MONITOR: Optional[LoopMonitor] = None
+
+
+def get_loop_monitor() -> LoopMonitor:
+    global _MONITOR
+    if _MONITOR is None:
+        from app.config import settings
+
+        _MONITOR = LoopMonitor(
+            interval=float(settings.loop_monitor_interval_ms) / 1000.0,
+            block_threshold=float(settings.loop_monitor_block_threshold_ms) / 1000.0,
+        )
+    return _MONITOR
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import heapq
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+import psutil
+from prometheus_client import Histogram
+
+
+_log = logging.getLogger(__name__)
+
+HIST_PROCESS_SCAN_SECONDS = Histogram(
+    "app_process_table_scan_seconds",
+    "Time one pass over the OS process table took in the background sampler",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+_SORT_KEYS = {
+    "cpu": lambda r: (r["cpu_percent"], r["rss_bytes"]),
+    "rss": lambda r: (r["rss_bytes"], r["cpu_percent"]),
+}
+
+
+class ProcessTableSampler:
+    """Keep a recent process table (CPU %, memory) up to date on a worker thread.
+
+    ``psutil.process_iter`` reuses its ``Process`` objects between calls, so each
+    pass's ``cpu_percent(None)`` is the delta since the previous pass; no sleep is
+    needed between two scans. Readers get the last published snapshot without
+    touching psutil. The sampler starts on first use and stops again after
+    ``idle_stop`` seconds without readers, so an unwatched host pays nothing.
+    """
+
+    def __init__(self, *, interval: float = 2.0, idle_stop: float = 120.0) -> None:
+        self.interval = max(0.2, float(interval))
+        self.idle_stop = max(self.interval, float(idle_stop))
+        self._rows: list[dict] = []
+        self._sampled_at: float = 0.0
+        self._scan_seconds: float = 0.0
+        self._last_read: float = 0.0
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _scan(self) -> list[dict]:
+        rows: list[dict] = []
+        for p in psutil.process_iter(attrs=["pid", "name", "username"]):
+            try:
+                with p.oneshot():
+                    mem = p.memory_info()
+                    rows.append(
+                        {
+                            "pid": p.pid,
+                            "name": p.info.get("name"),
+                            "user": p.info.get("username"),
+                            "cpu_percent": p.cpu_percent(None),
+                            "rss_bytes": mem.rss,
+                            "vms_bytes": mem.vms,
+                            "create_time": p.create_time(),
+                        }
+                    )
+            except Exception:
+                continue
+        return rows
+
+    def _run(self) -> None:
+        try:
+            # Prime per-process CPU times so the first published pass has real deltas
+            self._scan()
+            wait = min(0.25, self.interval)
+            while not self._stop.wait(wait):
+                t0 = time.perf_counter()
+                rows = self._scan()
+                took = time.perf_counter() - t0
+                HIST_PROCESS_SCAN_SECONDS.observe(took)
+                self._rows, self._sampled_at, self._scan_seconds = rows, time.time(), took
+                self._ready.set()
+                if time.monotonic() - self._last_read > self.idle_stop:
+                    with self._lock:
+                        # Re-checked under the lock: start() may have just counted a read
+                        if time.monotonic() - self._last_read > self.idle_stop:
+                            # Drop the snapshot so the next reader waits for a fresh pass
+                            self._ready.clear()
+                            self._rows, self._sampled_at = [], 0.0
+                            self._thread = None
+                            _log.debug("process sampler idle for %.0fs, stopping", self.idle_stop)
+                            break
+                wait = max(0.0, self.interval - took)
+        except Exception as exc:
+            _log.warning("process sampler stopped: %s", exc)
+        finally:
+            with self._lock:
+                if self._thread is threading.current_thread():
+                    self._thread = None
+
+    def start(self) -> None:
+        with self._lock:
+            self._last_read = time.monotonic()
+            if self.running:
+                return
+            self._stop.clear()
+            self._ready.clear()
+            self._thread = threading.Thread(target=self._run, name="process-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        th = self._thread
+        if th is not None and th.is_alive():
+            th.join(timeout=2.0)
+        with self._lock:
+            self._thread = None
+        self._ready.clear()
+
+    def wait_ready(self, timeout: float) -> bool:
+        """Block until the first snapshot exists; call from a worker thread."""
+        return self._ready.wait(timeout)
+
+    def top(self, limit: int = 10, sort: str = "cpu") -> dict:
+        self.start()  # (re)starts after an idle stop and counts as a read
+        rows, sampled_at, scan = self._rows, self._sampled_at, self._scan_seconds
+        key = _SORT_KEYS.get(sort, _SORT_KEYS["cpu"])
+        return {
+            "processes": heapq.nlargest(max(1, int(limit)), rows, key=key),
+            "total": len(rows),
+            "sort": sort if sort in _SORT_KEYS else "cpu",
+            "sampled_at": datetime.fromtimestamp(sampled_at).isoformat(timespec="milliseconds") if sampled_at else None,
+            "age_ms": round((time.time() - sampled_at) * 1000.0, 1) if sampled_at else None,
+            "scan_ms": round(scan * 1000.0, 1),
+            "interval_s": self.interval,
+        }
+
+
+_SAMPLER: Optional[ProcessTableSampler] = None
+
+
+def get_process_sampler() -> ProcessTableSampler:
+    global _SAMPLER
+    if _SAMPLER is None:
+        from app.config import settings
+
+        _SAMPLER = ProcessTableSampler(
+            interval=float(settings.process_sampler_interval_sec),
+            idle_stop=float(settings.process_sampler_idle_stop_sec),
+        )
+    return _SAMPLER
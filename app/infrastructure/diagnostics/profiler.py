@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from types import FrameType
+
+
+@dataclass
+class ProfileResult:
+    seconds: float
+    hz: float
+    samples: int = 0
+    sampler_cpu_seconds: float = 0.0
+    stacks: Counter = field(default_factory=Counter)
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed format: ``frame;frame;frame count`` per line."""
+        lines = [";".join(stack) + f" {count}" for stack, count in self.stacks.most_common()]
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def as_dict(self, top: int = 50) -> dict:
+        leaf: Counter = Counter()
+        for stack, count in self.stacks.items():
+            leaf[stack[-1]] += count
+        return {
+            "seconds": round(self.seconds, 3),
+            "requested_hz": self.hz,
+            "samples": self.samples,
+            "effective_hz": round(self.samples / self.seconds, 1) if self.seconds > 0 else 0.0,
+            "sampler_cpu_seconds": round(self.sampler_cpu_seconds, 4),
+            "top_leaf_frames": [{"frame": f, "count": c} for f, c in leaf.most_common(top)],
+            "stacks": [{"stack": list(s), "count": c} for s, c in self.stacks.most_common(top)],
+        }
+
+
+def _frame_label(frame: FrameType, with_lines: bool) -> str:
+    code = frame.f_code
+    fname = os.path.basename(code.co_filename)
+    if with_lines:
+        return f"{code.co_name} ({fname}:{frame.f_lineno})"
+    return f"{code.co_name} ({fname})"
+
+
+def _walk(frame: FrameType | None, max_depth: int, with_lines: bool) -> list[str]:
+    out: list[str] = []
+    while frame is not None and len(out) < max_depth:
+        out.append(_frame_label(frame, with_lines))
+        frame = frame.f_back
+    out.reverse()
+    return out
+
+
+def sample_stacks(
+    seconds: float,
+    hz: float,
+    *,
+    max_depth: int = 64,
+    with_lines: bool = False,
+    thread_name: str | None = None,
+) -> ProfileResult:
+    """Statistically profile all Python threads by polling ``sys._current_frames()``.
+
+    Blocks the calling thread for ``seconds``; run it off the event loop. The
+    sampling thread itself is excluded from the output.
+    """
+    period = 1.0 / max(1.0, float(hz))
+    result = ProfileResult(seconds=0.0, hz=float(hz))
+    me = threading.get_ident()
+    c0 = time.thread_time()
+    t0 = time.perf_counter()
+    deadline = t0 + float(seconds)
+    next_at = t0
+    while True:
+        now = time.perf_counter()
+        if now >= deadline:
+            break
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():  # type: ignore[attr-defined]
+            if ident == me:
+                continue
+            tname = names.get(ident, f"thread-{ident}")
+            if thread_name and thread_name not in tname:
+                continue
+            stack = _walk(frame, max_depth, with_lines)
+            result.stacks[(tname, *stack)] += 1
+        result.samples += 1
+        next_at += period
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            # Fell behind (GIL contention); skip missed ticks instead of bursting
+            next_at = time.perf_counter()
+    result.seconds = time.perf_counter() - t0
+    result.sampler_cpu_seconds = time.thread_time() - c0
+    return result
+
+
+_PROFILE_LOCK = threading.Lock()
+
+
+def try_acquire_profiler() -> bool:
+    """Only one profile may run at a time; returns False when one is in progress."""
+    return _PROFILE_LOCK.acquire(blocking=False)
+
+
+def release_profiler() -> None:
+    try:
+        _PROFILE_LOCK.release()
+    except RuntimeError:
+        pass
@@ -0,0 +1 @@
+# Package marker for hotkey action/dispatch helpers
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional
+
+
+_log = logging.getLogger(__name__)
+
+# Clamp classes: (min_w, min_h, max_w, max_h)
+CLAMPS: Dict[str, tuple[int, int, int, int]] = {
+    "camera": (320, 240, 1080, 1920),
+    "window": (320, 180, 1920, 1080),
+}
+
+# Screenshot groups whose dict is a single slot rather than a mapping of slots
+_WINDOW_SLOTS = {"hair_reference"}
+
+
+@dataclass(frozen=True, slots=True)
+class HotkeyAction:
+    """One bound hotkey, fully resolved when the config is loaded.
+
+    Everything a press needs (target names, clamped size, parsed reset targets)
+    is computed here once, so dispatch is a dict lookup plus a call. Instances
+    compare by value, which is what the rebinding diff relies on.
+    """
+
+    combo: str
+    kind: str  # scene | screenshot | img_reset | stream | replay | record | macro
+    target: Optional[str] = None
+    slot: Optional[str] = None
+    source: Optional[str] = None
+    update_input: Optional[str] = None
+    width: int = 0
+    height: int = 0
+    clamp: Optional[str] = None
+    requested: Optional[tuple[int, int]] = None
+    targets: tuple[str, ...] = ()
+    confirm_window_sec: int = 0
+
+    @property
+    def clamped(self) -> bool:
+        return self.requested is not None and self.requested != (self.width, self.height)
+
+    def describe(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"kind": self.kind, "target": self.target}
+        if self.slot:
+            out["slot"] = self.slot
+        if self.kind == "screenshot":
+            out.update(
+                {
+                    "source": self.source,
+                    "update_input": self.update_input,
+                    "size": f"{self.width}x{self.height}",
+                    "clamp": self.clamp,
+                }
+            )
+        return out
+
+
+def normalize_combo(combo: Any) -> str:
+    return str(combo or "").strip().lower()
+
+
+def clamp_size(width: int, height: int, clamp: str) -> tuple[int, int]:
+    min_w, min_h, max_w, max_h = CLAMPS.get(clamp, CLAMPS["camera"])
+    return max(min_w, min(int(width), max_w)), max(min_h, min(int(height), max_h))
+
+
+def _as_int(value: Any, default: int) -> int:
+    try:
+        return int(str(value))
+    except (TypeError, ValueError):
+        return default
+
+
+def iter_screenshot_slots(screenshot_cfg: Dict[str, Any]) -> Iterator[tuple[str, Dict[str, Any]]]:
+    """Yield ``(slot_name, slot_cfg)`` for every screenshot slot in the config.
+
+    A group such as ``procedure_before`` maps slot names to slot dicts and may
+    hold any number of them; a dict carrying ``key``/``source`` directly (like
+    ``hair_reference``) is a slot on its own.
+    """
+    for group, value in (screenshot_cfg or {}).items():
+        if not isinstance(value, dict):
+            continue
+        if "key" in value or "source" in value:
+            yield str(group), value
+            continue
+        for name, slot in value.items():
+            if isinstance(slot, dict):
+                yield f"{group}.{name}", slot
+
+
+def _screenshot_action(
+    combo: str,
+    *,
+    slot: Optional[str],
+    source: str,
+    update_input: Optional[str],
+    width: Any,
+    height: Any,
+    clamp: Optional[str],
+    default_size: tuple[int, int],
+    window_size: Optional[tuple[int, int]],
+    window_sources: set[str],
+) -> HotkeyAction:
+    cls = clamp if clamp in CLAMPS else ("window" if source in window_sources else "camera")
+    if width or height:
+        req = (_as_int(width, default_size[0]), _as_int(height, default_size[1]))
+    elif cls == "window" and window_size is not None:
+        req = window_size
+    else:
+        req = default_size
+    w, h = clamp_size(req[0], req[1], cls)
+    return HotkeyAction(
+        combo=combo,
+        kind="screenshot",
+        target=source,
+        slot=slot,
+        source=source,
+        update_input=update_input or None,
+        width=w,
+        height=h,
+        clamp=cls,
+        requested=req,
+    )
+
+
+def compile_actions(cfg: Dict[str, Any], *, default_size: tuple[int, int] = (1080, 1920)) -> Dict[str, HotkeyAction]:
+    """Build the ``combo -> HotkeyAction`` table for a merged hotkeys config.
+
+    Later entries win when two bindings share a combo (a warning is logged):
+    scene maps first, then generic screenshot maps, the legacy scene binding,
+    screenshot slots, image reset, stream toggle, replay save, record toggle
+    and macros.
+    """
+    table: Dict[str, HotkeyAction] = {}
+
+    def put(action: HotkeyAction) -> None:
+        if not action.combo:
+            return
+        prev = table.get(action.combo)
+        if prev is not None and prev != action:
+            _log.warning("hotkey %s bound twice; '%s' replaces '%s'", action.combo, action.target, prev.target)
+        table[action.combo] = action
+
+    # Scenes: scene_map (combo -> scene) merged with scene_hotkeys (scene -> combo)
+    sc_map: Dict[str, str] = {}
+    for combo, scene in (cfg.get("scene_map") or {}).items():
+        sc_map[normalize_combo(combo)] = str(scene)
+    for scene, combo in (cfg.get("scene_hotkeys") or {}).items():
+        if normalize_combo(combo):
+            sc_map[normalize_combo(combo)] = str(scene)
+
+    sc_cfg = cfg.get("screenshot") or {}
+    slots = list(iter_screenshot_slots(sc_cfg))
+    window_sources: set[str] = set()
+    window_size: Optional[tuple[int, int]] = None
+    for name, slot in slots:
+        if name in _WINDOW_SLOTS or slot.get("clamp") == "window":
+            src = str(slot.get("source", "") or "")
+            if src:
+                window_sources.add(src)
+            if window_size is None and name in _WINDOW_SLOTS:
+                window_size = (_as_int(slot.get("width"), 1920), _as_int(slot.get("height"), 1080))
+    # Generic screenshot_map presses update the first slot's input, as before
+    default_update = next((str(s.get("update_input") or "") for _n, s in slots), "") or None
+
+    for combo, scene in sc_map.items():
+        put(HotkeyAction(combo=combo, kind="scene", target=scene))
+
+    for combo, source in (cfg.get("screenshot_map") or {}).items():
+        put(
+            _screenshot_action(
+                normalize_combo(combo),
+                slot=None,
+                source=str(source),
+                update_input=default_update,
+                width=None,
+                height=None,
+                clamp=None,
+                default_size=default_size,
+                window_size=window_size,
+                window_sources=window_sources,
+            )
+        )
+
+    legacy = cfg.get("scene") or {}
+    if legacy.get("name"):
+        put(HotkeyAction(combo=normalize_combo(legacy.get("key")), kind="scene", target=str(legacy["name"])))
+
+    for name, slot in slots:
+        source = str(slot.get("source", "") or "")
+        combo = normalize_combo(slot.get("key"))
+        if not (combo and source):
+            continue
+        put(
+            _screenshot_action(
+                combo,
+                slot=name,
+                source=source,
+                update_input=str(slot.get("update_input", "") or ""),
+                width=slot.get("width"),
+                height=slot.get("height"),
+                clamp=slot.get("clamp") or ("window" if name in _WINDOW_SLOTS else None),
+                default_size=default_size,
+                window_size=window_size,
+                window_sources=window_sources,
+            )
+        )
+
+    imr = cfg.get("img_reset") or {}
+    if normalize_combo(imr.get("key")):
+        raw = str(imr.get("targets", "") or "")
+        put(
+            HotkeyAction(
+                combo=normalize_combo(imr.get("key")),
+                kind="img_reset",
+                target=raw,
+                targets=tuple(t for t in re.split(r"[,;\s]+", raw) if t),
+                confirm_window_sec=max(1, _as_int(imr.get("confirm_window_sec"), 5)),
+            )
+        )
+
+    if normalize_combo(cfg.get("stream_toggle_key")):
+        put(HotkeyAction(combo=normalize_combo(cfg.get("stream_toggle_key")), kind="stream", target="toggle"))
+    if normalize_combo(cfg.get("replay_save_key")):
+        put(HotkeyAction(combo=normalize_combo(cfg.get("replay_save_key")), kind="replay", target="save"))
+    if normalize_combo(cfg.get("record_toggle_key")):
+        put(HotkeyAction(combo=normalize_combo(cfg.get("record_toggle_key")), kind="record", target="toggle"))
+
+    for name, combo in (cfg.get("macro_hotkeys") or {}).items():
+        put(HotkeyAction(combo=normalize_combo(combo), kind="macro", target=str(name)))
+    return table
@@ -0,0 +1,385 @@
+from __future__ import annotations
+
+import json
+import logging
+import platform
+import select
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Protocol
+
+try:
+    import keyboard  # type: ignore
+    _KEYBOARD_AVAILABLE = True
+except Exception:
+    keyboard = None  # type: ignore
+    _KEYBOARD_AVAILABLE = False
+
+try:
+    import evdev  # type: ignore
+    from evdev import ecodes  # type: ignore
+    _EVDEV_AVAILABLE = True
+except Exception:
+    evdev = None  # type: ignore
+    ecodes = None  # type: ignore
+    _EVDEV_AVAILABLE = False
+
+
+_log = logging.getLogger(__name__)
+
+PressCallback = Callable[[], None]
+
+_ALIASES = {
+    "control": "ctrl",
+    "left ctrl": "ctrl",
+    "right ctrl": "ctrl",
+    "left shift": "shift",
+    "right shift": "shift",
+    "left alt": "alt",
+    "right alt": "alt",
+    "altgr": "alt",
+    "win": "windows",
+    "super": "windows",
+    "cmd": "windows",
+    "command": "windows",
+    "meta": "windows",
+    "return": "enter",
+    "esc": "escape",
+}
+
+
+def parse_combo(combo: str) -> frozenset[str]:
+    """``"Alt+Shift+1"`` -> ``{"alt", "shift", "1"}``; order and case do not matter."""
+    keys = []
+    for part in str(combo or "").lower().split("+"):
+        part = part.strip()
+        if part:
+            keys.append(_ALIASES.get(part, part))
+    return frozenset(keys)
+
+
+class InputBackend(Protocol):
+    """Source of global hotkey presses for :class:`app.hotkeys.HotkeyManager`.
+
+    ``add_hotkey`` returns an opaque handle for ``remove_hotkey``; callbacks run
+    on the backend's own thread and must return quickly. ``spawn`` runs an
+    action off that thread.
+    """
+
+    name: str
+    available: bool
+
+    def start(self) -> None: ...
+
+    def stop(self) -> None: ...
+
+    def add_hotkey(self, combo: str, callback: PressCallback) -> Any: ...
+
+    def remove_hotkey(self, handle: Any) -> None: ...
+
+    def spawn(self, fn: Callable[..., None], *args: Any) -> None: ...
+
+
+def _thread_spawn(fn: Callable[..., None], *args: Any) -> None:
+    threading.Thread(target=fn, args=args, name="hotkey-action", daemon=True).start()
+
+
+class KeyboardBackend:
+    """The ``keyboard`` package (Windows hooks / Linux raw devices, needs admin/root)."""
+
+    name = "keyboard"
+
+    def __init__(self) -> None:
+        self.available = _KEYBOARD_AVAILABLE
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def add_hotkey(self, combo: str, callback: PressCallback) -> Any:
+        return keyboard.add_hotkey(combo, callback)
+
+    def remove_hotkey(self, handle: Any) -> None:
+        keyboard.remove_hotkey(handle)
+
+    def spawn(self, fn: Callable[..., None], *args: Any) -> None:
+        keyboard.call_later(fn, args=args)
+
+
+class _ComboMatcher:
+    """Shared press matching for backends that see raw key names."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._bindings: Dict[int, tuple[frozenset[str], PressCallback]] = {}
+        self._by_keys: Dict[frozenset[str], list[int]] = {}
+        self._next = 0
+
+    def add(self, combo: str, callback: PressCallback) -> int:
+        keys = parse_combo(combo)
+        with self._lock:
+            self._next += 1
+            handle = self._next
+            self._bindings[handle] = (keys, callback)
+            self._by_keys.setdefault(keys, []).append(handle)
+        return handle
+
+    def remove(self, handle: Any) -> None:
+        with self._lock:
+            entry = self._bindings.pop(handle, None)
+            if entry is None:
+                return
+            handles = self._by_keys.get(entry[0], [])
+            if handle in handles:
+                handles.remove(handle)
+            if not handles:
+                self._by_keys.pop(entry[0], None)
+
+    def fire(self, keys: frozenset[str]) -> int:
+        with self._lock:
+            callbacks = [self._bindings[h][1] for h in self._by_keys.get(keys, ())]
+        for cb in callbacks:
+            try:
+                cb()
+            except Exception as exc:
+                _log.warning("hotkey callback failed for %s: %s", "+".join(sorted(keys)), exc)
+        return len(callbacks)
+
+
+def _evdev_key_name(code: int) -> Optional[str]:
+    name = ecodes.KEY.get(code) if ecodes is not None else None
+    if isinstance(name, list):
+        name = name[0]
+    if not name or not str(name).startswith("KEY_"):
+        return None
+    key = str(name)[4:].lower()
+    for side in ("left", "right"):
+        if key.startswith(side) and key[len(side):] in {"ctrl", "shift", "alt", "meta"}:
+            key = key[len(side):]
+            break
+    return _ALIASES.get(key, key)
+
+
+class EvdevBackend:
+    """Linux ``/dev/input`` reader via python-evdev; works without X/Wayland.
+
+    Reads every device that reports letter keys and matches the currently held
+    modifiers plus the pressed key against registered combos. Auto-repeat events
+    are ignored. The user needs read access to the event devices (``input`` group).
+    """
+
+    name = "evdev"
+    _MODIFIERS = {"ctrl", "shift", "alt", "windows"}
+
+    def __init__(self, device_paths: Iterable[str] | None = None) -> None:
+        self.available = _EVDEV_AVAILABLE and platform.system().lower() == "linux"
+        self._paths = list(device_paths or [])
+        self._devices: list[Any] = []
+        self._matcher = _ComboMatcher()
+        self._held: set[str] = set()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _open_devices(self) -> list[Any]:
+        paths = self._paths or list(evdev.list_devices())
+        devices = []
+        for path in paths:
+            try:
+                dev = evdev.InputDevice(path)
+                keys = dev.capabilities().get(ecodes.EV_KEY, [])
+                if ecodes.KEY_A in keys or self._paths:
+                    devices.append(dev)
+                else:
+                    dev.close()
+            except Exception as exc:
+                _log.debug("evdev: skip %s: %s", path, exc)
+        return devices
+
+    def start(self) -> None:
+        if not self.available or (self._thread and self._thread.is_alive()):
+            return
+        self._devices = self._open_devices()
+        if not self._devices:
+            _log.warning("evdev: no readable keyboard devices (check /dev/input permissions)")
+            self.available = False
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._read_loop, name="evdev-reader", daemon=True)
+        self._thread.start()
+        _log.info("evdev: reading %s", ", ".join(d.path for d in self._devices))
+
+    def _read_loop(self) -> None:
+        fds = {dev.fd: dev for dev in self._devices}
+        while not self._stop.is_set():
+            try:
+                ready, _, _ = select.select(list(fds), [], [], 0.2)
+            except (OSError, ValueError):
+                break
+            for fd in ready:
+                try:
+                    events = list(fds[fd].read())
+                except (BlockingIOError, OSError):
+                    continue
+                for ev in events:
+                    if ev.type == ecodes.EV_KEY:
+                        self._on_key(ev.code, ev.value)
+
+    def _on_key(self, code: int, value: int) -> None:
+        key = _evdev_key_name(code)
+        if key is None:
+            return
+        if value == 0:
+            self._held.discard(key)
+            return
+        if value != 1:  # 2 = auto-repeat
+            return
+        if key in self._MODIFIERS:
+            self._held.add(key)
+            return
+        mods = self._held & self._MODIFIERS
+        self._matcher.fire(frozenset(mods | {key}))
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+        for dev in self._devices:
+            try:
+                dev.close()
+            except Exception:
+                pass
+        self._devices = []
+        self._held.clear()
+
+    def add_hotkey(self, combo: str, callback: PressCallback) -> Any:
+        return self._matcher.add(combo, callback)
+
+    def remove_hotkey(self, handle: Any) -> None:
+        self._matcher.remove(handle)
+
+    def spawn(self, fn: Callable[..., None], *args: Any) -> None:
+        _thread_spawn(fn, *args)
+
+
+ScriptEvent = tuple[float, str]
+
+
+def load_script(path: Path) -> list[ScriptEvent]:
+    """Read a press script: JSON ``[[t, combo], ...]`` or text lines ``<t> <combo>``.
+
+    ``t`` is seconds from the start of the replay; ``#`` starts a comment.
+    """
+    text = Path(path).read_text(encoding="utf-8")
+    if text.lstrip().startswith("["):
+        return sorted((float(t), str(c)) for t, c in json.loads(text))
+    events: list[ScriptEvent] = []
+    for line in text.splitlines():
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        t, combo = line.split(None, 1)
+        events.append((float(t), combo.strip()))
+    return sorted(events)
+
+
+class SimulatedBackend:
+    """Synthetic input: presses come from ``press()`` or a timed script replay.
+
+    Lets the hotkey pipeline (bindings, policies, actions) run headless, e.g.
+    against a fake OBS in benchmarks and CI.
+    """
+
+    name = "simulated"
+    available = True
+
+    def __init__(self, script: list[ScriptEvent] | None = None, *, speed: float = 1.0) -> None:
+        self.script = list(script or [])
+        self.speed = max(0.01, float(speed))
+        self._matcher = _ComboMatcher()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.pressed = 0
+        self.unmatched = 0
+
+    def start(self) -> None:
+        self._stop.clear()
+        if self.script and not (self._thread and self._thread.is_alive()):
+            self._thread = threading.Thread(target=self.replay, args=(self.script,), name="hotkey-replay", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+
+    def press(self, combo: str) -> int:
+        """Deliver one press now (on the caller's thread); returns matched bindings."""
+        self.pressed += 1
+        n = self._matcher.fire(parse_combo(combo))
+        if n == 0:
+            self.unmatched += 1
+        return n
+
+    def replay(self, events: Iterable[ScriptEvent]) -> float:
+        """Press each combo at its scripted offset (scaled by ``speed``); returns lateness max."""
+        t0 = time.perf_counter()
+        worst = 0.0
+        for offset, combo in events:
+            due = t0 + float(offset) / self.speed
+            delay = due - time.perf_counter()
+            if delay > 0 and self._stop.wait(delay):
+                break
+            worst = max(worst, time.perf_counter() - due)
+            self.press(combo)
+        return worst
+
+    def add_hotkey(self, combo: str, callback: PressCallback) -> Any:
+        return self._matcher.add(combo, callback)
+
+    def remove_hotkey(self, handle: Any) -> None:
+        self._matcher.remove(handle)
+
+    def spawn(self, fn: Callable[..., None], *args: Any) -> None:
+        _thread_spawn(fn, *args)
+
+
+class NullBackend:
+    name = "none"
+    available = False
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def add_hotkey(self, combo: str, callback: PressCallback) -> Any:
+        return None
+
+    def remove_hotkey(self, handle: Any) -> None:
+        pass
+
+    def spawn(self, fn: Callable[..., None], *args: Any) -> None:
+        _thread_spawn(fn, *args)
+
+
+def create_backend(name: str = "auto", *, script: str | None = None) -> InputBackend:
+    """``auto`` prefers ``keyboard``, then evdev on Linux, else a disabled backend."""
+    choice = (name or "auto").strip().lower()
+    if choice == "simulated":
+        events = load_script(Path(script)) if script else []
+        return SimulatedBackend(events)
+    if choice in {"auto", "keyboard"} and _KEYBOARD_AVAILABLE:
+        return KeyboardBackend()
+    if choice in {"auto", "evdev"}:
+        backend = EvdevBackend()
+        if backend.available:
+            return backend
+    if choice not in {"auto", "none"}:
+        _log.warning("hotkey backend '%s' unavailable; hotkeys disabled", choice)
+    return NullBackend()
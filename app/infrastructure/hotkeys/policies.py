@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from prometheus_client import Counter
+
+from app.infrastructure.hotkeys.actions import HotkeyAction
+
+
+COUNTER_HOTKEY_SUPPRESSED = Counter(
+    "app_hotkey_suppressed_total",
+    "Hotkey presses dropped or merged by the per-kind press policy",
+    ["kind", "reason"],
+)
+
+
+@dataclass(frozen=True, slots=True)
+class HotkeyPolicy:
+    """How bursts of presses for one action kind are handled.
+
+    ``debounce_ms``: ignore a press arriving within this window of the previous
+    press of the same combo (measured from the last press, so a held key that
+    auto-repeats only fires once).
+    ``drop_in_flight``: ignore a press while the same combo is still running.
+    ``coalesce``: at most one action of this kind runs at a time; presses made
+    meanwhile replace each other and only the last one runs afterwards.
+    """
+
+    debounce_ms: int = 0
+    drop_in_flight: bool = False
+    coalesce: bool = False
+
+
+DEFAULT_POLICIES: Dict[str, HotkeyPolicy] = {
+    "screenshot": HotkeyPolicy(debounce_ms=300, drop_in_flight=True),
+    "scene": HotkeyPolicy(coalesce=True),
+    # Short window: swallows auto-repeat but still allows the deliberate second press
+    "img_reset": HotkeyPolicy(debounce_ms=250),
+    "stream": HotkeyPolicy(debounce_ms=1000, drop_in_flight=True),
+    "macro": HotkeyPolicy(debounce_ms=300, drop_in_flight=True),
+    "replay": HotkeyPolicy(debounce_ms=1000, drop_in_flight=True),
+    "record": HotkeyPolicy(debounce_ms=1000, drop_in_flight=True),
+}
+
+
+def compile_policies(cfg: Dict[str, Any]) -> Dict[str, HotkeyPolicy]:
+    """Merge the optional ``policies`` section of hotkeys.json over the defaults."""
+    out = dict(DEFAULT_POLICIES)
+    for kind, raw in (cfg.get("policies") or {}).items():
+        if not isinstance(raw, dict):
+            continue
+        base = out.get(str(kind), HotkeyPolicy())
+        try:
+            debounce = max(0, int(raw.get("debounce_ms", base.debounce_ms)))
+        except (TypeError, ValueError):
+            debounce = base.debounce_ms
+        out[str(kind)] = HotkeyPolicy(
+            debounce_ms=debounce,
+            drop_in_flight=bool(raw.get("drop_in_flight", base.drop_in_flight)),
+            coalesce=bool(raw.get("coalesce", base.coalesce)),
+        )
+    return out
+
+
+Spawn = Callable[..., None]
+
+
+class PressGate:
+    """Apply :class:`HotkeyPolicy` to presses before they reach the handlers.
+
+    ``submit`` is called on the keyboard hook thread and never blocks on an
+    action; accepted actions are handed to ``spawn`` (a worker thread).
+    """
+
+    def __init__(self, spawn: Spawn, policies: Optional[Dict[str, HotkeyPolicy]] = None) -> None:
+        self._spawn = spawn
+        # Replaced wholesale on config reload
+        self.policies: Dict[str, HotkeyPolicy] = dict(policies or DEFAULT_POLICIES)
+        self._lock = threading.Lock()
+        self._last_press: Dict[str, float] = {}
+        self._busy: set[str] = set()
+        self._pending: Dict[str, tuple[HotkeyAction, Callable[[HotkeyAction], None]]] = {}
+        self._suppressed: Dict[tuple[str, str], int] = {}
+
+    def _suppress(self, action: HotkeyAction, reason: str) -> None:
+        COUNTER_HOTKEY_SUPPRESSED.labels(action.kind, reason).inc()
+        key = (action.kind, reason)
+        self._suppressed[key] = self._suppressed.get(key, 0) + 1
+
+    def submit(self, action: HotkeyAction, run: Callable[[HotkeyAction], None]) -> bool:
+        """Returns True if the press was accepted (run now or queued as last-wins)."""
+        policy = self.policies.get(action.kind) or HotkeyPolicy()
+        now = time.monotonic()
+        with self._lock:
+            last = self._last_press.get(action.combo)
+            self._last_press[action.combo] = now
+            if policy.debounce_ms and last is not None and (now - last) * 1000.0 < policy.debounce_ms:
+                self._suppress(action, "debounce")
+                return False
+            if policy.coalesce:
+                slot = f"kind:{action.kind}"
+                if slot in self._busy:
+                    if slot in self._pending:
+                        self._suppress(self._pending[slot][0], "coalesced")
+                    self._pending[slot] = (action, run)
+                    return True
+            else:
+                slot = f"combo:{action.combo}"
+                if policy.drop_in_flight and slot in self._busy:
+                    self._suppress(action, "in_flight")
+                    return False
+            self._busy.add(slot)
+        self._spawn(self._run, slot, action, run)
+        return True
+
+    def _run(self, slot: str, action: HotkeyAction, run: Callable[[HotkeyAction], None]) -> None:
+        current: Optional[tuple[HotkeyAction, Callable[[HotkeyAction], None]]] = (action, run)
+        while current is not None:
+            try:
+                current[1](current[0])
+            finally:
+                with self._lock:
+                    current = self._pending.pop(slot, None)
+                    if current is None:
+                        self._busy.discard(slot)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            suppressed: Dict[str, Dict[str, int]] = {}
+            for (kind, reason), n in self._suppressed.items():
+                suppressed.setdefault(kind, {})[reason] = n
+            return {
+                "in_flight": sorted(self._busy),
+                "pending": {slot: a.target for slot, (a, _run) in self._pending.items()},
+                "suppressed": suppressed,
+            }
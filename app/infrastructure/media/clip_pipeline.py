@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import json
+import logging
+import shutil
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.infrastructure.cleanup.screenshot_retention import CLIP_EXTS, ScreenshotRetention, cleanup_once, clip_retention_store
+from app.infrastructure.media.clip_worker import process_clip
+from app.infrastructure.media.process_pool import SpawnPool
+from app.utils.screenshot import build_screenshot_path
+
+
+_log = logging.getLogger(__name__)
+
+INDEX_FILE = "index.jsonl"
+
+CNT_CLIPS = Counter(
+    "app_clips_total",
+    "Replay/recording clips through the post-processing pipeline",
+    ["kind", "outcome"],
+)
+CNT_CLIP_STAGE = Counter(
+    "app_clip_stage_total",
+    "Clip pipeline stage results (index, remux, thumbnail, retention)",
+    ["stage", "outcome"],
+)
+CNT_CLIP_BYTES = Counter("app_clip_bytes_total", "Bytes of clips indexed by the pipeline")
+HIST_CLIP_STAGE_SECONDS = Histogram(
+    "app_clip_stage_seconds",
+    "Time spent in one clip pipeline stage",
+    ["stage"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
+)
+HIST_CLIP_PIPELINE_SECONDS = Histogram(
+    "app_clip_pipeline_seconds",
+    "Clip hand-off to indexed result, including time queued for a worker",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
+)
+GAUGE_CLIP_QUEUE = Gauge("app_clip_queue_depth", "Clips queued or being processed")
+
+
+class ClipPipeline:
+    """Post-process replay and recording files in a process pool.
+
+    ``submit`` returns at once; a worker process waits for the file to settle,
+    moves it into ``root/YYYY/MM/DD`` (the screenshot layout), hashes it and,
+    when ffmpeg is available, remuxes and thumbnails it. Results are appended
+    to the day's ``index.jsonl`` by this process only, and every finished clip
+    runs the shared retention sweep over ``root`` once ``interval_sec`` has
+    passed (``config/clip_retention.json``). Completion callbacks run on the
+    pool's thread, so hotkey threads can hand clips off without an event loop.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        *,
+        workers: int = 2,
+        remux: str = "mp4",
+        thumbnail: bool = True,
+        keep_original: bool = False,
+        ffmpeg: Optional[str] = "ffmpeg",
+        history: int = 50,
+    ) -> None:
+        self.root = Path(root)
+        self._pool = SpawnPool(workers)
+        self.workers = self._pool.workers
+        self.remux = str(remux or "").lstrip(".").lower()
+        self.thumbnail = bool(thumbnail)
+        self.keep_original = bool(keep_original)
+        self.ffmpeg = shutil.which(ffmpeg) if ffmpeg else None
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, dict] = {}
+        self._recent: deque[dict] = deque(maxlen=max(1, int(history)))
+        self._seq = 0
+        self._last_sweep: Optional[float] = None
+        self._last_retention: Optional[dict] = None
+        self._totals = {"clips": 0, "failed": 0, "bytes": 0, "busy_seconds": 0.0}
+        self._started = time.monotonic()
+
+    def submit(self, src: str, *, kind: str = "replay") -> Future:
+        """Queue ``src`` (a file OBS just wrote); the future resolves to its index entry."""
+        suffix = Path(src).suffix.lstrip(".") or "mkv"
+        dest = build_screenshot_path(kind, image_format=suffix, base_dir=str(self.root))
+        with self._lock:
+            self._seq += 1
+            job_id = f"{kind}-{self._seq}"
+        job = {
+            "src": src,
+            "dest": dest,
+            "remux": self.remux,
+            "thumbnail": self.thumbnail,
+            "ffmpeg": self.ffmpeg,
+            "keep_original": self.keep_original,
+        }
+        meta = {"id": job_id, "kind": kind, "src": src, "queued_at": datetime.now().isoformat(timespec="seconds"), "t0": time.perf_counter()}
+        fut = self._pool.submit(process_clip, job)
+        # Registered only once queued, so a failed submit leaves no pending job behind
+        with self._lock:
+            self._jobs[job_id] = meta
+        GAUGE_CLIP_QUEUE.inc()
+        result: Future = Future()
+        fut.add_done_callback(lambda f: self._finish(meta, f, result))
+        _log.info("clip queued: %s %s", job_id, src)
+        return result
+
+    def _finish(self, meta: dict, fut: Future, result: Future) -> None:
+        GAUGE_CLIP_QUEUE.dec()
+        with self._lock:
+            self._jobs.pop(meta["id"], None)
+        try:
+            entry = fut.result()
+        except Exception as exc:  # noqa: BLE001  (worker died / pool shut down)
+            entry = {"src": meta["src"], "path": None, "bytes": 0, "stages": {}, "error": f"worker: {exc}"}
+        elapsed = time.perf_counter() - meta["t0"]
+        entry.update({"id": meta["id"], "kind": meta["kind"], "queued_at": meta["queued_at"], "ms": round(elapsed * 1000.0, 2)})
+        busy = 0.0
+        for stage, info in entry.get("stages", {}).items():
+            CNT_CLIP_STAGE.labels(stage=stage, outcome=info["outcome"]).inc()
+            HIST_CLIP_STAGE_SECONDS.labels(stage=stage).observe(info["ms"] / 1000.0)
+            busy += info["ms"] / 1000.0
+        ok = entry.get("error") is None
+        CNT_CLIPS.labels(kind=meta["kind"], outcome="ok" if ok else "failed").inc()
+        HIST_CLIP_PIPELINE_SECONDS.observe(elapsed)
+        if ok:
+            CNT_CLIP_BYTES.inc(entry["bytes"])
+            try:
+                self._append_index(entry)
+            except Exception as exc:  # noqa: BLE001
+                _log.warning("clip index append failed for %s: %s", entry["path"], exc)
+            _log.info("clip ready: %s -> %s (%.0f ms)", meta["id"], entry["path"], elapsed * 1000.0)
+        else:
+            _log.warning("clip processing failed: %s %s — %s", meta["id"], meta["src"], entry["error"])
+        with self._lock:
+            self._totals["clips"] += 1
+            self._totals["failed"] += 0 if ok else 1
+            self._totals["bytes"] += entry.get("bytes") or 0
+            self._totals["busy_seconds"] += busy
+            self._recent.appendleft(entry)
+        self._maybe_sweep()
+        result.set_result(entry)
+
+    def _append_index(self, entry: dict) -> None:
+        line = {k: v for k, v in entry.items() if k not in {"src"}}
+        index = Path(entry["path"]).parent / INDEX_FILE
+        with index.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+    def _maybe_sweep(self) -> None:
+        try:
+            cfg = ScreenshotRetention(**clip_retention_store.load())
+        except Exception:
+            cfg = ScreenshotRetention(days=30)
+        now = time.monotonic()
+        with self._lock:
+            if not cfg.enabled or cfg.days <= 0:
+                return
+            if self._last_sweep is not None and now - self._last_sweep < max(30, int(cfg.interval_sec)):
+                return
+            self._last_sweep = now
+        t0 = time.perf_counter()
+        try:
+            res = cleanup_once([self.root], days=cfg.days, exts=CLIP_EXTS)
+            outcome = "ok"
+            _log.info("clip retention: checked=%s deleted=%s bytes=%s", res["checked"], res["deleted"], res["bytes_deleted"])
+        except Exception as exc:  # noqa: BLE001
+            res, outcome = {"error": str(exc)}, "failed"
+        CNT_CLIP_STAGE.labels(stage="retention", outcome=outcome).inc()
+        HIST_CLIP_STAGE_SECONDS.labels(stage="retention").observe(time.perf_counter() - t0)
+        self._last_retention = res
+
+    def index(self, day: str) -> list[dict]:
+        """Entries from ``YYYY-MM-DD``'s index file, oldest first."""
+        y, m, d = datetime.strptime(day, "%Y-%m-%d").strftime("%Y %m %d").split()
+        path = self.root / y / m / d / INDEX_FILE
+        if not path.is_file():
+            return []
+        out = []
+        for line in path.read_text(encoding="utf-8").splitlines():
+            try:
+                out.append(json.loads(line))
+            except ValueError:
+                continue
+        return out
+
+    def stats(self) -> dict:
+        with self._lock:
+            totals = dict(self._totals)
+            pending = [{k: v for k, v in j.items() if k != "t0"} for j in self._jobs.values()]
+            recent = list(self._recent)
+        uptime = max(1e-9, time.monotonic() - self._started)
+        busy = totals.pop("busy_seconds")
+        return {
+            "root": str(self.root),
+            "workers": self.workers,
+            "ffmpeg": self.ffmpeg,
+            "remux": self.remux or None,
+            "thumbnail": self.thumbnail,
+            **totals,
+            "pending": pending,
+            "throughput": {
+                "clips_per_min": round(totals["clips"] * 60.0 / uptime, 3),
+                # Over worker busy time, i.e. what the pool sustains while it has work
+                "mb_per_sec": round(totals["bytes"] / busy / 1e6, 3) if busy else None,
+            },
+            "last_retention": self._last_retention,
+            "recent": recent,
+        }
+
+    def shutdown(self, *, wait: bool = False) -> None:
+        self._pool.shutdown(wait=wait)
+
+
+_PIPELINE: Optional[ClipPipeline] = None
+
+
+def get_clip_pipeline() -> ClipPipeline:
+    global _PIPELINE
+    if _PIPELINE is None:
+        from app.config import settings
+
+        _PIPELINE = ClipPipeline(
+            settings.clip_dir,
+            workers=int(settings.clip_workers),
+            remux=str(settings.clip_remux_format),
+            thumbnail=bool(settings.clip_thumbnails),
+            keep_original=bool(settings.clip_keep_original),
+            ffmpeg=settings.ffmpeg_path or None,
+        )
+    return _PIPELINE
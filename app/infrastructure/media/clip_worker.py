@@ -0,0 +1,145 @@
+"""Clip post-processing steps, run inside worker processes.
+
+Standard library only: a spawned worker imports this module and nothing from
+the app (no settings, no OBS client, no metrics registry).
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import subprocess
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+def _wait_stable(path: Path, *, timeout: float, interval: float = 0.2) -> int:
+    # OBS may still be flushing the container when it reports the path
+    deadline = time.monotonic() + timeout
+    last = -1
+    while True:
+        size = path.stat().st_size
+        if size == last and size > 0:
+            return size
+        if time.monotonic() >= deadline:
+            return size
+        last = size
+        time.sleep(interval)
+
+
+def _unique(dest: Path) -> Path:
+    if not dest.exists():
+        return dest
+    for n in range(1, 1000):
+        cand = dest.with_name(f"{dest.stem}_{n}{dest.suffix}")
+        if not cand.exists():
+            return cand
+    raise FileExistsError(str(dest))
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _ffmpeg(ffmpeg: str, args: list[str], timeout: float) -> Optional[str]:
+    """Run ffmpeg; returns an error string, ``None`` on success."""
+    try:
+        proc = subprocess.run(
+            [ffmpeg, "-hide_banner", "-nostdin", "-y", "-v", "error", *args],
+            capture_output=True,
+            timeout=timeout,
+        )
+    except (OSError, subprocess.TimeoutExpired) as exc:
+        return str(exc)
+    if proc.returncode != 0:
+        return (proc.stderr.decode("utf-8", "replace").strip().splitlines() or [f"exit {proc.returncode}"])[-1]
+    return None
+
+
+def process_clip(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Index, optionally remux and thumbnail one clip; never raises.
+
+    ``job``: ``src`` (file OBS wrote), ``dest`` (target path in the dated clip
+    layout), ``remux`` (container extension or ``""``), ``thumbnail`` (bool),
+    ``ffmpeg`` (executable path or ``None``), ``keep_original`` (bool),
+    ``stable_timeout`` and ``ffmpeg_timeout`` (seconds). Returns the index entry
+    with per-stage ``{"outcome": ok|skipped|failed, "ms": ...}``.
+    """
+    out: Dict[str, Any] = {"src": job["src"], "path": None, "bytes": 0, "stages": {}, "error": None}
+    stages = out["stages"]
+
+    def stage(name: str, t0: float, outcome: str, error: Optional[str] = None) -> None:
+        stages[name] = {"outcome": outcome, "ms": round((time.perf_counter() - t0) * 1000.0, 2)}
+        if error:
+            stages[name]["error"] = error
+
+    # index: wait for the file to settle, move it into the dated layout, fingerprint it
+    t0 = time.perf_counter()
+    try:
+        src = Path(job["src"])
+        _wait_stable(src, timeout=float(job.get("stable_timeout", 10.0)))
+        dest = _unique(Path(job["dest"]))
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(src), str(dest))
+        out["path"] = str(dest)
+        out["bytes"] = dest.stat().st_size
+        out["sha256"] = _sha256(dest)
+        stage("index", t0, "ok")
+    except Exception as exc:  # noqa: BLE001
+        stage("index", t0, "failed", str(exc))
+        out["error"] = f"index: {exc}"
+        return out
+
+    ffmpeg = job.get("ffmpeg")
+    ffmpeg_timeout = float(job.get("ffmpeg_timeout", 300.0))
+    path = dest
+
+    # remux: stream copy into another container (OBS records mkv for crash safety)
+    t0 = time.perf_counter()
+    remux = str(job.get("remux") or "").lstrip(".").lower()
+    if not remux or path.suffix.lower() == f".{remux}" or not ffmpeg:
+        stage("remux", t0, "skipped")
+    else:
+        target = _unique(path.with_suffix(f".{remux}"))
+        args = ["-i", str(path), "-map", "0", "-c", "copy"]
+        if remux in {"mp4", "mov", "m4v"}:
+            args += ["-movflags", "+faststart"]
+        error = _ffmpeg(ffmpeg, [*args, str(target)], ffmpeg_timeout)
+        if error is None:
+            if not job.get("keep_original"):
+                path.unlink(missing_ok=True)
+            else:
+                out["original"] = str(path)
+            path = target
+            out["path"] = str(path)
+            out["bytes"] = path.stat().st_size
+            stage("remux", t0, "ok")
+        else:
+            try:
+                target.unlink(missing_ok=True)
+            except OSError:
+                pass
+            stage("remux", t0, "failed", error)
+
+    # thumbnail: one frame a second in (the very first frame is often black)
+    t0 = time.perf_counter()
+    if not job.get("thumbnail") or not ffmpeg:
+        stage("thumbnail", t0, "skipped")
+    else:
+        thumb = path.with_suffix(".jpg")
+        base = ["-frames:v", "1", "-vf", "scale=320:-2", str(thumb)]
+        error = _ffmpeg(ffmpeg, ["-ss", "1", "-i", str(path), *base], ffmpeg_timeout)
+        if error is not None or not thumb.exists():
+            error = _ffmpeg(ffmpeg, ["-i", str(path), *base], ffmpeg_timeout)
+        if error is None and thumb.exists():
+            out["thumbnail"] = str(thumb)
+            stage("thumbnail", t0, "ok")
+        else:
+            stage("thumbnail", t0, "failed", error or "no frame written")
+    out["pid"] = os.getpid()
+    return out
@@ -0,0 +1,172 @@
+"""Before/after compositing, run inside worker processes.
+
+Needs Pillow and numpy (``pip install pillow numpy``); the app imports this
+module only once a composite is actually requested. Pixel work is done on whole arrays:
+resizes are Pillow's C resampler, crops are slices, and blends, label bands
+and animation frames are numpy broadcasts.
+"""
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+
+BG = 255  # white, like the img_ba_frame template
+LABEL_BAND = 0.1  # fraction of a cell darkened under the BEFORE/AFTER label
+
+
+def _open_rgb(path: str) -> Image.Image:
+    with Image.open(path) as im:
+        return im.convert("RGB")
+
+
+def _cover(im: Image.Image, w: int, h: int) -> np.ndarray:
+    """Scale to fill ``w x h`` and center-crop the overflow."""
+    scale = max(w / im.width, h / im.height)
+    rw, rh = max(w, round(im.width * scale)), max(h, round(im.height * scale))
+    arr = np.asarray(im.resize((rw, rh), Image.LANCZOS))
+    x0, y0 = (rw - w) // 2, (rh - h) // 2
+    return arr[y0 : y0 + h, x0 : x0 + w]
+
+
+def _font(size: int) -> ImageFont.ImageFont:
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:  # Pillow < 10.1: fixed-size bitmap font
+        return ImageFont.load_default()
+
+
+def _label(cell: np.ndarray, text: str) -> np.ndarray:
+    h, w = cell.shape[:2]
+    band = max(12, int(h * LABEL_BAND))
+    out = cell.copy()
+    out[-band:] = (out[-band:].astype(np.uint16) * 110 // 255).astype(np.uint8)
+    im = Image.fromarray(out)
+    draw = ImageDraw.Draw(im)
+    font = _font(max(10, band * 11 // 20))
+    x0, y0, x1, y1 = draw.textbbox((0, 0), text, font=font)
+    draw.text(((w - (x1 - x0)) // 2 - x0, h - band + (band - (y1 - y0)) // 2 - y0), text, fill=(255, 255, 255), font=font)
+    return np.asarray(im)
+
+
+def _cell_size(first: Image.Image, height: int) -> tuple[int, int]:
+    # Every cell takes the aspect of the first before shot
+    height = max(64, int(height))
+    return max(64, round(first.width * height / first.height)), height
+
+
+def _grid(cells: list[list[np.ndarray]], gap: int) -> np.ndarray:
+    rows, cols = len(cells), max(len(r) for r in cells)
+    ch, cw = cells[0][0].shape[:2]
+    canvas = np.full((rows * ch + (rows + 1) * gap, cols * cw + (cols + 1) * gap, 3), BG, dtype=np.uint8)
+    for r, row in enumerate(cells):
+        for c, cell in enumerate(row):
+            y, x = gap + r * (ch + gap), gap + c * (cw + gap)
+            canvas[y : y + ch, x : x + cw] = cell
+    return canvas
+
+
+def _panels(alpha: np.ndarray) -> list[tuple[int, int, int, int]]:
+    """Opaque column runs of the frame template: ``[(x0, x1, y0, y1), ...]`` left to right."""
+    cols = (alpha > 0).any(axis=0)
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], cols.astype(np.int8), [0]))))
+    out = []
+    for x0, x1 in zip(edges[::2], edges[1::2]):
+        rows = np.flatnonzero((alpha[:, x0:x1] > 0).any(axis=1))
+        out.append((int(x0), int(x1), int(rows[0]), int(rows[-1]) + 1))
+    return out
+
+
+def _framed(before: Image.Image, after: Image.Image, frame_path: str) -> np.ndarray:
+    with Image.open(frame_path) as fr:
+        rgba = np.asarray(fr.convert("RGBA"))
+    a = rgba[..., 3:4].astype(np.float32) / 255.0
+    canvas = (rgba[..., :3] * a + BG * (1.0 - a)).astype(np.uint8)
+    panels = _panels(rgba[..., 3])
+    if len(panels) < 2:
+        raise ValueError(f"frame {frame_path}: expected two panels, found {len(panels)}")
+    for im, (x0, x1, y0, y1) in zip((before, after), panels[:2]):
+        # Keep the template's own BEFORE/AFTER label strip at the bottom of each panel
+        h = y1 - y0 - int((y1 - y0) * LABEL_BAND * 1.25)
+        canvas[y0 : y0 + h, x0:x1] = _cover(im, x1 - x0, h)
+    return canvas
+
+
+def _save(arr_or_frames: Any, out: str, *, palette_from: Any = None, **kwargs: Any) -> None:
+    path = Path(out)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    fmt = "GIF" if path.suffix.lower() == ".gif" else path.suffix.lstrip(".").upper().replace("JPG", "JPEG")
+    if isinstance(arr_or_frames, list):
+        # One palette for every frame (from ``palette_from``): no per-frame colour shifts
+        palette = Image.fromarray(arr_or_frames[0] if palette_from is None else palette_from).quantize(256, method=Image.MEDIANCUT)
+        first, *rest = [Image.fromarray(f).quantize(palette=palette, dither=Image.FLOYDSTEINBERG) for f in arr_or_frames]
+        first.save(tmp, format=fmt, save_all=True, append_images=rest, loop=0, **kwargs)
+    else:
+        Image.fromarray(arr_or_frames).save(tmp, format=fmt, **kwargs)
+    os.replace(tmp, path)
+
+
+def render_still(job: Dict[str, Any]) -> Dict[str, Any]:
+    """``job``: ``pairs`` ([{"view", "before", "after"}]), ``layout`` (side | grid |
+    frame), ``height`` (cell height), ``gap``, ``labels``, ``frame`` (template
+    path, for layout=frame), ``out``."""
+    t0 = time.perf_counter()
+    pairs = job["pairs"]
+    imgs = [(_open_rgb(p["before"]), _open_rgb(p["after"])) for p in pairs]
+    if job["layout"] == "frame":
+        canvas = _framed(imgs[0][0], imgs[0][1], job["frame"])
+    else:
+        cw, ch = _cell_size(imgs[0][0], job.get("height", 960))
+        labels = bool(job.get("labels", True))
+        cells = []
+        for b, a in imgs:
+            bc, ac = _cover(b, cw, ch), _cover(a, cw, ch)
+            cells.append([_label(bc, "BEFORE"), _label(ac, "AFTER")] if labels else [bc, ac])
+        if job["layout"] == "grid":
+            # befores on the first row, afters on the second
+            cells = [list(col) for col in zip(*cells)]
+        canvas = _grid(cells, int(job.get("gap", 16)))
+    _save(canvas, job["out"], **({"quality": 92} if job["out"].lower().endswith((".jpg", ".jpeg")) else {}))
+    return {"out": job["out"], "width": int(canvas.shape[1]), "height": int(canvas.shape[0]), "ms": round((time.perf_counter() - t0) * 1000.0, 2)}
+
+
+def render_animation(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Short looping comparison of one pair: ``mode`` wipe (a divider sweeps
+    before -> after) or fade; ``frames`` per transition, ``frame_ms``,
+    ``hold_ms`` at both ends, ``max_side`` in pixels, ``out`` (.gif)."""
+    t0 = time.perf_counter()
+    pair = job["pairs"][0]
+    before, after = _open_rgb(pair["before"]), _open_rgb(pair["after"])
+    scale = min(1.0, int(job.get("max_side", 720)) / max(before.width, before.height))
+    w, h = max(16, round(before.width * scale)), max(16, round(before.height * scale))
+    b = _cover(before, w, h)
+    a = _cover(after, w, h)
+    if job.get("labels", True):
+        b, a = _label(b, "BEFORE"), _label(a, "AFTER")
+    n = max(2, int(job.get("frames", 16)))
+    t = np.linspace(0.0, 1.0, n, dtype=np.float32)
+    if job.get("mode", "wipe") == "fade":
+        tt = t[:, None, None, None]
+        ramp = (b[None].astype(np.float32) * (1.0 - tt) + a[None].astype(np.float32) * tt).astype(np.uint8)
+    else:
+        edge = (t * w).astype(np.int32)
+        mask = np.arange(w)[None, None, :, None] < edge[:, None, None, None]
+        ramp = np.where(mask, a[None], b[None])
+        # Divider line at the sweep position
+        x = np.clip(edge, 0, w - 2)
+        ramp[np.arange(n)[:, None], :, x[:, None] + np.array([0, 1])[None, :]] = 255
+    frames = [b, *list(ramp), a, *list(ramp[::-1])]
+    step, hold = int(job.get("frame_ms", 60)), int(job.get("hold_ms", 900))
+    durations = [hold] + [step] * n + [hold] + [step] * n
+    _save(frames, job["out"], palette_from=np.concatenate([b, a]), duration=durations, disposal=1)
+    return {"out": job["out"], "width": w, "height": h, "frames": len(frames), "ms": round((time.perf_counter() - t0) * 1000.0, 2)}
+
+
+def render(job: Dict[str, Any]) -> Dict[str, Any]:
+    return render_animation(job) if job.get("kind") == "animation" else render_still(job)
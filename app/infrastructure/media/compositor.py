@@ -0,0 +1,358 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, timedelta
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from prometheus_client import Counter, Histogram
+
+from app.infrastructure.config.hotkeys_config import load_hotkey_config
+from app.infrastructure.hotkeys.actions import iter_screenshot_slots
+from app.infrastructure.media.process_pool import SpawnPool
+from app.obs_client import obs_manager
+from app.utils.screenshot import build_screenshot_path
+
+
+_log = logging.getLogger(__name__)
+
+BEFORE_GROUP = "procedure_before"
+AFTER_GROUP = "procedure_after"
+KINDS = ("image", "animation")
+LAYOUTS = ("side", "grid", "frame")
+MODES = ("wipe", "fade")
+SHOT_EXTS = (".png", ".jpg", ".jpeg", ".webp", ".bmp")
+# Bump when composite_worker output changes so stale cache entries are not served
+RENDER_VERSION = 1
+
+HIST_COMPOSITE_SECONDS = Histogram(
+    "app_composite_render_seconds",
+    "Before/after composite render time, including time queued for a worker",
+    ["kind"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+CNT_COMPOSITE_CACHE = Counter(
+    "app_composite_cache_total",
+    "Composite requests served from the render cache (hit), rendered (miss) or joined to an in-flight render (shared)",
+    ["outcome"],
+)
+
+
+class CompositeUnavailable(RuntimeError):
+    """Pillow or numpy is not installed."""
+
+
+def composite_available() -> bool:
+    # Checked without importing, so pair listing and stats never load Pillow/numpy
+    return find_spec("PIL") is not None and find_spec("numpy") is not None
+
+
+def _file_sig(path: str) -> list:
+    st = os.stat(path)
+    return [path, st.st_mtime_ns, st.st_size]
+
+
+class Compositor:
+    """Build before/after comparison images from the procedure shots.
+
+    Pairs come per view (front/side/rear) from the ``procedure_before`` /
+    ``procedure_after`` screenshot slots: first the files the slots' OBS image
+    inputs (``img_before_*`` / ``img_after_*``) currently show, read in one
+    batch; a missing after image falls back to the camera's newest shot in the
+    screenshot date tree taken after the before image (see ``pairs``). Renders run in a spawned process pool and land in ``cache_dir`` under
+    a key of the input files (path, mtime, size) and render options, so a
+    repeated request is a file lookup and concurrent identical requests share
+    one render. The ``max_entries`` least recently used files are kept.
+    """
+
+    def __init__(
+        self,
+        screenshot_dir: str,
+        *,
+        cache_dir: Optional[str] = None,
+        workers: int = 2,
+        max_entries: int = 64,
+        scan_days: int = 7,
+        frame: Optional[str] = None,
+    ) -> None:
+        self.screenshot_dir = Path(screenshot_dir)
+        self.cache_dir = Path(cache_dir) if cache_dir else self.screenshot_dir / ".composites"
+        self._pool = SpawnPool(workers)
+        self.workers = self._pool.workers
+        self.max_entries = max(1, int(max_entries))
+        self.scan_days = max(1, int(scan_days))
+        self.frame = frame
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._totals = {"hits": 0, "misses": 0, "shared": 0, "failed": 0}
+
+    # ---- pair resolution ----
+    def views(self) -> Dict[str, dict]:
+        """``{view: {"source", "before_input", "after_input"}}`` from the hotkey screenshot slots."""
+        out: Dict[str, dict] = {}
+        slots = iter_screenshot_slots((load_hotkey_config() or {}).get("screenshot") or {})
+        for name, slot in slots:
+            group, _, view = name.partition(".")
+            if group not in (BEFORE_GROUP, AFTER_GROUP) or not view:
+                continue
+            entry = out.setdefault(view, {"source": slot.get("source"), "before_input": None, "after_input": None})
+            entry["before_input" if group == BEFORE_GROUP else "after_input"] = slot.get("update_input")
+            entry["source"] = entry["source"] or slot.get("source")
+        return out
+
+    async def _input_files(self, names: list[str]) -> Dict[str, str]:
+        if not names:
+            return {}
+        try:
+            results = await obs_manager.call_batch([("GetInputSettings", {"inputName": n}) for n in names])
+        except Exception as exc:  # noqa: BLE001
+            _log.info("composite: OBS image inputs unavailable, using the screenshot tree: %s", exc)
+            return {}
+        files: Dict[str, str] = {}
+        for name, res in zip(names, results):
+            if not (res.get("requestStatus") or {}).get("result"):
+                continue
+            path = ((res.get("responseData") or {}).get("inputSettings") or {}).get("file")
+            if path and Path(path).is_file():
+                files[name] = str(path)
+        return files
+
+    def _tree_shots(self, source: str) -> list[Path]:
+        """The source's shots in the last ``scan_days`` day folders, newest first."""
+        suffix = "_" + re.sub(r"[^A-Za-z0-9._-]+", "_", source)
+        today = date.today()
+        found: list[Path] = []
+        for n in range(self.scan_days):
+            day = self.screenshot_dir / (today - timedelta(days=n)).strftime("%Y/%m/%d")
+            if not day.is_dir():
+                continue
+            for p in day.iterdir():
+                if p.suffix.lower() in SHOT_EXTS and p.stem.endswith(suffix) and p.is_file():
+                    found.append(p)
+        found.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+        return found
+
+    async def pairs(self, views: Optional[list[str]] = None) -> list[dict]:
+        """One entry per configured view: ``before``/``after`` paths (or ``None``) and where they came from.
+
+        Tree shots are named after the camera only, so they can't tell a before
+        shot from an after one. The tree is therefore used only to find the after
+        image once OBS has supplied the before image: the camera's newest shot
+        taken later (``from: "mixed"``). Without a before image from OBS the view
+        has no pair (``from: None``) rather than a guessed one.
+        """
+        cfg = self.views()
+        if views:
+            unknown = [v for v in views if v not in cfg]
+            if unknown:
+                raise KeyError(f"unknown view(s): {', '.join(unknown)}; configured: {', '.join(cfg) or '-'}")
+            cfg = {v: cfg[v] for v in views}
+        names = [n for v in cfg.values() for n in (v["before_input"], v["after_input"]) if n]
+        files = await self._input_files(names)
+        out = []
+        for view, v in cfg.items():
+            before, after = files.get(v["before_input"] or ""), files.get(v["after_input"] or "")
+            origin = "obs"
+            if before is not None and after is None and v["source"]:
+                shots = await asyncio.to_thread(self._tree_shots, v["source"])
+                floor = os.stat(before).st_mtime
+                after = next((str(p) for p in shots if str(p) != before and p.stat().st_mtime > floor), None)
+                origin = "mixed"
+            out.append({"view": view, "source": v["source"], "before": before, "after": after, "from": origin if before and after else None})
+        return out
+
+    # ---- rendering ----
+    async def render(
+        self,
+        *,
+        kind: str = "image",
+        layout: str = "side",
+        views: Optional[list[str]] = None,
+        mode: str = "wipe",
+        height: int = 960,
+        labels: bool = True,
+        frames: int = 16,
+        frame_ms: int = 60,
+    ) -> dict:
+        """Render (or fetch from cache) a composite; returns its cached ``path`` and the pairs used.
+
+        ``image`` with layout ``side`` (a row per view), ``grid`` (befores over
+        afters) or ``frame`` (the first view in the img_ba_frame template);
+        ``animation`` is a looping GIF of the first view (``mode`` wipe or fade).
+        Raises ``ValueError`` for bad options, ``KeyError`` when no complete pair
+        exists and ``CompositeUnavailable`` without Pillow/numpy.
+        """
+        if kind not in KINDS:
+            raise ValueError(f"kind must be one of {', '.join(KINDS)}")
+        if layout not in LAYOUTS:
+            raise ValueError(f"layout must be one of {', '.join(LAYOUTS)}")
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {', '.join(MODES)}")
+        if not composite_available():
+            raise CompositeUnavailable("composites need Pillow and numpy: pip install pillow numpy")
+        pairs = [p for p in await self.pairs(views) if p["from"]]
+        if not pairs:
+            raise KeyError("no before/after pair found (OBS image inputs or screenshot tree)")
+        single = kind == "animation" or layout == "frame"
+        if single:
+            pairs = pairs[:1]
+        job: Dict[str, Any] = {"kind": kind, "pairs": [{"view": p["view"], "before": p["before"], "after": p["after"]} for p in pairs], "labels": bool(labels)}
+        if kind == "animation":
+            job.update(mode=mode, frames=max(2, min(60, int(frames))), frame_ms=max(20, int(frame_ms)))
+        else:
+            job.update(layout=layout, height=max(64, min(4096, int(height))))
+            if layout == "frame":
+                job["frame"] = self.frame
+                if not self.frame or not Path(self.frame).is_file():
+                    raise ValueError("layout=frame needs the img_ba_frame asset")
+        ext = "gif" if kind == "animation" else "png"
+        sig = {
+            "v": RENDER_VERSION,
+            "job": job,
+            "files": [_file_sig(p[k]) for p in job["pairs"] for k in ("before", "after")]
+            + ([_file_sig(job["frame"])] if job.get("frame") else []),
+        }
+        key = hashlib.sha1(json.dumps(sig, sort_keys=True).encode("utf-8")).hexdigest()[:24]
+        out = self.cache_dir / f"{key}.{ext}"
+        info = {"kind": kind, "layout": None if kind == "animation" else layout, "pairs": pairs}
+        t0 = time.perf_counter()
+
+        if out.is_file():
+            os.utime(out)  # LRU order for eviction
+            self._count("hit")
+            return {**info, "path": str(out), "cache": "hit", "ms": round((time.perf_counter() - t0) * 1000.0, 2)}
+
+        with self._lock:
+            fut = self._inflight.get(key)
+            shared = fut is not None
+            if fut is None:
+                fut = self._submit(key, {**job, "out": str(out)})
+        self._count("shared" if shared else "miss")
+        try:
+            try:
+                res = await asyncio.wrap_future(fut)
+            except BrokenProcessPool:
+                if shared:
+                    raise
+                # A worker died mid-render; the pool replaces itself on the next submit
+                _log.warning("composite worker died; retrying %s once", key)
+                with self._lock:
+                    fut = self._submit(key, {**job, "out": str(out)})
+                res = await asyncio.wrap_future(fut)
+        except Exception:
+            if not shared:
+                with self._lock:
+                    self._totals["failed"] += 1
+            raise
+        if not shared:
+            HIST_COMPOSITE_SECONDS.labels(kind=kind).observe(time.perf_counter() - t0)
+            await asyncio.to_thread(self._evict)
+        return {
+            **info,
+            "path": str(out),
+            "cache": "shared" if shared else "miss",
+            "width": res["width"],
+            "height": res["height"],
+            "ms": round((time.perf_counter() - t0) * 1000.0, 2),
+        }
+
+    def _submit(self, key: str, job: Dict[str, Any]) -> Future:
+        # Caller holds self._lock. Imported here, after the availability check:
+        # the parent only needs the reference to submit
+        from app.infrastructure.media.composite_worker import render
+
+        fut = self._pool.submit(render, job)
+        self._inflight[key] = fut
+        fut.add_done_callback(lambda f: self._done(key, f))
+        return fut
+
+    def _count(self, outcome: str) -> None:
+        CNT_COMPOSITE_CACHE.labels(outcome=outcome).inc()
+        with self._lock:
+            self._totals["hits" if outcome == "hit" else "shared" if outcome == "shared" else "misses"] += 1
+
+    def _done(self, key: str, fut: Future) -> None:
+        with self._lock:
+            # A retry may already have replaced the entry
+            if self._inflight.get(key) is fut:
+                del self._inflight[key]
+
+    def _entries(self) -> list[os.DirEntry]:
+        try:
+            return [e for e in os.scandir(self.cache_dir) if e.is_file() and not e.name.startswith(".")]
+        except FileNotFoundError:
+            return []
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries(), key=lambda e: e.stat().st_mtime, reverse=True)
+        for e in entries[self.max_entries :]:
+            try:
+                os.unlink(e.path)
+            except OSError:
+                pass
+
+    async def export(self, **options: Any) -> dict:
+        """Render (cached) and copy into the screenshot date tree; ``path`` is the copy."""
+        res = await self.render(**options)
+        ext = Path(res["path"]).suffix.lstrip(".")
+        name = "before_after" if res["kind"] == "image" else "before_after_anim"
+        if res["layout"] and res["layout"] != "side":
+            name += f"_{res['layout']}"
+        dest = Path(build_screenshot_path(name, image_format=ext, base_dir=str(self.screenshot_dir)))
+        # Names have one-second resolution; don't overwrite an export from the same second
+        n = 1
+        while dest.exists():
+            dest = dest.with_name(f"{dest.stem.rsplit('~', 1)[0]}~{n}{dest.suffix}")
+            n += 1
+        await asyncio.to_thread(shutil.copy2, res["path"], dest)
+        return {**res, "path": str(dest), "cached_path": res["path"]}
+
+    def stats(self) -> dict:
+        entries = self._entries()
+        with self._lock:
+            totals = dict(self._totals)
+            inflight = len(self._inflight)
+        return {
+            "available": composite_available(),
+            "workers": self.workers,
+            "cache_dir": str(self.cache_dir),
+            "entries": len(entries),
+            "bytes": sum(e.stat().st_size for e in entries),
+            "max_entries": self.max_entries,
+            "inflight": inflight,
+            **totals,
+        }
+
+    def shutdown(self, *, wait: bool = False) -> None:
+        self._pool.shutdown(wait=wait)
+
+
+_COMPOSITOR: Optional[Compositor] = None
+
+
+def get_compositor() -> Compositor:
+    global _COMPOSITOR
+    if _COMPOSITOR is None:
+        from app.config import settings
+        from app.infrastructure.obs.bootstrap import default_asset_images
+
+        _COMPOSITOR = Compositor(
+            settings.screenshot_dir,
+            cache_dir=settings.composite_cache_dir or None,
+            workers=int(settings.composite_workers),
+            max_entries=int(settings.composite_cache_max),
+            scan_days=int(settings.composite_scan_days),
+            frame=str(default_asset_images()["img_ba_frame"]),
+        )
+    return _COMPOSITOR
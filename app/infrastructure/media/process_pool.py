@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+
+_log = logging.getLogger(__name__)
+
+
+class SpawnPool:
+    """Lazily started process pool that replaces itself once broken.
+
+    A worker killed from outside (OOM, a crashed native library) marks a
+    ``ProcessPoolExecutor`` broken for good; ``submit`` then drops it and retries
+    once on a fresh pool. Work already queued on the broken pool still fails
+    with ``BrokenProcessPool`` through its future.
+    """
+
+    def __init__(self, workers: int) -> None:
+        self.workers = max(1, int(workers))
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn everywhere: forking the server would copy its threads' locks
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def _discard(self, pool: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        pool = self._executor()
+        try:
+            return pool.submit(fn, *args)
+        except BrokenProcessPool:
+            _log.warning("process pool broken; starting a new one")
+            self._discard(pool)
+            return self._executor().submit(fn, *args)
+
+    def shutdown(self, *, wait: bool = False) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=not wait)
@@ -1,19 +1,20 @@
 from __future__ import annotations
 
+import asyncio
+import gc
 import os
+import re
 import threading
 import time
-from typing import Optional
+from collections import deque
+from typing import Callable, Optional, Protocol
 
 import psutil
 from fastapi import FastAPI
-from prometheus_client import Gauge
+from prometheus_client import Gauge, Histogram
 from prometheus_fastapi_instrumentator import Instrumentator
 
-
-_PROCESS: Optional[psutil.Process] = None
-_SAMPLER_THREAD: Optional[threading.Thread] = None
-_STOP_EVENT: Optional[threading.Event] = None
+from app.config import settings
 
 
 # Gauges for system-level metrics
@@ -49,73 +50,375 @@ GAUGE_OPEN_HANDLES = Gauge(
     "Number of open file descriptors/handles for this process (Windows counts handles)",
 )
 
+# Per-thread CPU breakdown (threads grouped by Python thread name)
+GAUGE_THREAD_CPU_PERCENT = Gauge(
+    "app_thread_cpu_percent",
+    "CPU utilization percent per thread group since the previous sample",
+    ["thread"],
+)
+GAUGE_THREAD_CPU_SECONDS = Gauge(
+    "app_thread_cpu_seconds",
+    "Cumulative user+system CPU seconds per thread group (live threads only)",
+    ["thread"],
+)
 
-def _sample_metrics_loop(poll_seconds: float = 2.0) -> None:
-    global _PROCESS
-    assert _PROCESS is not None
-    # Prime cpu_percent to avoid first-call 0.0
-    _ = psutil.cpu_percent(interval=None)
-    _ = _PROCESS.cpu_percent(interval=None)
-    while _STOP_EVENT is not None and not _STOP_EVENT.is_set():
-        try:
-            # System
-            cpu_percent = psutil.cpu_percent(interval=None)
-            virt = psutil.virtual_memory()
-            GAUGE_CPU_PERCENT.set(cpu_percent)
-            GAUGE_MEM_USED_BYTES.set(virt.used)
-            GAUGE_MEM_AVAILABLE_BYTES.set(virt.available)
-
-            # Process
-            proc_cpu = _PROCESS.cpu_percent(interval=None)
-            mem_info = _PROCESS.memory_info()
-            GAUGE_PROC_CPU_PERCENT.set(proc_cpu)
+# Garbage collector
+HIST_GC_PAUSE_SECONDS = Histogram(
+    "app_gc_pause_seconds",
+    "Duration of garbage collector pauses",
+    ["generation"],
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+GAUGE_GC_OBJECTS = Gauge(
+    "app_gc_tracked_objects",
+    "Objects currently pending collection per generation (gc.get_count)",
+    ["generation"],
+)
+
+# Event loop
+GAUGE_LOOP_LAG_SECONDS = Gauge(
+    "app_event_loop_lag_seconds",
+    "Delay between scheduling a callback from the sampler thread and the event loop running it",
+)
+GAUGE_ASYNCIO_TASKS = Gauge(
+    "app_asyncio_tasks",
+    "Number of pending asyncio tasks on the application event loop",
+)
+
+# Sampler self-observation
+HIST_SAMPLER_SECONDS = Histogram(
+    "app_metrics_sampler_duration_seconds",
+    "Wall time spent collecting one metrics sample",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5),
+)
+GAUGE_SAMPLER_CPU_SECONDS = Gauge(
+    "app_metrics_sampler_cpu_seconds",
+    "CPU time consumed by the metrics sampler thread for the last sample",
+)
+GAUGE_SAMPLER_INTERVAL_SECONDS = Gauge(
+    "app_metrics_sampler_interval_seconds",
+    "Current adaptive sampling interval",
+)
+GAUGE_COLLECTOR_SECONDS = Gauge(
+    "app_metrics_collector_duration_seconds",
+    "Wall time spent in each collector for the last sample",
+    ["collector"],
+)
+
+
+class Collector(Protocol):
+    name: str
+
+    def collect(self) -> None: ...
+
+
+class SystemCollector:
+    name = "system"
+
+    def __init__(self, proc: psutil.Process) -> None:
+        # Prime cpu_percent to avoid first-call 0.0
+        psutil.cpu_percent(interval=None)
+
+    def collect(self) -> None:
+        GAUGE_CPU_PERCENT.set(psutil.cpu_percent(interval=None))
+        virt = psutil.virtual_memory()
+        GAUGE_MEM_USED_BYTES.set(virt.used)
+        GAUGE_MEM_AVAILABLE_BYTES.set(virt.available)
+
+
+class ProcessCollector:
+    name = "process"
+
+    def __init__(self, proc: psutil.Process) -> None:
+        self._proc = proc
+        self._proc.cpu_percent(interval=None)
+
+    def collect(self) -> None:
+        # oneshot() caches the underlying /proc or NtQuery reads across the calls below
+        with self._proc.oneshot():
+            GAUGE_PROC_CPU_PERCENT.set(self._proc.cpu_percent(interval=None))
+            mem_info = self._proc.memory_info()
             GAUGE_PROC_RSS_BYTES.set(mem_info.rss)
             GAUGE_PROC_VMS_BYTES.set(mem_info.vms)
-
             # Open fds/handles (custom metric name to avoid collision with default collectors)
             try:
-                if hasattr(_PROCESS, "num_handles"):
-                    GAUGE_OPEN_HANDLES.set(_PROCESS.num_handles())  # Windows
+                if hasattr(self._proc, "num_handles"):
+                    GAUGE_OPEN_HANDLES.set(self._proc.num_handles())  # Windows
                 else:
-                    GAUGE_OPEN_HANDLES.set(_PROCESS.num_fds())  # POSIX
+                    GAUGE_OPEN_HANDLES.set(self._proc.num_fds())  # POSIX
             except Exception:
                 # Some platforms may not support it; keep metric but skip update
                 pass
-        except Exception:
-            # Avoid crashing the thread; next loop will retry
+
+
+class ThreadCpuCollector:
+    """CPU time per thread, labelled by the owning Python thread's name.
+
+    Native threads without a Python counterpart are grouped as ``native``.
+    Numbered pools (``AnyIO worker thread``, ``ThreadPoolExecutor-0_3``) are
+    collapsed to one label to keep cardinality bounded.
+    """
+
+    name = "threads"
+
+    def __init__(self, proc: psutil.Process) -> None:
+        self._proc = proc
+        self._prev: dict[int, float] = {}
+        self._prev_ts: float | None = None
+        self._labels: set[str] = set()
+
+    @staticmethod
+    def _group(name: str) -> str:
+        return re.sub(r"[-_ ]?\d+", "", name) or name
+
+    def collect(self) -> None:
+        now = time.monotonic()
+        names = {t.native_id: self._group(t.name) for t in threading.enumerate() if t.native_id is not None}
+        with self._proc.oneshot():
+            threads = self._proc.threads()
+        totals: dict[str, float] = {}
+        deltas: dict[str, float] = {}
+        current: dict[int, float] = {}
+        for th in threads:
+            cpu = float(th.user_time) + float(th.system_time)
+            current[th.id] = cpu
+            label = names.get(th.id, "native")
+            totals[label] = totals.get(label, 0.0) + cpu
+            prev = self._prev.get(th.id)
+            if prev is not None:
+                deltas[label] = deltas.get(label, 0.0) + max(0.0, cpu - prev)
+        elapsed = (now - self._prev_ts) if self._prev_ts is not None else 0.0
+        for label, total in totals.items():
+            GAUGE_THREAD_CPU_SECONDS.labels(thread=label).set(total)
+            if elapsed > 0:
+                GAUGE_THREAD_CPU_PERCENT.labels(thread=label).set(100.0 * deltas.get(label, 0.0) / elapsed)
+        # Drop series of thread groups that went away
+        for gone in self._labels - set(totals):
+            try:
+                GAUGE_THREAD_CPU_SECONDS.remove(gone)
+                GAUGE_THREAD_CPU_PERCENT.remove(gone)
+            except KeyError:
+                pass
+        self._labels = set(totals)
+        self._prev = current
+        self._prev_ts = now
+
+
+class GcCollector:
+    """Measure GC pauses via ``gc.callbacks``.
+
+    The callback only appends to a deque: observing a Histogram takes a lock, and
+    a collection can be triggered while that same lock is held on this thread.
+    Pauses are flushed into the histogram from the sampler thread instead.
+    """
+
+    name = "gc"
+
+    def __init__(self, proc: psutil.Process) -> None:
+        self._pending: deque[tuple[int, float]] = deque(maxlen=10_000)
+        self._started: dict[int, float] = {}
+        gc.callbacks.append(self._on_gc)
+
+    def _on_gc(self, phase: str, info: dict) -> None:
+        ident = threading.get_ident()
+        if phase == "start":
+            self._started[ident] = time.perf_counter()
+        else:
+            t0 = self._started.pop(ident, None)
+            if t0 is not None:
+                self._pending.append((int(info.get("generation", 0)), time.perf_counter() - t0))
+
+    def collect(self) -> None:
+        while self._pending:
+            gen, dur = self._pending.popleft()
+            HIST_GC_PAUSE_SECONDS.labels(generation=str(gen)).observe(dur)
+        for gen, count in enumerate(gc.get_count()):
+            GAUGE_GC_OBJECTS.labels(generation=str(gen)).set(count)
+
+    def close(self) -> None:
+        try:
+            gc.callbacks.remove(self._on_gc)
+        except ValueError:
             pass
-        time.sleep(poll_seconds)
+
+
+class EventLoopLagCollector:
+    """Schedule a no-op on the app loop and record how late it ran.
+
+    The result lands asynchronously, so the gauge trails by one sample but the
+    sampler never blocks on the loop.
+    """
+
+    name = "loop"
+
+    def __init__(self, proc: psutil.Process) -> None:
+        self.loop: asyncio.AbstractEventLoop | None = None
+
+    def _mark(self, scheduled_at: float) -> None:
+        GAUGE_LOOP_LAG_SECONDS.set(time.perf_counter() - scheduled_at)
+
+    def collect(self) -> None:
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._mark, time.perf_counter())
+
+
+class AsyncioTasksCollector:
+    name = "tasks"
+
+    def __init__(self, proc: psutil.Process) -> None:
+        self.loop: asyncio.AbstractEventLoop | None = None
+
+    def _count(self) -> None:
+        GAUGE_ASYNCIO_TASKS.set(len(asyncio.all_tasks(self.loop)))
+
+    def collect(self) -> None:
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            return
+        # all_tasks() is not safe to call from a foreign thread; count on the loop itself
+        loop.call_soon_threadsafe(self._count)
+
+
+COLLECTORS: dict[str, Callable[[psutil.Process], Collector]] = {
+    "system": SystemCollector,
+    "process": ProcessCollector,
+    "threads": ThreadCpuCollector,
+    "gc": GcCollector,
+    "loop": EventLoopLagCollector,
+    "tasks": AsyncioTasksCollector,
+}
+
+
+def register_collector(name: str, factory: Callable[[psutil.Process], Collector]) -> None:
+    """Make a collector selectable through ``settings.metrics_collectors``."""
+    COLLECTORS[name] = factory
+
+
+class MetricsSampler:
+    """Background thread running the configured collectors.
+
+    The interval adapts to the sampler's own cost: when one sample takes more than
+    ``overhead_budget`` of the interval, the interval grows (up to ``max_interval``)
+    and shrinks back towards ``base_interval`` once sampling is cheap again.
+    """
+
+    def __init__(
+        self,
+        collectors: list[Collector],
+        *,
+        base_interval: float = 2.0,
+        max_interval: float = 10.0,
+        overhead_budget: float = 0.01,
+    ) -> None:
+        self.collectors = collectors
+        self.base_interval = max(0.1, float(base_interval))
+        self.max_interval = max(self.base_interval, float(max_interval))
+        self.overhead_budget = max(0.0001, float(overhead_budget))
+        self.interval = self.base_interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def attach_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        for c in self.collectors:
+            if hasattr(c, "loop"):
+                c.loop = loop  # type: ignore[attr-defined]
+
+    def sample_once(self) -> float:
+        t0 = time.perf_counter()
+        c0 = time.thread_time()
+        for c in self.collectors:
+            ct = time.perf_counter()
+            try:
+                c.collect()
+            except Exception:
+                # Avoid crashing the thread; next loop will retry
+                pass
+            GAUGE_COLLECTOR_SECONDS.labels(collector=c.name).set(time.perf_counter() - ct)
+        cost = time.perf_counter() - t0
+        HIST_SAMPLER_SECONDS.observe(cost)
+        GAUGE_SAMPLER_CPU_SECONDS.set(time.thread_time() - c0)
+        return cost
+
+    def _next_interval(self, cost: float) -> float:
+        wanted = cost / self.overhead_budget
+        if wanted > self.interval:
+            return min(self.max_interval, max(wanted, self.interval * 1.5))
+        # Relax gradually so a single cheap sample does not undo a back-off
+        return max(self.base_interval, min(self.interval, max(wanted, self.interval * 0.8)))
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            cost = self.sample_once()
+            self.interval = self._next_interval(cost)
+            GAUGE_SAMPLER_INTERVAL_SECONDS.set(self.interval)
+            self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+        for c in self.collectors:
+            close = getattr(c, "close", None)
+            if close is not None:
+                try:
+                    close()
+                except Exception:
+                    pass
+
+
+def build_collectors(names: str, proc: psutil.Process) -> list[Collector]:
+    out: list[Collector] = []
+    for raw in names.split(","):
+        key = raw.strip().lower()
+        factory = COLLECTORS.get(key)
+        if factory is None:
+            continue
+        try:
+            out.append(factory(proc))
+        except Exception:
+            continue
+    return out
+
+
+_SAMPLER: Optional[MetricsSampler] = None
 
 
 def setup_metrics(app: FastAPI) -> None:
     """Attach Prometheus instrumentation and background sampler.
 
     - Exposes /metrics with default FastAPI request metrics
-    - Samples system and process metrics via psutil periodically
+    - Samples psutil, per-thread CPU, GC and event-loop metrics via pluggable collectors
     """
 
     # Standard HTTP metrics
     instrumentator = Instrumentator().instrument(app)
     instrumentator.expose(app, include_in_schema=False)
 
-    # Background sampler for psutil metrics
-    global _PROCESS, _STOP_EVENT, _SAMPLER_THREAD
-    _PROCESS = psutil.Process(os.getpid())
-    _STOP_EVENT = threading.Event()
-    _SAMPLER_THREAD = threading.Thread(
-        target=_sample_metrics_loop, name="metrics-sampler", args=(2.0,), daemon=True
+    global _SAMPLER
+    proc = psutil.Process(os.getpid())
+    _SAMPLER = MetricsSampler(
+        build_collectors(settings.metrics_collectors, proc),
+        base_interval=settings.metrics_sample_interval,
+        max_interval=settings.metrics_sample_interval_max,
+        overhead_budget=settings.metrics_overhead_budget,
     )
 
     @app.on_event("startup")
     async def _start_sampler() -> None:
-        if _SAMPLER_THREAD is not None and not _SAMPLER_THREAD.is_alive():
-            _SAMPLER_THREAD.start()
+        if _SAMPLER is not None:
+            _SAMPLER.attach_loop(asyncio.get_running_loop())
+            _SAMPLER.start()
 
     @app.on_event("shutdown")
     async def _stop_sampler() -> None:
-        if _STOP_EVENT is not None:
-            _STOP_EVENT.set()
-        if _SAMPLER_THREAD is not None and _SAMPLER_THREAD.is_alive():
-            _SAMPLER_THREAD.join(timeout=2.0)
-
-
+        if _SAMPLER is not None:
+            _SAMPLER.stop()
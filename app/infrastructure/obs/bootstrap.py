@@ -1,10 +1,15 @@
 from __future__ import annotations
 
-from typing import Iterable
+from datetime import datetime
 from pathlib import Path
+from typing import Optional
 import logging
+import sys
+import time
 
-from app.obs_client import obs_manager
+from prometheus_client import Histogram
+
+from app.infrastructure.obs.layout import DesiredLayout, InputSpec, apply_plan, diff_layout, take_snapshot
 
 
 STANDARD_SCENES: list[str] = [
@@ -34,69 +39,33 @@ STANDARD_SOURCES: list[str] = [
     "img_before_rear",
 ]
 
+_log = logging.getLogger(__name__)
 
-async def _list_scene_names() -> set[str]:
-    data = await obs_manager.get_scenes()
-    names: set[str] = set()
-    for s in data:
-        name = s.get("sceneName") or s.get("scene_name") or s.get("name")
-        if name:
-            names.add(str(name))
-    return names
-
-
-async def ensure_scenes_exist(names: Iterable[str]) -> None:
-    existing = await _list_scene_names()
-    client = await obs_manager.connect()
-    for name in names:
-        if name in existing:
-            continue
-        # create empty scene if not exists
-        create = getattr(client, "create_scene", None)
-        if create is not None:
-            await obs_manager._to_thread(create, name)  # type: ignore[attr-defined]
-
-
-async def ensure_input_exists(input_name: str, kind: str) -> None:
-    client = await obs_manager.connect()
-    get = getattr(client, "get_input_list", None)
-    add = getattr(client, "create_input", None)
-    if get is None or add is None:
-        return
-    inputs = await obs_manager._to_thread(get)
-    names = {i.get("inputName") or i.get("input_name") or i.get("name") for i in getattr(inputs, "inputs", [])}
-    if input_name in names:
-        return
-    settings: dict = {}
-    if kind == "image_source":
-        settings = {"file": ""}
-    await obs_manager._to_thread(add, "Home", input_name, kind, settings, False)
-
-
-async def wire_default_layout() -> None:
-    # Minimal: ensure standard scenes exist. Wiring sources to scenes is project-specific; we keep it conservative.
-    await ensure_scenes_exist(STANDARD_SCENES)
-    # Optionally ensure default inputs exist (commented kinds depend on OS/OBS):
-    # await ensure_input_exists("cam_front", "dshow_input")
-    # await ensure_input_exists("cam_side", "dshow_input")
-    # await ensure_input_exists("cam_rear", "dshow_input")
-    # await ensure_input_exists("img_before_front", "image_source")
-    # await ensure_input_exists("img_before_side", "image_source")
-    # await ensure_input_exists("img_before_rear", "image_source")
-    try:
-        await _apply_default_asset_images()
-    except Exception as exc:
-        logging.getLogger(__name__).warning("apply default asset images skipped: %s", exc)
+HIST_BOOTSTRAP_SECONDS = Histogram(
+    "app_obs_bootstrap_seconds",
+    "OBS layout bootstrap time by phase (snapshot, diff, apply, total)",
+    ["phase"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+_last_report: Optional[dict] = None
+
+
+def _camera_kind() -> str:
+    if sys.platform.startswith("win"):
+        return "dshow_input"
+    if sys.platform == "darwin":
+        return "av_capture_input"
+    return "v4l2_input"
 
 
-async def _apply_default_asset_images() -> None:
+def default_asset_images() -> dict[str, Path]:
     """
-    Ensure specific image inputs point to our repo's assets by default:
+    Image inputs that point to our repo's assets by default:
       - img_cam_bg -> assets/image/cam-bg.png
       - img_ba_frame -> assets/image/frame-beforeafter.png
       - img_mac_wireframe -> assets/image/mac-wireframe.png
 
-    If inputs are missing, they will be created as image_source under 'Home' scene.
     File paths are resolved relative to repository root to be robust regardless of CWD.
     """
     # Resolve repo root and assets dir robustly
@@ -108,30 +77,77 @@ async def _apply_default_asset_images() -> None:
     if not assets_dir.exists():
         # Fallback to CWD relative
         assets_dir = Path("assets") / "image"
-
-    mapping: dict[str, Path] = {
+    return {
         "img_cam_bg": assets_dir / "cam-bg.png",
         "img_ba_frame": assets_dir / "frame-beforeafter.png",
         "img_mac_wireframe": assets_dir / "mac-wireframe.png",
     }
 
-    client = await obs_manager.connect()
-    get_inputs = getattr(client, "get_input_list", None)
-    create_input = getattr(client, "create_input", None)
-    if get_inputs is None or create_input is None:
-        return
-    inputs = await obs_manager._to_thread(get_inputs)
-    existing = {i.get("inputName") or i.get("input_name") or i.get("name") for i in getattr(inputs, "inputs", [])}
-
-    for input_name, file_path in mapping.items():
-        try:
-            if not file_path.exists():
-                continue
-            # Create missing image_source
-            if input_name not in existing:
-                await obs_manager._to_thread(create_input, "Home", input_name, "image_source", {"file": str(file_path)}, False)
-                existing.add(input_name)
-            # Update file path
-            await obs_manager.set_input_settings(input_name, {"file": str(file_path)}, False)
-        except Exception as exc:
-            logging.getLogger(__name__).warning("failed to set asset for %s: %s", input_name, exc)
+
+def default_layout(*, create_sources: bool = False) -> DesiredLayout:
+    """Standard scenes, asset image inputs (missing files skipped) and, optionally,
+    the standard camera/image sources with platform-dependent kinds."""
+    inputs: dict[str, InputSpec] = {}
+    if create_sources:
+        for name in STANDARD_SOURCES:
+            if name.startswith("cam_"):
+                inputs[name] = InputSpec(_camera_kind(), enforce_settings=False)
+            else:
+                inputs[name] = InputSpec("image_source", {"file": ""}, enforce_settings=False)
+    for name, path in default_asset_images().items():
+        if path.exists():
+            inputs[name] = InputSpec("image_source", {"file": str(path)})
+    return DesiredLayout(scenes=list(STANDARD_SCENES), inputs=inputs)
+
+
+async def wire_default_layout(*, dry_run: bool = False) -> dict:
+    """Bring OBS up to the default layout with one read batch and one write batch.
+
+    Snapshot of scenes, inputs and asset input settings -> diff against
+    ``default_layout()`` -> only the missing scenes/inputs and changed asset paths
+    are sent. Nothing is written when OBS already matches. Returns (and keeps
+    for ``last_bootstrap_report``) the changes made and per-phase timings.
+    """
+    global _last_report
+    from app.config import settings
+
+    t0 = time.perf_counter()
+    desired = default_layout(create_sources=bool(getattr(settings, "bootstrap_create_sources", False)))
+    snap = await take_snapshot(name for name, spec in desired.inputs.items() if spec.enforce_settings)
+    t1 = time.perf_counter()
+    plan = diff_layout(snap, desired)
+    t2 = time.perf_counter()
+    failed = [] if dry_run else await apply_plan(plan)
+    t3 = time.perf_counter()
+
+    for phase, seconds in (("snapshot", t1 - t0), ("diff", t2 - t1), ("apply", t3 - t2), ("total", t3 - t0)):
+        HIST_BOOTSTRAP_SECONDS.labels(phase=phase).observe(seconds)
+    report = {
+        "at": datetime.now().isoformat(timespec="seconds"),
+        "dry_run": dry_run,
+        "changes": plan.changes,
+        "failed": failed,
+        "conflicts": plan.conflicts,
+        "scenes": len(snap.scenes),
+        "inputs": len(snap.inputs),
+        "timings_ms": {
+            "snapshot": round((t1 - t0) * 1000.0, 2),
+            "diff": round((t2 - t1) * 1000.0, 2),
+            "apply": round((t3 - t2) * 1000.0, 2),
+            "total": round((t3 - t0) * 1000.0, 2),
+        },
+    }
+    _last_report = report
+    _log.info(
+        "OBS bootstrap: %d change(s), %d failed, %d conflict(s) in %.1f ms",
+        len(plan.changes), len(failed), len(plan.conflicts), report["timings_ms"]["total"],
+    )
+    for item in failed:
+        _log.warning("bootstrap step failed: %s", item)
+    for item in plan.conflicts:
+        _log.warning("bootstrap conflict: %s", item)
+    return report
+
+
+def last_bootstrap_report() -> Optional[dict]:
+    return _last_report
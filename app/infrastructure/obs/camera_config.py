@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+import re
 from typing import Optional, List, Dict, Tuple
-import platform
 
 from app.obs_client import obs_manager
+from app.infrastructure.devices.registry import get_device_registry
+from app.infrastructure.obs.payload_strategy import payload_strategies, strategy_key
 
 CAM_INPUTS = {
     "front": "cam_front",
@@ -13,9 +17,10 @@ CAM_INPUTS = {
 
 DSHOW_KIND = "dshow_input"
 
+logger = logging.getLogger(__name__)
 
-async def _pick_scene_for_new_input() -> str:
-    scenes = await obs_manager.get_scenes()
+
+def _pick_scene(scenes: list[dict]) -> str:
     for preferred in ("Home", "LiveFront", "LiveSide", "LiveRear"):
         if any((s.get("sceneName") or s.get("name")) == preferred for s in scenes):
             return preferred
@@ -25,56 +30,6 @@ async def _pick_scene_for_new_input() -> str:
     return "Home"
 
 
-async def _recreate_input_with_device(input_name: str, device_moniker_or_name: str) -> None:
-    client = await obs_manager.connect()
-    remove = getattr(client, "remove_input", None)
-    add = getattr(client, "create_input", None)
-    if add is None:
-        return
-    # Remove existing if possible to avoid name collision
-    if remove is not None:
-        try:
-            await obs_manager._to_thread(remove, input_name)
-        except Exception:
-            pass
-    scene_name = await _pick_scene_for_new_input()
-    settings: dict = {}
-    if _looks_like_moniker(device_moniker_or_name):
-        settings = {"device_id": device_moniker_or_name}
-    else:
-        settings = {"device_name": device_moniker_or_name}
-    await obs_manager._to_thread(add, scene_name, input_name, DSHOW_KIND, settings, False)
-
-
-async def _ensure_input_exists(input_name: str, kind: str = DSHOW_KIND) -> None:
-    client = await obs_manager.connect()
-    get_list = getattr(client, "get_input_list", None)
-    add = getattr(client, "create_input", None)
-    remove = getattr(client, "remove_input", None)
-    if get_list is None or add is None:
-        return
-    lst = await obs_manager._to_thread(get_list)
-    inputs = getattr(lst, "inputs", [])
-    target = None
-    for i in inputs:
-        name = i.get("inputName") or i.get("name")
-        if name == input_name:
-            target = i
-            break
-    if target is not None:
-        existing_kind = target.get("inputKind") or target.get("kind") or target.get("input_kind")
-        if existing_kind == kind:
-            return
-        # Recreate with desired kind if mismatched
-        if remove is not None:
-            try:
-                await obs_manager._to_thread(remove, input_name)
-            except Exception:
-                pass
-    scene_name = await _pick_scene_for_new_input()
-    await obs_manager._to_thread(add, scene_name, input_name, kind, {}, False)
-
-
 async def _get_input_settings(input_name: str) -> dict:
     client = await obs_manager.connect()
     get_settings = getattr(client, "get_input_settings", None)
@@ -95,77 +50,20 @@ def _looks_like_moniker(value: str) -> bool:
 
 
 def _resolve_local_dshow_moniker_by_label(user_label: str) -> Optional[str]:
-    if platform.system().lower() != "windows":
-        return None
+    # Index lookups over the cached enumeration (path, VID/PID, name, then contains)
     try:
-        from app.infrastructure.devices.dshow_enum import list_dshow_devices_detailed
+        res = get_device_registry().snapshot().index.resolve(str(user_label))
     except Exception:
         return None
-
-    try:
-        det = list_dshow_devices_detailed()
-    except Exception:
-        det = []
-
-    import re
-
-    def normalize(s: str) -> str:
-        base = re.sub(r"\s*\([^)]*\)\s*$", "", s or "")
-        return re.sub(r"\s+", " ", base).strip().lower()
-
-    tokens: list[str] = []
-    for m in re.finditer(r"\(([0-9a-fA-F]{3,8})\)", str(user_label)):
-        tok = m.group(1).lower()
-        tokens.append(tok)
-        if re.fullmatch(r"[0-9]{3,8}", tok):
-            try:
-                dec = int(tok, 10)
-                hx = f"{dec:04x}"
-                if hx not in tokens:
-                    tokens.append(hx)
-            except Exception:
-                pass
-
-    # 1) token-in-path match first
-    if tokens:
-        for d in det or []:
-            path = str(d.get("path") or "").lower()
-            if path and any(tok in path for tok in tokens):
-                return str(d.get("path"))
-
-    # 2) normalized friendly-name exact
-    uv = normalize(str(user_label))
-    for d in det or []:
-        nm = str(d.get("name") or "")
-        if nm and normalize(nm) == uv:
-            return str(d.get("path"))
-
-    # 3) contains
-    for d in det or []:
-        nm = str(d.get("name") or "")
-        if not nm:
-            continue
-        nn = normalize(nm)
-        if uv and (uv in nn or nn in uv):
-            return str(d.get("path"))
-
-    return None
+    return res.device.path if res is not None else None
 
 
 async def list_dshow_devices_via_obs(input_name: str = "cam_front") -> list[dict]:
     # 안정성을 위해 OBS PropertyItems API 사용을 피한다(code 600 회피)
-    # 로컬 DirectShow COM 열거 결과를 name/value(=moniker path)로 반환
+    # 로컬 DirectShow COM 열거 결과(캐시)를 name/value(=moniker path)로 반환
     try:
-        from app.infrastructure.devices.dshow_enum import list_dshow_devices_detailed  # lazy import
-
-        det = list_dshow_devices_detailed()
-        items: list[dict] = []
-        for d in det or []:
-            name = d.get("name")
-            path = d.get("path")
-            if name and path:
-                items.append({"name": str(name), "value": str(path)})
-        return items
+        snap = get_device_registry().snapshot()
+        return [{"name": d.name, "value": d.path} for d in snap.devices if d.name and d.path]
     except Exception:
         return []
 
@@ -199,137 +97,193 @@ async def _resolve_to_obs_value(input_name: str, user_value: str) -> str:
     if _looks_like_moniker(user_value):
         return str(user_value)
 
-    # Prefer local mapping on Windows to avoid OBS property list API flakiness
+    # The device list and OBS's DirectShow list are the same local enumeration, so one
+    # index lookup covers the exact-value, VID/PID token, name and contains passes
     local_moniker = _resolve_local_dshow_moniker_by_label(user_value)
     if local_moniker:
         return local_moniker
 
-    # As a fallback, try via OBS property list (may fail with code 600 on some builds)
-    items = await list_dshow_devices_via_obs(input_name)
-
-    # 1) exact match on OBS raw value
-    for it in items:
-        if str(it.get("value")) == str(user_value):
-            return str(user_value)
-
-    # 2) if user label contains an identifier in parentheses (e.g., "(1bcf)" or "(3564)"),
-    #    try to match that token within the OBS device value (moniker often contains vid/pid).
-    #    For decimal tokens (e.g., 3564), also try the zero-padded 4-digit hex form (e.g., 0x0DEC -> "0dec").
-    import re
-
-    tokens: list[str] = []
-    for m in re.finditer(r"\(([0-9a-fA-F]{3,8})\)", str(user_value)):
-        tok = m.group(1).lower()
-        tokens.append(tok)
-        # if purely decimal and length 3-8, also push hex variant
-        if re.fullmatch(r"[0-9]{3,8}", tok):
-            try:
-                dec = int(tok, 10)
-                hx = f"{dec:04x}"
-                if hx not in tokens:
-                    tokens.append(hx)
-            except Exception:
-                pass
-    if tokens:
-        for it in items:
-            v = str(it.get("value") or "").lower()
-            if any(tok in v for tok in tokens):
-                return str(it.get("value"))
-
-    # 3) normalize and try matching against item names (browser/OS may append identifiers like " (1bcf)")
-    def normalize_label(s: str) -> str:
-        base = re.sub(r"\s*\([^)]*\)\s*$", "", s or "")  # drop trailing parenthesis group
-        return re.sub(r"\s+", " ", base).strip().lower()
-
-    uv_norm = normalize_label(str(user_value))
-    for it in items:
-        name = str(it.get("name") or "")
-        if not name:
-            continue
-        if normalize_label(name) == uv_norm:
-            return str(it.get("value"))
+    # Fall back to original; OBS may still accept friendly names on some platforms
+    return user_value
 
-    # 4) fuzzy contains match as last resort
-    for it in items:
-        name = str(it.get("name") or "")
-        if not name:
-            continue
-        n_norm = normalize_label(name)
-        if uv_norm and (uv_norm in n_norm or n_norm in uv_norm):
-            return str(it.get("value"))
 
-    # 5) fall back to original; OBS may still accept friendly names on some platforms
-    return user_value
+def _ok(result: dict) -> bool:
+    return bool((result.get("requestStatus") or {}).get("result"))
+
+
+def _failure(result: dict) -> str:
+    st = result.get("requestStatus") or {}
+    return f"{result.get('requestType')} code {st.get('code')}: {st.get('comment') or ''}".strip()
+
+
+def _clean_resolved(resolved: str) -> str:
+    # Strip trailing parenthesis token from resolved if it leaked through
+    if resolved and re.search(r"\([^)]*\)$", str(resolved)):
+        cleaned = re.sub(r"\s*\([^)]*\)\s*$", "", str(resolved)).strip()
+        if cleaned:
+            return cleaned
+    return resolved
+
+
+def _device_class(resolved: str) -> str:
+    return "moniker" if _looks_like_moniker(resolved) else "name"
+
+
+def _payload_variants(resolved: str, learned: Optional[Tuple[Tuple[str, ...], bool]] = None) -> list[tuple[dict, bool]]:
+    """Settings payloads to try, in order, as ``(payload, overlay)`` pairs.
+
+    Moniker ids come first, then moniker + friendly name, then the friendly name
+    alone; each with overlay before replace. ``learned`` (sorted keys, overlay), the
+    variant that worked before for this OBS version and device class, goes first.
+    """
+    friendly = re.sub(r"\s*\([^)]*\)\s*$", "", str(resolved)).strip()
+    payloads: list[dict] = []
+    if _looks_like_moniker(resolved):
+        payloads.extend([{"device_id": resolved}, {"video_device_id": resolved}])
+        if friendly:
+            payloads.extend([
+                {"device_id": resolved, "device_name": friendly},
+                {"video_device_id": resolved, "device_name": friendly},
+            ])
+    if friendly:
+        payloads.extend([{"device_name": friendly}, {"video_device": friendly}])
+    variants = [(p, overlay) for overlay in (True, False) for p in payloads]
+    if learned is not None:
+        variants.sort(key=lambda v: (tuple(sorted(v[0])), v[1]) != learned)
+    return variants
 
 
 async def set_camera_config(front: Optional[str] = None, side: Optional[str] = None, rear: Optional[str] = None) -> dict:
+    """Bind the requested camera inputs to devices, all or nothing.
+
+    Scene list, OBS version and current input settings come from one batch, the
+    first settings variant for every position (the one remembered for this OBS
+    version, see ``payload_strategy``) goes out in a second batch, and only
+    positions whose first variant failed fall back to the remaining variants
+    (concurrently across positions) and finally to recreating the input. If any
+    position still fails, every touched input is put back the way the first batch
+    found it.
+    """
     client = await obs_manager.connect()
     set_settings = getattr(client, "set_input_settings", None)
     if set_settings is None:
         raise RuntimeError("OBS client does not support set_input_settings")
 
-    out: Dict[str, Optional[str]] = {}
+    wanted = {pos: value for pos, value in (("front", front), ("side", side), ("rear", rear)) if value is not None}
+    if not wanted:
+        return {}
+    names = {pos: CAM_INPUTS[pos] for pos in wanted}
 
-    async def _apply(pos: str, device_value: Optional[str]):
-        if device_value is None:
-            out[pos] = None
-            return
-        input_name = CAM_INPUTS[pos]
-        await _ensure_input_exists(input_name)
-        resolved = await _resolve_to_obs_value(input_name, device_value)
-        # Strip trailing parenthesis token from resolved if it leaked through
-        import re as _re
-        if resolved and _re.search(r"\([^)]*\)$", str(resolved)):
-            cleaned = _re.sub(r"\s*\([^)]*\)\s*$", "", str(resolved)).strip()
-            if cleaned:
-                resolved = cleaned
-        # Apply with strong preference for moniker id first, then name
-        import re as _re2
-        friendly = _re2.sub(r"\s*\([^)]*\)\s*$", "", str(resolved)).strip()
-
-        payloads = []
-        if _looks_like_moniker(resolved):
-            # First, try with pure moniker values
-            payloads.extend([
-                {"device_id": resolved},
-                {"video_device_id": resolved},
-            ])
-            # If we have a friendly name, also try pairing it with moniker
-            if friendly:
-                payloads.extend([
-                    {"device_id": resolved, "device_name": friendly},
-                    {"video_device_id": resolved, "device_name": friendly},
-                ])
-
-        # Always include a stripped friendly name attempt as well
-        if friendly:
-            payloads.extend([
-                {"device_name": friendly},
-                {"video_device": friendly},
-            ])
+    state = await obs_manager.call_batch(
+        [("GetSceneList", None), ("GetVersion", None)] + [("GetInputSettings", {"inputName": n}) for n in names.values()]
+    )
+    scene_name = _pick_scene(list((state[0].get("responseData") or {}).get("scenes") or []) if _ok(state[0]) else [])
+    obs_version = (state[1].get("responseData") or {}).get("obsVersion") if _ok(state[1]) else None
+    before: Dict[str, Optional[dict]] = {}
+    for name, res in zip(names.values(), state[2:]):
+        data = res.get("responseData") or {}
+        before[name] = {"kind": data.get("inputKind"), "settings": data.get("inputSettings") or {}} if _ok(res) else None
+
+    values = await asyncio.gather(*(_resolve_to_obs_value(names[pos], v) for pos, v in wanted.items()))
+    resolved = {pos: _clean_resolved(v) for pos, v in zip(wanted, values)}
+    keys = {pos: strategy_key(obs_version, DSHOW_KIND, _device_class(resolved[pos])) for pos in wanted}
+    learned = {pos: payload_strategies.get(keys[pos]) for pos in wanted}
+    variants = {pos: _payload_variants(resolved[pos], learned[pos]) for pos in wanted}
+
+    # First attempt for every position in one round trip: fix kind/existence, then settings
+    requests: list[tuple[str, Optional[dict]]] = []
+    spans: Dict[str, tuple[int, int]] = {}
+    for pos, name in names.items():
+        start = len(requests)
+        cur = before[name]
+        if cur is not None and cur["kind"] != DSHOW_KIND:
+            requests.append(("RemoveInput", {"inputName": name}))
+            cur = None
+        if cur is None:
+            requests.append(("CreateInput", {
+                "sceneName": scene_name, "inputName": name, "inputKind": DSHOW_KIND,
+                "inputSettings": {}, "sceneItemEnabled": False,
+            }))
+        if variants[pos]:
+            payload, overlay = variants[pos][0]
+            requests.append(("SetInputSettings", {"inputName": name, "inputSettings": payload, "overlay": overlay}))
+        spans[pos] = (start, len(requests))
+    results = await obs_manager.call_batch(requests)
 
-        for overlay in (True, False):
-            for payload in payloads:
-                try:
-                    await obs_manager._to_thread(set_settings, input_name, payload, overlay)
-                    out[pos] = resolved
-                    return
-                except Exception:
-                    continue
+    out: Dict[str, Optional[str]] = {}
+    pending: list[str] = []
+    for pos, (a, b) in spans.items():
+        first_ok = bool(variants[pos]) and len(results) >= b and all(_ok(r) for r in results[a:b])
+        payload_strategies.count("cold" if learned[pos] is None else "hit" if first_ok else "miss")
+        if first_ok:
+            await payload_strategies.remember(keys[pos], *variants[pos][0])
+            out[pos] = resolved[pos]
+        else:
+            pending.append(pos)
+
+    recreated: set[str] = set()
+
+    async def _fallback(pos: str) -> bool:
+        name, value = names[pos], resolved[pos]
+        for payload, overlay in variants[pos][1:]:
+            try:
+                await obs_manager._to_thread(set_settings, name, payload, overlay)
+            except Exception:
+                continue
+            await payload_strategies.remember(keys[pos], payload, overlay)
+            return True
         # As last resort, recreate the input with initial settings
-        try:
-            await _recreate_input_with_device(input_name, resolved)
-            out[pos] = resolved
-            return
-        except Exception:
-            pass
-        raise RuntimeError(f"Failed to set device for {input_name}: {device_value}")
-
-    if front is not None:
-        await _apply("front", front)
-    if side is not None:
-        await _apply("side", side)
-    if rear is not None:
-        await _apply("rear", rear)
+        init = {"device_id": value} if _looks_like_moniker(value) else {"device_name": value}
+        recreated.add(name)
+        res = await obs_manager.call_batch([
+            ("RemoveInput", {"inputName": name}),
+            ("CreateInput", {
+                "sceneName": scene_name, "inputName": name, "inputKind": DSHOW_KIND,
+                "inputSettings": init, "sceneItemEnabled": False,
+            }),
+        ])
+        return len(res) == 2 and _ok(res[1])
+
+    if pending:
+        done = await asyncio.gather(*(_fallback(pos) for pos in pending), return_exceptions=True)
+        failed = [pos for pos, ok in zip(pending, done) if ok is not True]
+        for pos in pending:
+            if pos not in failed:
+                out[pos] = resolved[pos]
+        if failed:
+            await _rollback(before, names, scene_name, recreated)
+            detail = ", ".join(f"{names[p]}: {wanted[p]}" for p in failed)
+            raise RuntimeError(f"Failed to set device for {detail} (all camera inputs rolled back)")
 
     return out
+
+
+async def _rollback(before: Dict[str, Optional[dict]], names: Dict[str, str], scene_name: str, recreated: set[str]) -> None:
+    """Best effort: restore prior settings, drop inputs this apply created.
+
+    Inputs that had to be removed (kind mismatch or last-resort recreate) come
+    back with their old kind and settings in ``scene_name``; their original scene
+    placement is not restored.
+    """
+    requests: list[tuple[str, Optional[dict]]] = []
+    for name in names.values():
+        cur = before.get(name)
+        if cur is None:
+            requests.append(("RemoveInput", {"inputName": name}))
+        elif cur["kind"] == DSHOW_KIND and name not in recreated:
+            requests.append(("SetInputSettings", {"inputName": name, "inputSettings": cur["settings"], "overlay": False}))
+        else:
+            requests.append(("RemoveInput", {"inputName": name}))
+            requests.append(("CreateInput", {
+                "sceneName": scene_name, "inputName": name, "inputKind": cur["kind"] or DSHOW_KIND,
+                "inputSettings": cur["settings"], "sceneItemEnabled": False,
+            }))
+    try:
+        results = await obs_manager.call_batch(requests)
+    except Exception as exc:  # noqa: BLE001
+        logger.error("camera config rollback failed: %s", exc)
+        return
+    for req, res in zip(requests, results):
+        # Removing an input that is already gone is expected here
+        if not _ok(res) and req[0] != "RemoveInput":
+            logger.warning("camera config rollback step failed: %s", _failure(res))
@@ -0,0 +1,352 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional
+
+from prometheus_client import Histogram
+
+from app.obs_client import obs_manager
+
+
+HIST_LAYOUT_APPLY_SECONDS = Histogram(
+    "app_obs_layout_apply_seconds",
+    "Snapshot + diff + apply of a layout profile, all passes",
+    ["layout"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+# Transform values are floats on the OBS side; smaller differences are not changes
+_TRANSFORM_EPS = 1e-3
+
+
+@dataclass(slots=True)
+class FilterSpec:
+    name: str
+    kind: str
+    settings: dict = field(default_factory=dict)
+    enabled: bool = True
+
+
+@dataclass(slots=True)
+class InputSpec:
+    kind: str
+    settings: dict = field(default_factory=dict)
+    scene: str = "Home"
+    # False: ``settings`` are only used when the input has to be created
+    enforce_settings: bool = True
+    filters: list[FilterSpec] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class ItemSpec:
+    source: str
+    # None leaves the current visibility alone
+    enabled: Optional[bool] = True
+    # Only the keys given are compared/set (positionX, scaleX, cropLeft, boundsType, ...)
+    transform: dict = field(default_factory=dict)
+    index: Optional[int] = None
+
+
+@dataclass(slots=True)
+class DesiredLayout:
+    scenes: list[str] = field(default_factory=list)
+    inputs: Dict[str, InputSpec] = field(default_factory=dict)
+    items: Dict[str, list[ItemSpec]] = field(default_factory=dict)
+    # Scenes whose items not listed in ``items`` get hidden
+    exclusive: set[str] = field(default_factory=set)
+    program_scene: Optional[str] = None
+
+    def snapshot_targets(self) -> dict:
+        return {
+            "settings_for": [n for n, s in self.inputs.items() if s.enforce_settings and s.settings],
+            "items_for": list(self.items),
+            "filters_for": [n for n, s in self.inputs.items() if s.filters],
+        }
+
+
+@dataclass(slots=True)
+class LayoutSnapshot:
+    """Scene names (OBS order), input kinds and, for selected inputs/scenes, their
+    settings, scene items (with transforms) and filters."""
+
+    scenes: list[str]
+    inputs: Dict[str, str]
+    settings: Dict[str, dict]
+    took_ms: float = 0.0
+    items: Dict[str, list[dict]] = field(default_factory=dict)
+    filters: Dict[str, list[dict]] = field(default_factory=dict)
+    program_scene: Optional[str] = None
+
+
+@dataclass(slots=True)
+class LayoutPlan:
+    requests: list[tuple[str, dict]] = field(default_factory=list)
+    changes: list[str] = field(default_factory=list)
+    # Present with the wrong kind; reported, never replaced
+    conflicts: list[str] = field(default_factory=list)
+    # Items created by this plan still need transform/index/visibility (ids are
+    # only known after it ran); apply_layout runs one more pass for them
+    followup: bool = False
+
+    @property
+    def empty(self) -> bool:
+        return not self.requests
+
+    def add(self, request_type: str, data: dict, change: str) -> None:
+        self.requests.append((request_type, data))
+        self.changes.append(change)
+
+    def as_dict(self) -> dict:
+        return {
+            "changes": list(self.changes),
+            "requests": [{"requestType": t, "requestData": d} for t, d in self.requests],
+            "conflicts": list(self.conflicts),
+            "followup": self.followup,
+        }
+
+
+def _ok(result: dict) -> bool:
+    return bool((result.get("requestStatus") or {}).get("result"))
+
+
+async def take_snapshot(
+    settings_for: Iterable[str] = (),
+    items_for: Iterable[str] = (),
+    filters_for: Iterable[str] = (),
+) -> LayoutSnapshot:
+    """Read scenes, inputs and the settings/items/filters asked for in one batch."""
+    t0 = time.perf_counter()
+    wanted = list(dict.fromkeys(settings_for))
+    scenes_wanted = list(dict.fromkeys(items_for))
+    sources_wanted = list(dict.fromkeys(filters_for))
+    results = await obs_manager.call_batch(
+        [("GetSceneList", None), ("GetInputList", None)]
+        + [("GetInputSettings", {"inputName": n}) for n in wanted]
+        + [("GetSceneItemList", {"sceneName": n}) for n in scenes_wanted]
+        + [("GetSourceFilterList", {"sourceName": n}) for n in sources_wanted]
+    )
+    if len(results) < 2 or not _ok(results[0]) or not _ok(results[1]):
+        raise RuntimeError("OBS did not return the scene/input lists")
+    scenes_raw = (results[0].get("responseData") or {}).get("scenes") or []
+    # GetSceneList lists scenes bottom-up (sceneIndex); keep the order OBS shows
+    scenes_raw = sorted(scenes_raw, key=lambda s: -int(s.get("sceneIndex", 0) or 0))
+    scenes = [str(s.get("sceneName") or s.get("name")) for s in scenes_raw if s.get("sceneName") or s.get("name")]
+    inputs = {
+        str(i.get("inputName") or i.get("name")): str(i.get("inputKind") or i.get("kind") or "")
+        for i in (results[1].get("responseData") or {}).get("inputs") or []
+        if i.get("inputName") or i.get("name")
+    }
+    rest = iter(results[2:])
+    settings: Dict[str, dict] = {}
+    for name, res in zip(wanted, rest):
+        if _ok(res):
+            settings[name] = dict((res.get("responseData") or {}).get("inputSettings") or {})
+    items: Dict[str, list[dict]] = {}
+    for name, res in zip(scenes_wanted, rest):
+        if _ok(res):
+            items[name] = list((res.get("responseData") or {}).get("sceneItems") or [])
+    filters: Dict[str, list[dict]] = {}
+    for name, res in zip(sources_wanted, rest):
+        if _ok(res):
+            filters[name] = list((res.get("responseData") or {}).get("filters") or [])
+    return LayoutSnapshot(
+        scenes,
+        inputs,
+        settings,
+        (time.perf_counter() - t0) * 1000.0,
+        items=items,
+        filters=filters,
+        program_scene=(results[0].get("responseData") or {}).get("currentProgramSceneName"),
+    )
+
+
+def _differs(want: Any, have: Any) -> bool:
+    if isinstance(want, (int, float)) and isinstance(have, (int, float)) and not isinstance(want, bool):
+        return abs(float(want) - float(have)) > _TRANSFORM_EPS
+    return want != have
+
+
+def diff_layout(current: LayoutSnapshot, desired: DesiredLayout) -> LayoutPlan:
+    """Smallest set of requests that makes ``current`` satisfy ``desired``.
+
+    Only additions and updates: scenes, inputs, items and filters OBS has beyond
+    the desired layout are left alone (except hiding unlisted items in
+    ``exclusive`` scenes), and settings/transforms are compared key by key so
+    anything that already matches costs nothing. Requests are ordered so that
+    one serial batch can run them: scenes, inputs, scene items, filters, then
+    the program scene.
+    """
+    plan = LayoutPlan()
+    scenes = set(current.scenes)
+    for name in list(desired.scenes) + [s for s in desired.items if s not in desired.scenes]:
+        if name not in scenes:
+            plan.add("CreateScene", {"sceneName": name}, f"create scene {name}")
+            scenes.add(name)
+    fallback_scene: Optional[str] = next(iter(desired.scenes), None) or next(iter(current.scenes), None)
+
+    sources = set(current.inputs) | scenes
+    # (scene, source) pairs that a CreateInput in this plan adds an item for
+    created_items: set[tuple[str, str]] = set()
+    created_inputs: set[str] = set()
+    for name, spec in desired.inputs.items():
+        kind = current.inputs.get(name)
+        if kind is None:
+            home = [sc for sc, items in desired.items.items() if any(it.source == name for it in items)]
+            scene = spec.scene if spec.scene in scenes else (home[0] if home else fallback_scene)
+            if scene is None:
+                plan.conflicts.append(f"input {name}: no scene to create it in")
+                continue
+            plan.add("CreateInput", {
+                "sceneName": scene, "inputName": name, "inputKind": spec.kind,
+                "inputSettings": dict(spec.settings), "sceneItemEnabled": False,
+            }, f"create input {name} ({spec.kind}) in {scene}")
+            created_items.add((scene, name))
+            created_inputs.add(name)
+            sources.add(name)
+            continue
+        if kind != spec.kind:
+            plan.conflicts.append(f"input {name}: kind {kind}, expected {spec.kind}")
+            continue
+        if not spec.enforce_settings or not spec.settings:
+            continue
+        have = current.settings.get(name, {})
+        delta = {k: v for k, v in spec.settings.items() if have.get(k) != v}
+        if delta:
+            plan.add(
+                "SetInputSettings",
+                {"inputName": name, "inputSettings": delta, "overlay": True},
+                f"update input {name}: {', '.join(sorted(delta))}",
+            )
+
+    for scene, specs in desired.items.items():
+        have_items = current.items.get(scene, [])
+        by_source: Dict[str, dict] = {}
+        for it in have_items:
+            by_source.setdefault(str(it.get("sourceName")), it)
+        for spec in specs:
+            it = by_source.get(spec.source)
+            if it is None:
+                if spec.source not in sources:
+                    plan.conflicts.append(f"item {scene}/{spec.source}: no such source")
+                    continue
+                if (scene, spec.source) not in created_items:
+                    plan.add("CreateSceneItem", {
+                        "sceneName": scene, "sourceName": spec.source,
+                        "sceneItemEnabled": True if spec.enabled is None else bool(spec.enabled),
+                    }, f"add {spec.source} to {scene}")
+                    if spec.transform or spec.index is not None:
+                        plan.followup = True
+                else:
+                    plan.followup = True
+                continue
+            item_id = it.get("sceneItemId")
+            if spec.enabled is not None and bool(it.get("sceneItemEnabled")) != spec.enabled:
+                plan.add("SetSceneItemEnabled", {
+                    "sceneName": scene, "sceneItemId": item_id, "sceneItemEnabled": spec.enabled,
+                }, f"{'show' if spec.enabled else 'hide'} {scene}/{spec.source}")
+            have_tf = it.get("sceneItemTransform") or {}
+            delta = {k: v for k, v in spec.transform.items() if _differs(v, have_tf.get(k))}
+            if delta:
+                plan.add("SetSceneItemTransform", {
+                    "sceneName": scene, "sceneItemId": item_id, "sceneItemTransform": delta,
+                }, f"transform {scene}/{spec.source}: {', '.join(sorted(delta))}")
+            if spec.index is not None and it.get("sceneItemIndex") != spec.index:
+                plan.add("SetSceneItemIndex", {
+                    "sceneName": scene, "sceneItemId": item_id, "sceneItemIndex": spec.index,
+                }, f"move {scene}/{spec.source} to index {spec.index}")
+        if scene in desired.exclusive:
+            listed = {spec.source for spec in specs}
+            for it in have_items:
+                if str(it.get("sourceName")) not in listed and it.get("sceneItemEnabled"):
+                    plan.add("SetSceneItemEnabled", {
+                        "sceneName": scene, "sceneItemId": it.get("sceneItemId"), "sceneItemEnabled": False,
+                    }, f"hide {scene}/{it.get('sourceName')} (not in layout)")
+
+    for name, spec in desired.inputs.items():
+        if not spec.filters or (name not in created_inputs and current.inputs.get(name) != spec.kind):
+            continue
+        have_filters = {str(f.get("filterName")): f for f in current.filters.get(name, [])}
+        for flt in spec.filters:
+            f = have_filters.get(flt.name)
+            if f is None:
+                plan.add("CreateSourceFilter", {
+                    "sourceName": name, "filterName": flt.name, "filterKind": flt.kind,
+                    "filterSettings": dict(flt.settings),
+                }, f"add filter {name}/{flt.name} ({flt.kind})")
+                if not flt.enabled:
+                    plan.add("SetSourceFilterEnabled", {
+                        "sourceName": name, "filterName": flt.name, "filterEnabled": False,
+                    }, f"disable filter {name}/{flt.name}")
+                continue
+            if f.get("filterKind") != flt.kind:
+                plan.conflicts.append(f"filter {name}/{flt.name}: kind {f.get('filterKind')}, expected {flt.kind}")
+                continue
+            have = f.get("filterSettings") or {}
+            delta = {k: v for k, v in flt.settings.items() if _differs(v, have.get(k))}
+            if delta:
+                plan.add("SetSourceFilterSettings", {
+                    "sourceName": name, "filterName": flt.name, "filterSettings": delta, "overlay": True,
+                }, f"update filter {name}/{flt.name}: {', '.join(sorted(delta))}")
+            if bool(f.get("filterEnabled", True)) != flt.enabled:
+                plan.add("SetSourceFilterEnabled", {
+                    "sourceName": name, "filterName": flt.name, "filterEnabled": flt.enabled,
+                }, f"{'enable' if flt.enabled else 'disable'} filter {name}/{flt.name}")
+
+    if desired.program_scene and desired.program_scene != current.program_scene:
+        if desired.program_scene in scenes:
+            plan.add("SetCurrentProgramScene", {"sceneName": desired.program_scene}, f"switch program to {desired.program_scene}")
+        else:
+            plan.conflicts.append(f"program scene {desired.program_scene}: no such scene")
+    return plan
+
+
+async def apply_plan(plan: LayoutPlan) -> list[str]:
+    """Send the whole plan as one batch; returns descriptions of failed requests."""
+    if plan.empty:
+        return []
+    results = await obs_manager.call_batch(plan.requests)
+    failed: list[str] = []
+    for change, res in zip(plan.changes, results):
+        if not _ok(res):
+            st = res.get("requestStatus") or {}
+            failed.append(f"{change}: code {st.get('code')} {st.get('comment') or ''}".strip())
+    return failed
+
+
+_apply_lock = asyncio.Lock()
+
+
+async def apply_layout(desired: DesiredLayout, *, name: str = "", dry_run: bool = False) -> dict:
+    """Snapshot -> diff -> one batch, repeated once if the plan created scene items.
+
+    With ``dry_run`` only the first plan is returned. Applies are serialized so two
+    profile switches cannot interleave their batches.
+    """
+    t0 = time.perf_counter()
+    passes: list[dict] = []
+    async with _apply_lock:
+        for _ in range(2):
+            snap = await take_snapshot(**desired.snapshot_targets())
+            plan = diff_layout(snap, desired)
+            entry = {**plan.as_dict(), "snapshot_ms": round(snap.took_ms, 2)}
+            passes.append(entry)
+            if dry_run or plan.empty:
+                break
+            t1 = time.perf_counter()
+            entry["failed"] = await apply_plan(plan)
+            entry["apply_ms"] = round((time.perf_counter() - t1) * 1000.0, 2)
+            if not plan.followup or entry["failed"]:
+                break
+    took = time.perf_counter() - t0
+    if not dry_run:
+        HIST_LAYOUT_APPLY_SECONDS.labels(layout=name or "-").observe(took)
+    return {
+        "layout": name,
+        "dry_run": dry_run,
+        "passes": passes,
+        "changed": sum(len(p["changes"]) for p in passes) if not dry_run else 0,
+        "failed": [f for p in passes for f in p.get("failed", [])],
+        "total_ms": round(took * 1000.0, 2),
+    }
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.infrastructure.config.store import JsonConfigStore
+from app.infrastructure.obs.layout import DesiredLayout, FilterSpec, InputSpec, ItemSpec
+
+
+LAYOUTS_DIR = Path("config") / "layouts"
+
+_NAME_RE = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+
+
+def _require_dict(value: Any, where: str) -> dict:
+    if value is None:
+        return {}
+    if not isinstance(value, dict):
+        raise ValueError(f"{where}: expected an object")
+    return value
+
+
+def parse_layout(data: Dict[str, Any]) -> DesiredLayout:
+    """Build a :class:`DesiredLayout` from a profile document.
+
+    ``{"scenes": {"LiveFront": {"exclusive": true, "items": [{"source": "cam_front",
+    "enabled": true, "transform": {...}, "index": 0}]}}, "inputs": {"cam_front":
+    {"kind": "dshow_input", "settings": {...}, "enforce_settings": false,
+    "filters": [{"name": "crop", "kind": "crop_filter", "settings": {...}}]}},
+    "program_scene": "LiveFront"}``. Raises ``ValueError`` with the offending path.
+    """
+    layout = DesiredLayout()
+    for scene, body in _require_dict(data.get("scenes"), "scenes").items():
+        body = _require_dict(body, f"scenes.{scene}")
+        layout.scenes.append(str(scene))
+        if body.get("exclusive"):
+            layout.exclusive.add(str(scene))
+        items: list[ItemSpec] = []
+        for i, it in enumerate(body.get("items") or []):
+            it = _require_dict(it, f"scenes.{scene}.items[{i}]")
+            if not it.get("source"):
+                raise ValueError(f"scenes.{scene}.items[{i}]: missing source")
+            index = it.get("index")
+            items.append(
+                ItemSpec(
+                    source=str(it["source"]),
+                    enabled=None if it.get("enabled", True) is None else bool(it.get("enabled", True)),
+                    transform=dict(_require_dict(it.get("transform"), f"scenes.{scene}.items[{i}].transform")),
+                    index=None if index is None else int(index),
+                )
+            )
+        if items or body.get("exclusive"):
+            layout.items[str(scene)] = items
+    for name, body in _require_dict(data.get("inputs"), "inputs").items():
+        body = _require_dict(body, f"inputs.{name}")
+        if not body.get("kind"):
+            raise ValueError(f"inputs.{name}: missing kind")
+        filters: list[FilterSpec] = []
+        for i, f in enumerate(body.get("filters") or []):
+            f = _require_dict(f, f"inputs.{name}.filters[{i}]")
+            if not f.get("name") or not f.get("kind"):
+                raise ValueError(f"inputs.{name}.filters[{i}]: name and kind are required")
+            filters.append(
+                FilterSpec(
+                    name=str(f["name"]),
+                    kind=str(f["kind"]),
+                    settings=dict(_require_dict(f.get("settings"), f"inputs.{name}.filters[{i}].settings")),
+                    enabled=bool(f.get("enabled", True)),
+                )
+            )
+        layout.inputs[str(name)] = InputSpec(
+            kind=str(body["kind"]),
+            settings=dict(_require_dict(body.get("settings"), f"inputs.{name}.settings")),
+            scene=str(body.get("scene") or "Home"),
+            enforce_settings=bool(body.get("enforce_settings", True)),
+            filters=filters,
+        )
+    program = data.get("program_scene")
+    layout.program_scene = str(program) if program else None
+    return layout
+
+
+class LayoutProfiles:
+    """``config/layouts/<name>.json`` profiles, each read through a cached store."""
+
+    def __init__(self, directory: Path = LAYOUTS_DIR) -> None:
+        self.directory = Path(directory)
+        self._stores: Dict[str, JsonConfigStore] = {}
+        self._lock = threading.Lock()
+
+    def names(self) -> list[str]:
+        try:
+            return sorted(p.stem for p in self.directory.glob("*.json") if _NAME_RE.match(p.stem))
+        except OSError:
+            return []
+
+    def raw(self, name: str) -> Optional[Dict[str, Any]]:
+        if not _NAME_RE.match(name or ""):
+            return None
+        path = self.directory / f"{name}.json"
+        if not path.is_file():
+            return None
+        with self._lock:
+            store = self._stores.get(name)
+            if store is None:
+                store = self._stores[name] = JsonConfigStore(path, default=dict, normalize=dict)
+        return store.load()
+
+    def get(self, name: str) -> Optional[DesiredLayout]:
+        data = self.raw(name)
+        return None if data is None else parse_layout(data)
+
+
+layout_profiles = LayoutProfiles()
@@ -0,0 +1,498 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from prometheus_client import Histogram
+
+from app.infrastructure.config.store import JsonConfigStore
+from app.obs_client import obs_manager
+from app.utils.screenshot import build_screenshot_path
+
+
+_log = logging.getLogger(__name__)
+
+_DEFAULT_CONFIG_FILE = Path("config") / "macros.json"
+
+# Scene step target meaning "the program scene when the macro started"
+PREVIOUS_SCENE = "@previous"
+
+STEP_KINDS = ("scene", "screenshot", "set_input", "overlay", "wait", "parallel")
+
+HIST_MACRO_SECONDS = Histogram(
+    "app_macro_seconds",
+    "Macro run time from start until every step (including overlay sends) finished",
+    ["macro"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+# OBS steps sent together in one request batch are observed once as kind="batch"
+HIST_MACRO_STEP_SECONDS = Histogram(
+    "app_macro_step_seconds",
+    "Macro step time by step kind",
+    ["kind"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+
+def _normalize(data: dict) -> dict:
+    macros = data.get("macros") if isinstance(data.get("macros"), dict) else {}
+    rules = data.get("scene_overlay") if isinstance(data.get("scene_overlay"), dict) else {}
+    scenes = rules.get("scenes") if isinstance(rules.get("scenes"), dict) else {}
+    default = rules.get("default", "pause")
+    return {
+        "macros": {str(k): v for k, v in macros.items() if isinstance(v, dict)},
+        "scene_overlay": {
+            "default": str(default) if default else None,
+            "scenes": {str(k).strip().lower(): str(v) for k, v in scenes.items() if v},
+        },
+    }
+
+
+macros_store = JsonConfigStore(
+    _DEFAULT_CONFIG_FILE,
+    # Overlay playback runs on the streaming scenes only, as the scene route always did
+    default=lambda: {"macros": {}, "scene_overlay": {"default": "pause", "scenes": {"youtube": "resume", "shorts": "resume"}}},
+    normalize=_normalize,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class MacroStep:
+    kind: str
+    label: str
+    scene: Optional[str] = None
+    scene_rule: bool = True
+    source: Optional[str] = None
+    update_input: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    image_format: str = "png"
+    input: Optional[str] = None
+    settings: Dict[str, Any] = field(default_factory=dict)
+    overlay: bool = True
+    action: Optional[str] = None
+    ms: int = 0
+    branches: tuple[tuple["MacroStep", ...], ...] = ()
+
+    def uses_previous(self) -> bool:
+        if self.kind == "scene":
+            return self.scene == PREVIOUS_SCENE
+        return any(s.uses_previous() for b in self.branches for s in b)
+
+
+@dataclass(frozen=True, slots=True)
+class Macro:
+    name: str
+    steps: tuple[MacroStep, ...]
+    description: str = ""
+    batch: bool = True
+
+
+def _opt_int(value: Any, where: str) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{where}: expected an integer")
+
+
+def parse_step(data: Any, where: str) -> MacroStep:
+    """Build one :class:`MacroStep`; raises ``ValueError`` with the offending path."""
+    if not isinstance(data, dict):
+        raise ValueError(f"{where}: expected an object")
+    kind = str(data.get("kind") or "")
+    if kind not in STEP_KINDS:
+        raise ValueError(f"{where}: unknown kind {kind!r} (expected one of {', '.join(STEP_KINDS)})")
+    label = str(data.get("label") or "")
+    if kind == "scene":
+        if not data.get("scene"):
+            raise ValueError(f"{where}: missing scene")
+        return MacroStep(
+            kind,
+            label or f"scene:{data['scene']}",
+            scene=str(data["scene"]),
+            scene_rule=bool(data.get("overlay_rule", True)),
+        )
+    if kind == "screenshot":
+        if not data.get("source"):
+            raise ValueError(f"{where}: missing source")
+        return MacroStep(
+            kind,
+            label or f"screenshot:{data['source']}",
+            source=str(data["source"]),
+            update_input=str(data.get("update_input") or "") or None,
+            width=_opt_int(data.get("width"), f"{where}.width"),
+            height=_opt_int(data.get("height"), f"{where}.height"),
+            image_format=str(data.get("format") or "png"),
+        )
+    if kind == "set_input":
+        if not data.get("input"):
+            raise ValueError(f"{where}: missing input")
+        settings = data.get("settings")
+        if not isinstance(settings, dict):
+            raise ValueError(f"{where}.settings: expected an object")
+        return MacroStep(
+            kind,
+            label or f"set_input:{data['input']}",
+            input=str(data["input"]),
+            settings=dict(settings),
+            overlay=bool(data.get("overlay", True)),
+        )
+    if kind == "overlay":
+        if not data.get("action"):
+            raise ValueError(f"{where}: missing action")
+        return MacroStep(kind, label or f"overlay:{data['action']}", action=str(data["action"]))
+    if kind == "wait":
+        ms = _opt_int(data.get("ms"), f"{where}.ms")
+        if ms is None or ms < 0:
+            raise ValueError(f"{where}: ms must be a non-negative integer")
+        return MacroStep(kind, label or f"wait:{ms}ms", ms=ms)
+    # parallel: each entry is a step or a list of steps run in order
+    entries = data.get("steps")
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"{where}.steps: expected a non-empty list")
+    branches = []
+    for b, entry in enumerate(entries):
+        seq = entry if isinstance(entry, list) else [entry]
+        branches.append(tuple(parse_step(s, f"{where}.steps[{b}][{i}]") for i, s in enumerate(seq)))
+    return MacroStep(kind, label or f"parallel:{len(branches)}", branches=tuple(branches))
+
+
+def parse_macro(name: str, data: Dict[str, Any]) -> Macro:
+    """``{"description": "...", "batch": true, "steps": [{"kind": "scene", "scene":
+    "ProcedureBeforeFront"}, {"kind": "wait", "ms": 150}, {"kind": "screenshot",
+    "source": "cam_front", "update_input": "img_before_front"}, {"kind": "scene",
+    "scene": "@previous"}]}``. Raises ``ValueError`` with the offending path.
+    """
+    steps = data.get("steps")
+    if not isinstance(steps, list) or not steps:
+        raise ValueError(f"macros.{name}.steps: expected a non-empty list")
+    return Macro(
+        name=name,
+        steps=tuple(parse_step(s, f"macros.{name}.steps[{i}]") for i, s in enumerate(steps)),
+        description=str(data.get("description") or ""),
+        batch=bool(data.get("batch", True)),
+    )
+
+
+class MacroStepError(RuntimeError):
+    pass
+
+
+@dataclass(slots=True)
+class _Run:
+    previous: Optional[str]
+    scene: Optional[str] = None
+    records: list[dict] = field(default_factory=list)
+    batches: list[dict] = field(default_factory=list)
+    pending: list[asyncio.Task] = field(default_factory=list)
+
+    def record(self, step: MacroStep, path: str) -> dict:
+        rec: Dict[str, Any] = {"step": path, "kind": step.kind, "label": step.label, "ok": None, "ms": None}
+        self.records.append(rec)
+        return rec
+
+
+Publish = Callable[[dict], Awaitable[None]]
+
+
+class MacroEngine:
+    """Run named step sequences from ``config/macros.json``.
+
+    Consecutive OBS steps (scene, screenshot, set_input and short waits, which
+    become ``Sleep`` requests) go out as one serial request batch, so a press
+    costs one round trip instead of one per step. A ``parallel`` step sends its
+    single-step branches as one parallel batch and runs longer branches as
+    concurrent tasks. Overlay sends are pipelined: they start when reached and
+    the sequence does not wait for them until the end. Waits longer than
+    ``batch_sleep_max_ms`` are slept locally so the shared OBS connection is not
+    held for them. The first failed step stops the macro.
+    """
+
+    def __init__(
+        self,
+        store: JsonConfigStore,
+        *,
+        publish: Publish,
+        batch_sleep_max_ms: int = 500,
+        screenshot_dir: Optional[str] = None,
+        history: int = 20,
+    ) -> None:
+        self._store = store
+        self._publish = publish
+        self.batch_sleep_max_ms = max(0, int(batch_sleep_max_ms))
+        self.screenshot_dir = screenshot_dir
+        self._lock = threading.Lock()
+        self._running: Dict[str, int] = {}
+        self._recent: deque[dict] = deque(maxlen=max(1, int(history)))
+
+    # ------------------------------------------------------------ config
+    def names(self) -> list[str]:
+        return sorted(self._store.load()["macros"])
+
+    def raw(self, name: str) -> Optional[Dict[str, Any]]:
+        return self._store.load()["macros"].get(name)
+
+    def get(self, name: str) -> Optional[Macro]:
+        data = self.raw(name)
+        return None if data is None else parse_macro(name, data)
+
+    def overlay_action_for(self, scene: str) -> Optional[str]:
+        rules = self._store.load()["scene_overlay"]
+        return rules["scenes"].get((scene or "").strip().lower(), rules["default"])
+
+    async def apply_scene_rules(self, scene: str) -> Optional[str]:
+        """Send the overlay control configured for ``scene`` (``scene_overlay`` in macros.json)."""
+        action = self.overlay_action_for(scene)
+        if action:
+            await self._publish({"type": "overlay_control", "action": action, "scene": scene})
+        return action
+
+    # ------------------------------------------------------------ running
+    async def run(self, name: str, *, trigger: str = "api") -> dict:
+        """Run macro ``name`` and return a per-step timing report.
+
+        Raises ``KeyError`` for an unknown macro and ``ValueError`` for a malformed one.
+        """
+        macro = self.get(name)
+        if macro is None:
+            raise KeyError(name)
+        with self._lock:
+            self._running[name] = self._running.get(name, 0) + 1
+        started = datetime.now().isoformat(timespec="seconds")
+        t0 = time.perf_counter()
+        ctx = _Run(previous=None)
+        error: Optional[str] = None
+        try:
+            if any(s.uses_previous() for s in macro.steps):
+                ctx.previous = await self._current_scene()
+            await self._run_steps(macro.steps, ctx, macro.batch, "")
+        except Exception as exc:  # noqa: BLE001
+            error = str(exc)
+        finally:
+            # Pipelined overlay sends finish before the macro counts as done
+            if ctx.pending:
+                await asyncio.gather(*ctx.pending, return_exceptions=True)
+            with self._lock:
+                self._running[name] -= 1
+                if not self._running[name]:
+                    del self._running[name]
+        elapsed = time.perf_counter() - t0
+        HIST_MACRO_SECONDS.labels(macro=name).observe(elapsed)
+        if error is None:
+            error = next((f"{r['label']}: {r['error']}" for r in ctx.records if r.get("error")), None)
+        report = {
+            "macro": name,
+            "trigger": trigger,
+            "ok": error is None,
+            "error": error,
+            "started_at": started,
+            "ms": round(elapsed * 1000.0, 2),
+            "previous_scene": ctx.previous,
+            "batches": ctx.batches,
+            "requests": sum(b["requests"] for b in ctx.batches),
+            "steps": ctx.records,
+        }
+        with self._lock:
+            self._recent.appendleft(report)
+        if error is None:
+            _log.info("macro %s done in %.1f ms (%d batches)", name, elapsed * 1000.0, len(ctx.batches))
+        else:
+            _log.warning("macro %s failed after %.1f ms: %s", name, elapsed * 1000.0, error)
+        return report
+
+    async def _current_scene(self) -> Optional[str]:
+        results = await obs_manager.call_batch([("GetCurrentProgramScene", None)])
+        data = (results[0].get("responseData") or {}) if results else {}
+        return data.get("currentProgramSceneName") or data.get("sceneName")
+
+    def _batchable(self, step: MacroStep) -> bool:
+        if step.kind == "wait":
+            return step.ms <= self.batch_sleep_max_ms
+        return step.kind in {"scene", "screenshot", "set_input"}
+
+    async def _run_steps(self, steps: tuple[MacroStep, ...], ctx: _Run, batch: bool, prefix: str) -> None:
+        i = 0
+        while i < len(steps):
+            j = i + 1
+            if batch and self._batchable(steps[i]):
+                while j < len(steps) and self._batchable(steps[j]):
+                    j += 1
+            paths = [f"{prefix}{k}" for k in range(i, j)]
+            await self._run_stage(list(steps[i:j]), paths, ctx, batch)
+            i = j
+
+    async def _run_stage(self, steps: list[MacroStep], paths: list[str], ctx: _Run, batch: bool) -> None:
+        step = steps[0]
+        if len(steps) > 1 or step.kind in {"scene", "screenshot", "set_input"}:
+            await self._send(steps, [ctx.record(s, p) for s, p in zip(steps, paths)], ctx)
+        elif step.kind == "overlay":
+            rec = ctx.record(step, paths[0])
+            ctx.pending.append(asyncio.create_task(self._overlay(step, rec, ctx.scene)))
+        elif step.kind == "wait":
+            rec = ctx.record(step, paths[0])
+            t0 = time.perf_counter()
+            await asyncio.sleep(step.ms / 1000.0)
+            self._finish(rec, step.kind, time.perf_counter() - t0)
+        else:
+            await self._parallel(step, ctx.record(step, paths[0]), paths[0], ctx, batch)
+
+    def _finish(self, rec: dict, kind: str, seconds: float, error: Optional[str] = None) -> None:
+        rec["ok"] = error is None
+        rec["ms"] = round(seconds * 1000.0, 2)
+        if error:
+            rec["error"] = error
+        HIST_MACRO_STEP_SECONDS.labels(kind=kind).observe(seconds)
+
+    async def _overlay(self, step: MacroStep, rec: dict, scene: Optional[str]) -> None:
+        t0 = time.perf_counter()
+        try:
+            await self._publish({"type": "overlay_control", "action": step.action, "scene": scene})
+            self._finish(rec, step.kind, time.perf_counter() - t0)
+        except Exception as exc:  # noqa: BLE001
+            self._finish(rec, step.kind, time.perf_counter() - t0, str(exc))
+
+    def _requests(self, step: MacroStep, rec: dict, ctx: _Run) -> list[tuple[str, Optional[dict]]]:
+        if step.kind == "scene":
+            target = ctx.previous if step.scene == PREVIOUS_SCENE else step.scene
+            if not target:
+                raise MacroStepError(f"{step.label}: current program scene unknown")
+            rec["scene"] = target
+            return [("SetCurrentProgramScene", {"sceneName": target})]
+        if step.kind == "screenshot":
+            path = build_screenshot_path(step.source or "", image_format=step.image_format, base_dir=self.screenshot_dir)
+            rec["path"] = path
+            data: Dict[str, Any] = {
+                "sourceName": step.source,
+                "imageFormat": step.image_format,
+                "imageFilePath": path,
+                "imageCompressionQuality": 100,
+            }
+            if step.width:
+                data["imageWidth"] = step.width
+            if step.height:
+                data["imageHeight"] = step.height
+            out: list[tuple[str, Optional[dict]]] = [("SaveSourceScreenshot", data)]
+            if step.update_input:
+                # The path is known up front, so the image input update rides in the same batch
+                out.append(("SetInputSettings", {"inputName": step.update_input, "inputSettings": {"file": path}, "overlay": True}))
+            return out
+        if step.kind == "set_input":
+            return [("SetInputSettings", {"inputName": step.input, "inputSettings": dict(step.settings), "overlay": step.overlay})]
+        return [("Sleep", {"sleepMillis": step.ms})]
+
+    async def _send(self, steps: list[MacroStep], recs: list[dict], ctx: _Run, *, parallel: bool = False) -> None:
+        """Send ``steps`` as request batches and fill in their records.
+
+        Serial: one batch that halts at the first failure. Parallel: the first
+        request of every step in one parallel batch, follow-ups (a screenshot's
+        input update) in a second one for the steps whose first request worked.
+        """
+        per_step = [self._requests(s, r, ctx) for s, r in zip(steps, recs)]
+        if parallel:
+            depth = max(len(p) for p in per_step)
+            phases = [[(k, p[d]) for k, p in enumerate(per_step) if d < len(p)] for d in range(depth)]
+        else:
+            phases = [[(k, r) for k, p in enumerate(per_step) for r in p]]
+        failed: Dict[int, str] = {}
+        t0 = time.perf_counter()
+        for phase in phases:
+            phase = [(k, r) for k, r in phase if k not in failed]
+            if not phase:
+                continue
+            tb = time.perf_counter()
+            results = await obs_manager.call_batch(
+                [r for _k, r in phase], halt_on_failure=not parallel, execution_type=2 if parallel else 0
+            )
+            ctx.batches.append(
+                {
+                    "requests": len(phase),
+                    "parallel": parallel,
+                    "ms": round((time.perf_counter() - tb) * 1000.0, 2),
+                    "steps": list(dict.fromkeys(recs[k]["step"] for k, _r in phase)),
+                }
+            )
+            for n, (k, _r) in enumerate(phase):
+                if k in failed:
+                    continue
+                if n >= len(results):
+                    failed[k] = "not run (batch halted)"
+                    continue
+                status = results[n].get("requestStatus") or {}
+                if not status.get("result"):
+                    failed[k] = f"{results[n].get('requestType')} code {status.get('code')}: {status.get('comment') or ''}".strip()
+        elapsed = time.perf_counter() - t0
+        single = len(steps) == 1
+        HIST_MACRO_STEP_SECONDS.labels(kind=steps[0].kind if single else "batch").observe(elapsed)
+        for k, (step, rec) in enumerate(zip(steps, recs)):
+            rec["ok"] = k not in failed
+            # Per-request times are not reported inside a batch; the batch entry carries them
+            rec["ms"] = round(elapsed * 1000.0, 2) if single else None
+            rec["batch"] = len(ctx.batches) - 1
+            if k in failed:
+                rec["error"] = failed[k]
+            elif step.kind == "scene":
+                ctx.scene = rec["scene"]
+                if step.scene_rule:
+                    ctx.pending.append(asyncio.create_task(self._scene_rule(rec["scene"])))
+        if failed:
+            k = min(failed)
+            raise MacroStepError(f"{steps[k].label}: {failed[k]}")
+
+    async def _scene_rule(self, scene: str) -> None:
+        try:
+            await self.apply_scene_rules(scene)
+        except Exception as exc:  # noqa: BLE001
+            _log.debug("scene overlay rule failed for %s: %s", scene, exc)
+
+    async def _parallel(self, step: MacroStep, rec: dict, path: str, ctx: _Run, batch: bool) -> None:
+        t0 = time.perf_counter()
+        simple = [(b, br[0]) for b, br in enumerate(step.branches) if len(br) == 1 and br[0].kind in {"scene", "screenshot", "set_input"}]
+        simple_ids = {b for b, _s in simple}
+        jobs: list[Awaitable[None]] = []
+        if simple:
+            recs = [ctx.record(s, f"{path}.{b}.0") for b, s in simple]
+            jobs.append(self._send([s for _b, s in simple], recs, ctx, parallel=True))
+        for b, branch in enumerate(step.branches):
+            if b not in simple_ids:
+                jobs.append(self._run_steps(branch, ctx, batch, f"{path}.{b}."))
+        results = await asyncio.gather(*jobs, return_exceptions=True)
+        errors = [str(r) for r in results if isinstance(r, BaseException)]
+        self._finish(rec, step.kind, time.perf_counter() - t0, "; ".join(errors) or None)
+        if errors:
+            raise MacroStepError(f"{step.label}: {errors[0]}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "macros": self.names(),
+                "running": dict(self._running),
+                "batch_sleep_max_ms": self.batch_sleep_max_ms,
+                "recent": list(self._recent),
+            }
+
+
+_ENGINE: Optional[MacroEngine] = None
+
+
+def get_macro_engine() -> MacroEngine:
+    global _ENGINE
+    if _ENGINE is None:
+        from app.config import settings
+        from app.infrastructure.overlay.notification_service_impl import overlay_notifications
+
+        _ENGINE = MacroEngine(
+            macros_store,
+            publish=overlay_notifications.publish,
+            batch_sleep_max_ms=int(settings.macro_batch_sleep_max_ms),
+            screenshot_dir=str(settings.screenshot_dir) if getattr(settings, "screenshot_dir", None) else None,
+        )
+    return _ENGINE
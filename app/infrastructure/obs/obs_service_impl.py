@@ -49,3 +49,27 @@ class ObsService(IObsService):
 
     async def toggle_streaming(self) -> None:
         await obs_manager.toggle_streaming()
+
+    async def get_record_status(self) -> dict:
+        return await obs_manager.get_record_status()
+
+    async def start_recording(self) -> None:
+        await obs_manager.start_recording()
+
+    async def stop_recording(self) -> str | None:
+        return await obs_manager.stop_recording()
+
+    async def toggle_recording(self) -> str | None:
+        return await obs_manager.toggle_recording()
+
+    async def get_replay_buffer_status(self) -> dict:
+        return await obs_manager.get_replay_buffer_status()
+
+    async def start_replay_buffer(self) -> None:
+        await obs_manager.start_replay_buffer()
+
+    async def stop_replay_buffer(self) -> None:
+        await obs_manager.stop_replay_buffer()
+
+    async def save_replay_buffer(self) -> str:
+        return await obs_manager.save_replay_buffer()
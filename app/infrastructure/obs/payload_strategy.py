@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from prometheus_client import Counter
+
+from app.infrastructure.config.store import JsonConfigStore
+
+
+_DEFAULT_CONFIG_FILE = Path("config") / "obs_payload_strategy.json"
+
+# hit: remembered variant worked first time; miss: it failed and another one won;
+# cold: nothing remembered for this OBS version/input kind/device class yet
+CNT_PAYLOAD_STRATEGY = Counter(
+    "app_camera_payload_strategy_total",
+    "Camera input settings applies by remembered payload strategy outcome",
+    ["outcome"],
+)
+
+Variant = Tuple[Tuple[str, ...], bool]
+
+
+def _normalize(data: dict) -> dict:
+    out: Dict[str, Any] = {}
+    for key, entry in (data.get("strategies") or {}).items():
+        try:
+            keys = [str(k) for k in entry["keys"]]
+            if keys:
+                out[str(key)] = {"keys": keys, "overlay": bool(entry.get("overlay", True)), "learned_at": entry.get("learned_at")}
+        except Exception:
+            continue
+    return {"strategies": out}
+
+
+payload_strategy_store = JsonConfigStore(
+    _DEFAULT_CONFIG_FILE,
+    default=lambda: {"strategies": {}},
+    normalize=_normalize,
+)
+
+
+def strategy_key(obs_version: Optional[str], input_kind: str, device_class: str) -> str:
+    return f"{obs_version or 'unknown'}/{input_kind}/{device_class}"
+
+
+class PayloadStrategyCache:
+    """Which settings payload shape OBS accepted, per OBS version, input kind and device class.
+
+    Lookups read the cached store (one ``stat`` at most); the file is only written
+    when the winning variant for a key changes, so a steady state costs no I/O.
+    """
+
+    def __init__(self, store: JsonConfigStore) -> None:
+        self._store = store
+        self._lock = threading.Lock()
+        self._counts = {"hit": 0, "miss": 0, "cold": 0}
+
+    def get(self, key: str) -> Optional[Variant]:
+        entry = self._store.load()["strategies"].get(key)
+        if entry is None:
+            return None
+        return tuple(sorted(entry["keys"])), bool(entry["overlay"])
+
+    def _save(self, key: str, variant: Variant) -> None:
+        with self._lock:
+            current = dict(self._store.load()["strategies"])
+            current[key] = {"keys": list(variant[0]), "overlay": variant[1], "learned_at": datetime.now().isoformat(timespec="seconds")}
+            self._store.save({"strategies": current})
+
+    async def remember(self, key: str, payload: dict, overlay: bool) -> None:
+        variant: Variant = (tuple(sorted(payload)), bool(overlay))
+        if self.get(key) != variant:
+            await asyncio.to_thread(self._save, key, variant)
+
+    def count(self, outcome: str) -> None:
+        with self._lock:
+            self._counts[outcome] = self._counts.get(outcome, 0) + 1
+        CNT_PAYLOAD_STRATEGY.labels(outcome=outcome).inc()
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+        known = counts["hit"] + counts["miss"]
+        return {
+            **counts,
+            "hit_rate": round(counts["hit"] / known, 3) if known else None,
+            "strategies": self._store.load()["strategies"],
+        }
+
+
+payload_strategies = PayloadStrategyCache(payload_strategy_store)
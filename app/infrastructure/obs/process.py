@@ -189,14 +189,14 @@ def _is_ws_port_open(host: str, port: int, timeout: float = 0.5) -> bool:
 async def wait_for_obs_websocket(timeout_sec: int) -> None:
     deadline = asyncio.get_event_loop().time() + timeout_sec
     while asyncio.get_event_loop().time() < deadline:
-        if _is_ws_port_open(settings.obs_host, int(settings.obs_port), timeout=0.5):
+        if await asyncio.to_thread(_is_ws_port_open, settings.obs_host, int(settings.obs_port), 0.5):
             return
         await asyncio.sleep(1.0)
     raise TimeoutError("OBS WebSocket 포트가 열리지 않았습니다")
 
 
 async def ensure_obs_running() -> None:
-    if not is_obs_running():
+    if not await asyncio.to_thread(is_obs_running):
         logger.info("OBS not running; launching...")
         launch_obs()
     await wait_for_obs_websocket(int(settings.obs_launch_timeout))
@@ -207,20 +207,21 @@ async def guardian_loop(stop_event: asyncio.Event) -> None:
     unready_since: float | None = None
     while not stop_event.is_set():
         try:
-            if not is_obs_running():
+            # process_iter and the socket probe block; keep them off the event loop
+            if not await asyncio.to_thread(is_obs_running):
                 logger.warning("OBS down detected; relaunching...")
                 launch_obs()
                 await wait_for_obs_websocket(int(settings.obs_launch_timeout))
                 unready_since = None
             else:
-                if not _is_ws_port_open(settings.obs_host, int(settings.obs_port), timeout=0.5):
+                if not await asyncio.to_thread(_is_ws_port_open, settings.obs_host, int(settings.obs_port), 0.5):
                     now = asyncio.get_event_loop().time()
                     if unready_since is None:
                         unready_since = now
                     # If WS has been unready for longer than launch timeout, force restart
                     if now - unready_since > int(settings.obs_launch_timeout):
                         logger.warning("OBS process present but WS not ready; restarting OBS")
-                        _kill_obs_processes()
+                        await asyncio.to_thread(_kill_obs_processes)
                         launch_obs()
                         await wait_for_obs_websocket(int(settings.obs_launch_timeout))
                         unready_since = None
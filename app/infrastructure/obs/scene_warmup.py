@@ -0,0 +1,297 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from prometheus_client import Counter, Histogram
+
+from app.infrastructure.config.store import JsonConfigStore
+from app.infrastructure.obs.layout import DesiredLayout, ItemSpec, apply_plan, diff_layout, take_snapshot
+from app.obs_client import obs_manager
+
+
+_log = logging.getLogger(__name__)
+
+_DEFAULT_CONFIG_FILE = Path("config") / "scene_transitions.json"
+
+# hit: the target was preloaded; miss: warm-up ran but predicted something else;
+# cold: nothing preloaded (disabled, no history yet, or warm-up still running)
+CNT_SCENE_WARMUP = Counter(
+    "app_scene_warmup_total",
+    "Hotkey scene switches by warm-up outcome",
+    ["outcome"],
+)
+HIST_SCENE_SWITCH_SECONDS = Histogram(
+    "app_scene_switch_seconds",
+    "SetCurrentProgramScene round trip for hotkey scene switches, by warm-up outcome",
+    ["outcome"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+HIST_SCENE_WARMUP_SECONDS = Histogram(
+    "app_scene_warmup_seconds",
+    "Time to re-point the studio-mode preview at the predicted next scenes",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+
+def _normalize(data: dict) -> dict:
+    out: Dict[str, Dict[str, int]] = {}
+    for src, row in (data.get("transitions") or {}).items():
+        if not isinstance(row, dict):
+            continue
+        clean = {}
+        for dst, n in row.items():
+            try:
+                if int(n) > 0:
+                    clean[str(dst)] = int(n)
+            except (TypeError, ValueError):
+                continue
+        if clean:
+            out[str(src)] = clean
+    return {"transitions": out}
+
+
+transitions_store = JsonConfigStore(
+    _DEFAULT_CONFIG_FILE,
+    default=lambda: {"transitions": {}},
+    normalize=_normalize,
+)
+
+
+class TransitionTable:
+    """``from scene -> to scene -> count`` learned from hotkey switches.
+
+    Counts are halved once a row reaches ``max_count`` so old habits fade. Writes
+    to disk are throttled; ``flush()`` forces one.
+    """
+
+    def __init__(self, store: JsonConfigStore, *, max_count: int = 1000, save_interval: float = 30.0) -> None:
+        self._store = store
+        self._max = max(2, int(max_count))
+        self._save_interval = float(save_interval)
+        self._lock = threading.Lock()
+        self._rows: Dict[str, Dict[str, int]] = {}
+        self._loaded = False
+        self._dirty = False
+        self._saved_at = 0.0
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            try:
+                rows = self._store.load()["transitions"]
+                self._rows = {src: dict(row) for src, row in rows.items()}
+            except Exception as exc:
+                _log.warning("scene transition history unreadable: %s", exc)
+            self._loaded = True
+
+    def record(self, src: str, dst: str) -> None:
+        with self._lock:
+            self._ensure_loaded()
+            row = self._rows.setdefault(src, {})
+            row[dst] = row.get(dst, 0) + 1
+            if row[dst] >= self._max:
+                self._rows[src] = {k: v // 2 for k, v in row.items() if v // 2 > 0}
+            self._dirty = True
+            due = time.monotonic() - self._saved_at >= self._save_interval
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"transitions": {src: dict(row) for src, row in self._rows.items()}}
+            self._dirty = False
+            self._saved_at = time.monotonic()
+        try:
+            self._store.save(data)
+        except Exception as exc:
+            _log.warning("failed to save scene transition history: %s", exc)
+
+    def predict(self, current: Optional[str], k: int, *, fallback: Iterable[str] = ()) -> list[str]:
+        """Most frequent next scenes after ``current``; rows for other scenes, then
+        ``fallback`` order, fill up when ``current`` has little history."""
+        with self._lock:
+            self._ensure_loaded()
+            row = dict(self._rows.get(current or "", {}))
+            overall: Dict[str, int] = {}
+            for r in self._rows.values():
+                for dst, n in r.items():
+                    overall[dst] = overall.get(dst, 0) + n
+        out: list[str] = []
+        for ranked in (
+            sorted(row, key=lambda s: (-row[s], s)),
+            sorted(overall, key=lambda s: (-overall[s], s)),
+            list(fallback),
+        ):
+            for name in ranked:
+                if name and name != current and name not in out:
+                    out.append(name)
+                if len(out) >= k:
+                    return out
+        return out
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            self._ensure_loaded()
+            return {src: dict(row) for src, row in self._rows.items()}
+
+
+class SceneWarmup:
+    """Keep the likely-next scenes rendering in the studio-mode preview.
+
+    Sources in a scene only start (cameras open, browser sources load) once the
+    scene is shown somewhere. After each hotkey switch the preview is pointed at
+    the predicted next scene; for ``top_k > 1`` it shows a holder scene that nests
+    the predicted scenes as visible items, and scenes that dropped out of the
+    prediction are hidden (not removed) in the holder. Program output is never
+    touched. Re-warm requests coalesce: only the latest one runs.
+    """
+
+    def __init__(
+        self,
+        table: TransitionTable,
+        *,
+        enabled: bool,
+        top_k: int = 2,
+        holder_scene: str = "__warmup",
+        enable_studio_mode: bool = True,
+        fallback: Iterable[str] = (),
+    ) -> None:
+        self.table = table
+        self.enabled = bool(enabled)
+        self.top_k = max(1, int(top_k))
+        self.holder_scene = holder_scene
+        self.enable_studio_mode = bool(enable_studio_mode)
+        self._fallback = list(fallback)
+        self._lock = threading.Lock()
+        self._current: Optional[str] = None
+        self._warm: tuple[str, ...] = ()
+        self._pending: Optional[str] = None
+        self._worker: Optional[threading.Thread] = None
+        self._counts = {"hit": 0, "miss": 0, "cold": 0}
+        self._last_error: Optional[str] = None
+
+    def set_fallback(self, scenes: Iterable[str]) -> None:
+        self._fallback = list(dict.fromkeys(s for s in scenes if s))
+
+    def outcome_for(self, scene: str) -> str:
+        with self._lock:
+            if not self._warm:
+                return "cold"
+            return "hit" if scene in self._warm else "miss"
+
+    def on_switch(self, scene: str, outcome: str, seconds: float) -> None:
+        """Record a completed hotkey switch and re-warm for the scene after it."""
+        CNT_SCENE_WARMUP.labels(outcome=outcome).inc()
+        HIST_SCENE_SWITCH_SECONDS.labels(outcome=outcome).observe(seconds)
+        with self._lock:
+            self._counts[outcome] = self._counts.get(outcome, 0) + 1
+            prev, self._current = self._current, scene
+            # The preview now shows what was predicted for the previous scene
+            self._warm = ()
+        if prev and prev != scene:
+            self.table.record(prev, scene)
+        if self.enabled:
+            self.schedule(scene)
+
+    def schedule(self, current: str) -> None:
+        with self._lock:
+            self._pending = current
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._drain, name="scene-warmup", daemon=True)
+            self._worker.start()
+
+    def _drain(self) -> None:
+        while True:
+            with self._lock:
+                current, self._pending = self._pending, None
+                if current is None:
+                    self._worker = None
+                    return
+            try:
+                asyncio.run(self.rewarm(current))
+            except Exception as exc:
+                self._last_error = str(exc)
+                _log.warning("scene warm-up failed: %s", exc)
+
+    async def rewarm(self, current: str) -> list[str]:
+        targets = self.table.predict(current, self.top_k, fallback=self._fallback)
+        targets = [t for t in targets if t != self.holder_scene]
+        if not targets:
+            return []
+        t0 = time.perf_counter()
+        requests: list[tuple[str, Optional[dict]]] = []
+        if self.enable_studio_mode:
+            requests.append(("SetStudioModeEnabled", {"studioModeEnabled": True}))
+        if len(targets) == 1:
+            preview = targets[0]
+        else:
+            # Nest the predicted scenes in the holder; hide the ones no longer predicted
+            holder = DesiredLayout(
+                scenes=[self.holder_scene],
+                items={self.holder_scene: [ItemSpec(t) for t in targets]},
+                exclusive={self.holder_scene},
+            )
+            snap = await take_snapshot(items_for=[self.holder_scene])
+            targets = [t for t in targets if t in snap.scenes]
+            plan = diff_layout(snap, holder)
+            failed = await apply_plan(plan)
+            if failed:
+                raise RuntimeError("; ".join(failed))
+            preview = self.holder_scene
+        requests.append(("SetCurrentPreviewScene", {"sceneName": preview}))
+        results = await obs_manager.call_batch(requests)
+        status = (results[-1].get("requestStatus") or {}) if results else {}
+        if not status.get("result"):
+            raise RuntimeError(f"SetCurrentPreviewScene code {status.get('code')}: {status.get('comment') or ''}")
+        HIST_SCENE_WARMUP_SECONDS.observe(time.perf_counter() - t0)
+        with self._lock:
+            # A newer switch may have happened meanwhile; its own re-warm will follow
+            if self._current == current:
+                self._warm = tuple(targets)
+        self._last_error = None
+        return targets
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+            warm, current = list(self._warm), self._current
+        known = counts["hit"] + counts["miss"]
+        return {
+            "enabled": self.enabled,
+            "top_k": self.top_k,
+            "current": current,
+            "warm": warm,
+            "predicted": self.table.predict(current, self.top_k, fallback=self._fallback),
+            **counts,
+            "hit_rate": round(counts["hit"] / known, 3) if known else None,
+            "last_error": self._last_error,
+            "transitions": self.table.as_dict(),
+        }
+
+    def stop(self) -> None:
+        self.table.flush()
+
+
+_WARMUP: Optional[SceneWarmup] = None
+
+
+def get_scene_warmup() -> SceneWarmup:
+    global _WARMUP
+    if _WARMUP is None:
+        from app.config import settings
+
+        _WARMUP = SceneWarmup(
+            TransitionTable(transitions_store),
+            enabled=bool(settings.scene_warmup_enabled),
+            top_k=int(settings.scene_warmup_top_k),
+            holder_scene=str(settings.scene_warmup_holder_scene),
+            enable_studio_mode=bool(settings.scene_warmup_studio_mode),
+        )
+    return _WARMUP
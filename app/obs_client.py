@@ -1,12 +1,16 @@
 import asyncio
+import json
 import logging
-from typing import Optional, Any
+import threading
+import time
+from random import randint
+from typing import Optional, Any, Sequence
 
 from obsws_python import ReqClient
 from obsws_python.error import OBSSDKRequestError
 
 from .config import settings
-from app.infrastructure.config.obs_ws_config import load_obs_ws_config
+from app.infrastructure.config.obs_ws_config import load_obs_ws_config, obs_ws_store
 
 logger = logging.getLogger(__name__)
 
@@ -20,10 +24,40 @@ class OBSConnectionManager:
     def __init__(self) -> None:
         self._client: Optional[ReqClient] = None
         self._lock = asyncio.Lock()
+        # ReqClient sends and then blocks on recv() over one socket; concurrent worker
+        # threads would read each other's responses, so every round trip is serialized
+        self._io_lock = threading.Lock()
+        # One replay save at a time: each save waits for the last-replay path to change
+        self._replay_lock = threading.Lock()
         self._hb_stop: Optional[asyncio.Event] = None
         self._hb_task: Optional[asyncio.Task] = None
         self._hb_fail_count: int = 0
         self._hb_alerted: bool = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # React to obs_ws.json edits (UI save or external) without polling on connect()
+        obs_ws_store.subscribe(self._on_ws_config_changed)
+
+    def _on_ws_config_changed(self, new: dict, old: dict | None) -> None:
+        keys = ("host", "port", "password")
+        if old is not None and all(new.get(k) == old.get(k) for k in keys):
+            return
+        client, self._client = self._client, None
+        if client is not None:
+            logger.info("OBS connection settings changed; reconnecting")
+            try:
+                client.disconnect()
+            except Exception:
+                pass
+        # Called from the saving thread or the config watcher; reconnect on the app loop
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            asyncio.run_coroutine_threadsafe(self._reconnect_quietly(), loop)
+
+    async def _reconnect_quietly(self) -> None:
+        try:
+            await self.connect()
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("OBS reconnect after config change failed: %s", exc)
 
     async def connect(self) -> ReqClient:
         async with self._lock:
@@ -62,7 +96,74 @@ class OBSConnectionManager:
             self._client = None
 
     async def _to_thread(self, func, *args, **kwargs):
-        return await asyncio.to_thread(func, *args, **kwargs)
+        def _locked():
+            with self._io_lock:
+                return func(*args, **kwargs)
+
+        return await asyncio.to_thread(_locked)
+
+    def _send_batch(self, client: ReqClient, requests: list[dict], halt_on_failure: bool, execution_type: int) -> list[dict]:
+        base = getattr(client, "base_client", None)
+        ws = getattr(base, "ws", None)
+        if ws is None:
+            # No raw socket (older SDK): same semantics, one request at a time
+            results: list[dict] = []
+            for r in requests:
+                try:
+                    data = client.send(r["requestType"], r.get("requestData"), raw=True)
+                    results.append({"requestType": r["requestType"], "requestStatus": {"result": True, "code": 100}, "responseData": data})
+                except OBSSDKRequestError as exc:
+                    results.append({"requestType": r["requestType"], "requestStatus": {"result": False, "code": exc.code, "comment": str(exc)}})
+                    if halt_on_failure:
+                        break
+            return results
+        batch_id = str(randint(1, 1_000_000_000))
+        payload = {
+            "op": 8,
+            "d": {
+                "requestId": batch_id,
+                "haltOnFailure": bool(halt_on_failure),
+                "executionType": int(execution_type),
+                "requests": requests,
+            },
+        }
+        ws.send(json.dumps(payload))
+        while True:
+            msg = json.loads(ws.recv())
+            d = msg.get("d") or {}
+            if msg.get("op") == 9 and str(d.get("requestId")) == batch_id:
+                return list(d.get("results") or [])
+
+    async def call_batch(
+        self,
+        requests: Sequence[tuple[str, Optional[dict]]],
+        *,
+        halt_on_failure: bool = False,
+        execution_type: int = 0,
+    ) -> list[dict]:
+        """Send several requests in one round trip (obs-websocket RequestBatch, op 8).
+
+        Returns the raw per-request results (``requestType``, ``requestStatus``,
+        optional ``responseData``) in order; with ``halt_on_failure`` the list stops
+        at the first failed request. A transport error drops the connection and is
+        re-raised; the batch is not replayed.
+        """
+        reqs = []
+        for i, (request_type, data) in enumerate(requests):
+            r: dict = {"requestType": request_type, "requestId": str(i)}
+            if data:
+                r["requestData"] = data
+            reqs.append(r)
+        if not reqs:
+            return []
+        logger.debug("obs.batch: %s", ", ".join(r["requestType"] for r in reqs))
+        client = await self.connect()
+        try:
+            return await self._to_thread(self._send_batch, client, reqs, halt_on_failure, execution_type)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("OBS batch failed; reconnecting: %s", exc)
+            await self.disconnect()
+            raise
 
     async def _request(self, method_name: str, *args, **kwargs):
         client = await self.connect()
@@ -125,6 +226,7 @@ class OBSConnectionManager:
     def start_heartbeat(self) -> None:
         if self._hb_task is not None and not self._hb_task.done():
             return
+        self._loop = asyncio.get_running_loop()
         self._hb_stop = asyncio.Event()
         self._hb_task = asyncio.create_task(self._heartbeat_loop(self._hb_stop))
         logger.info("OBS heartbeat started")
@@ -205,6 +307,90 @@ class OBSConnectionManager:
         else:
             await self.start_streaming()
 
+    async def get_record_status(self) -> dict:
+        logger.debug("obs.get_record_status")
+        return self._jsonable(await self._request("get_record_status"))
+
+    async def start_recording(self) -> None:
+        logger.info("obs.start_record")
+        await self._request("start_record")
+
+    async def stop_recording(self) -> str | None:
+        """Stop recording; returns the finished file's path when OBS reports it."""
+        logger.info("obs.stop_record")
+        resp = self._jsonable(await self._request("stop_record")) or {}
+        return resp.get("outputPath") or resp.get("output_path") or None
+
+    async def toggle_recording(self) -> str | None:
+        """Start or stop recording; returns the file path when this call stopped it."""
+        status = await self.get_record_status()
+        if bool(status.get("outputActive") or status.get("output_active")):
+            return await self.stop_recording()
+        await self.start_recording()
+        return None
+
+    async def get_replay_buffer_status(self) -> dict:
+        logger.debug("obs.get_replay_buffer_status")
+        return self._jsonable(await self._request("get_replay_buffer_status"))
+
+    async def start_replay_buffer(self) -> None:
+        logger.info("obs.start_replay_buffer")
+        await self._request("start_replay_buffer")
+
+    async def stop_replay_buffer(self) -> None:
+        logger.info("obs.stop_replay_buffer")
+        await self._request("stop_replay_buffer")
+
+    async def toggle_replay_buffer(self) -> None:
+        logger.info("obs.toggle_replay_buffer")
+        await self._request("toggle_replay_buffer")
+
+    @staticmethod
+    def _replay_path(result: dict) -> str | None:
+        # Fails (no replay saved yet) without raising, unlike ReqClient calls
+        return ((result.get("responseData") or {}).get("savedReplayPath")) or None
+
+    async def save_replay_buffer(self, *, timeout: float = 10.0) -> str:
+        """Save the replay buffer and return the new file's path.
+
+        OBS writes the file after answering ``SaveReplayBuffer``, so the last
+        replay path is polled until it changes (or ``timeout`` passes).
+        """
+        logger.info("obs.save_replay_buffer")
+        # Callers run on different event loops (API, hotkey threads), hence a thread lock
+        await self._acquire_replay_lock(timeout)
+        try:
+            return await self._save_replay(timeout)
+        finally:
+            self._replay_lock.release()
+
+    async def _acquire_replay_lock(self, timeout: float) -> None:
+        # Non-blocking attempts on this loop: a blocking acquire in a worker thread
+        # would keep the lock if the awaiting task were cancelled meanwhile
+        deadline = time.monotonic() + timeout
+        while not self._replay_lock.acquire(blocking=False):
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"another replay save still running after {timeout:g}s")
+            await asyncio.sleep(0.02)
+
+    async def _save_replay(self, timeout: float) -> str:
+        last, save = await self.call_batch([("GetLastReplayBufferReplay", None), ("SaveReplayBuffer", None)])
+        status = save.get("requestStatus") or {}
+        if not status.get("result"):
+            raise RuntimeError(f"SaveReplayBuffer code {status.get('code')}: {status.get('comment') or ''}")
+        before = self._replay_path(last)
+        deadline = time.monotonic() + timeout
+        delay = 0.05
+        while True:
+            (res,) = await self.call_batch([("GetLastReplayBufferReplay", None)])
+            path = self._replay_path(res)
+            if path and path != before:
+                return path
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"replay buffer save not reported within {timeout:.0f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.5)
+
     async def save_source_screenshot(
         self,
         source_name: str,
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
+
+from app.config import settings
+from app.presentation.static_cache import StaticAssets
+
+
+ASSETS_DIR = Path(__file__).resolve().parents[3] / "assets"
+
+# Shared pipeline for everything under assets/ (icons, overlay CSS/JS, images)
+assets = StaticAssets(ASSETS_DIR, "/assets", max_memory_bytes=int(settings.assets_memory_max_kb) * 1024)
+
+router = APIRouter(prefix="/assets")
+
+
+@router.api_route("/{name:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def asset(name: str, request: Request) -> Response:
+    resp = assets.response(request, name)
+    if resp is None:
+        raise HTTPException(status_code=404, detail="asset not found")
+    return resp
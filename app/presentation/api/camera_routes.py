@@ -5,19 +5,28 @@ from fastapi.responses import HTMLResponse, JSONResponse
 
 from app.container import list_camera_devices, get_camera_config, apply_camera_config
 from app.infrastructure.obs.camera_config import list_dshow_devices_via_obs
+from app.infrastructure.obs.payload_strategy import payload_strategies
+from app.presentation.responses import api_json
 
 router = APIRouter(prefix="/api/cams")
 
 
-@router.get("/devices")
-async def devices() -> dict:
-    return await list_camera_devices()()
+@router.get("/devices", response_model=None)
+async def devices(refresh: bool = False) -> JSONResponse:
+    # refresh=true re-enumerates; otherwise the registry's cached list is used
+    return api_json(await list_camera_devices()(refresh=refresh))
 
 
 @router.get("/devices/obs")
 async def devices_obs() -> JSONResponse:
     items = await list_dshow_devices_via_obs()
-    return JSONResponse(content={"obs": items})
+    return api_json({"obs": items})
+
+
+@router.get("/payload-strategy")
+async def payload_strategy() -> dict:
+    # Remembered settings payload shape per OBS version/input kind/device class, hit rate
+    return payload_strategies.stats()
 
 
 @router.get("/config")
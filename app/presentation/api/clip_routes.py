@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from fastapi import APIRouter, HTTPException
+
+from app.container import (
+    get_outputs_status,
+    start_record,
+    stop_record,
+    toggle_record,
+    start_replay_buffer,
+    stop_replay_buffer,
+    save_replay,
+)
+from app.infrastructure.media.clip_pipeline import get_clip_pipeline
+
+router = APIRouter(prefix="/api")
+
+
+async def _call(uc, **kwargs) -> dict:
+    try:
+        return (await uc(**kwargs)) or {"ok": True}
+    except Exception as exc:  # noqa: BLE001
+        raise HTTPException(status_code=500, detail=str(exc))
+
+
+@router.get("/obs/outputs")
+async def outputs() -> dict:
+    return await get_outputs_status()()
+
+
+@router.post("/obs/record/start")
+async def record_start() -> dict:
+    return await _call(start_record())
+
+
+@router.post("/obs/record/stop")
+async def record_stop(wait: bool = False) -> dict:
+    # The finished recording goes through the clip pipeline; wait=true returns its index entry
+    return await _call(stop_record(), wait=wait)
+
+
+@router.post("/obs/record/toggle")
+async def record_toggle(wait: bool = False) -> dict:
+    return await _call(toggle_record(), wait=wait)
+
+
+@router.post("/obs/replay/start")
+async def replay_start() -> dict:
+    return await _call(start_replay_buffer())
+
+
+@router.post("/obs/replay/stop")
+async def replay_stop() -> dict:
+    return await _call(stop_replay_buffer())
+
+
+@router.post("/obs/replay/save")
+async def replay_save(wait: bool = False) -> dict:
+    return await _call(save_replay(), wait=wait)
+
+
+@router.get("/clips")
+async def clips(date: str | None = None) -> dict:
+    day = date or datetime.now().strftime("%Y-%m-%d")
+    try:
+        return {"date": day, "clips": get_clip_pipeline().index(day)}
+    except ValueError:
+        raise HTTPException(status_code=400, detail="date must be YYYY-MM-DD")
+
+
+@router.get("/clips/stats")
+async def clip_stats() -> dict:
+    # Queue, throughput, last retention sweep and recent results with per-stage timings
+    return get_clip_pipeline().stats()
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+
+from app.container import export_composite, list_composites, render_composite
+from app.infrastructure.media.compositor import CompositeUnavailable
+
+router = APIRouter(prefix="/api/composites")
+
+
+def _views(views: str | None) -> list[str] | None:
+    return [v.strip() for v in views.split(",") if v.strip()] if views else None
+
+
+async def _call(uc, **kwargs) -> dict:
+    try:
+        return await uc(**kwargs)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=str(exc.args[0]) if exc.args else "not found")
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except CompositeUnavailable as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    except Exception as exc:  # noqa: BLE001
+        raise HTTPException(status_code=500, detail=str(exc))
+
+
+@router.get("")
+async def composites(views: str | None = None) -> dict:
+    # Resolved before/after pairs per view, plus render cache stats
+    return await _call(list_composites(), views=_views(views))
+
+
+@router.get("/render")
+async def composite_render(
+    kind: str = "image",
+    layout: str = "side",
+    views: str | None = None,
+    mode: str = "wipe",
+    height: int = 960,
+    labels: bool = True,
+    frames: int = 16,
+    frame_ms: int = 60,
+) -> FileResponse:
+    res = await _call(
+        render_composite(),
+        kind=kind, layout=layout, views=_views(views), mode=mode,
+        height=height, labels=labels, frames=frames, frame_ms=frame_ms,
+    )
+    media_type = "image/gif" if res["path"].endswith(".gif") else "image/png"
+    return FileResponse(res["path"], media_type=media_type, headers={"X-Composite-Cache": res["cache"]})
+
+
+@router.post("/export")
+async def composite_export(
+    kind: str = "image",
+    layout: str = "side",
+    views: str | None = None,
+    mode: str = "wipe",
+    height: int = 960,
+    labels: bool = True,
+    frames: int = 16,
+    frame_ms: int = 60,
+) -> dict:
+    # Copies the (cached) render into the screenshot date tree
+    return await _call(
+        export_composite(),
+        kind=kind, layout=layout, views=_views(views), mode=mode,
+        height=height, labels=labels, frames=frames, frame_ms=frame_ms,
+    )
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, HTTPException
+
+from app.container import list_layouts, apply_layout
+from app.infrastructure.obs.layout_profiles import layout_profiles
+
+router = APIRouter(prefix="/api/layouts")
+
+
+@router.get("")
+async def layouts() -> dict:
+    return await list_layouts()()
+
+
+@router.get("/{name}")
+async def layout_get(name: str) -> dict:
+    data = layout_profiles.raw(name)
+    if data is None:
+        raise HTTPException(status_code=404, detail=f"layout not found: {name}")
+    return data
+
+
+async def _run(name: str, dry_run: bool) -> dict:
+    try:
+        return await apply_layout()(name, dry_run=dry_run)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"layout not found: {name}")
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"invalid layout {name}: {exc}")
+    except Exception as exc:  # noqa: BLE001
+        raise HTTPException(status_code=500, detail=str(exc))
+
+
+@router.get("/{name}/plan")
+async def layout_plan(name: str) -> dict:
+    # Dry run: what apply would send right now, nothing is changed
+    return await _run(name, True)
+
+
+@router.post("/{name}/apply")
+async def layout_apply(name: str, dry_run: bool = False) -> dict:
+    return await _run(name, dry_run)
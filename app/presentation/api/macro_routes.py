@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, HTTPException
+
+from app.container import list_macros, run_macro
+from app.infrastructure.obs.macros import get_macro_engine
+
+router = APIRouter(prefix="/api/macros")
+
+
+@router.get("")
+async def macros() -> dict:
+    return await list_macros()()
+
+
+@router.get("/stats")
+async def macro_stats() -> dict:
+    # Running macros and the latest run reports with per-step timings
+    return get_macro_engine().stats()
+
+
+@router.get("/{name}")
+async def macro_get(name: str) -> dict:
+    data = get_macro_engine().raw(name)
+    if data is None:
+        raise HTTPException(status_code=404, detail=f"macro not found: {name}")
+    return data
+
+
+@router.post("/{name}/run")
+async def macro_run(name: str) -> dict:
+    try:
+        return await run_macro()(name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"macro not found: {name}")
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"invalid macro {name}: {exc}")
+    except Exception as exc:  # noqa: BLE001
+        raise HTTPException(status_code=500, detail=str(exc))
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, HTTPException, Header
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from app.container import (
     get_obs_version,
@@ -25,9 +26,14 @@ from datetime import datetime
 import sys
 import threading
 import traceback
-from app.infrastructure.obs.bootstrap import STANDARD_SCENES
-from app.infrastructure.overlay.notification_service_impl import overlay_notifications
+from app.infrastructure.obs.bootstrap import STANDARD_SCENES, last_bootstrap_report, wire_default_layout
+from app.infrastructure.obs.macros import get_macro_engine
+from app.infrastructure.obs.scene_warmup import get_scene_warmup
+from app.infrastructure.diagnostics.loop_monitor import get_loop_monitor
+from app.infrastructure.diagnostics.process_table import get_process_sampler
+from app.infrastructure.diagnostics.profiler import sample_stacks, try_acquire_profiler, release_profiler
 from app.container import alert_service
+from app.presentation.responses import api_json
 
 router = APIRouter(prefix="/api")
 
@@ -60,17 +66,19 @@ async def get_hotkeys() -> dict:
 @router.post("/hotkeys")
 async def set_hotkeys(payload: dict) -> dict:
     try:
+        # Saving notifies the config store's subscribers; HotkeyManager rebinds from there
         uc_save_hotkeys_config()(payload or {})
-        try:
-            # Attempt to hot-reload hotkeys without server restart
-            hotkeys.reload_config()
-        except Exception:
-            pass
         return {"ok": True}
     except Exception as exc:  # noqa: BLE001
         raise HTTPException(status_code=400, detail=str(exc))
 
 
+@router.get("/obs/warmup")
+async def obs_warmup() -> dict:
+    # Preloaded scenes, hit/miss counts and the learned hotkey transition table
+    return get_scene_warmup().stats()
+
+
 @router.get("/obs/version")
 async def obs_version() -> dict:
     try:
@@ -93,9 +101,8 @@ async def set_scene(scene_name: str) -> dict:
     try:
         await uc_set_scene()(scene_name)
         try:
-            scene_norm = (scene_name or "").strip().lower()
-            action = "resume" if scene_norm in {"youtube", "shorts"} else "pause"
-            await overlay_notifications.publish({"type": "overlay_control", "action": action, "scene": scene_name})
+            # Overlay pause/resume per scene comes from scene_overlay in config/macros.json
+            await get_macro_engine().apply_scene_rules(scene_name)
         except Exception:
             pass
         return {"ok": True, "scene": scene_name}
@@ -407,10 +414,10 @@ async def diagnostics(x_diag_token: str | None = Header(default=None)) -> dict:
     hk_status = {
         "enabled": bool(hotkeys is not None),
         "listener_alive": bool(getattr(hotkeys, "_thread", None) and hotkeys._thread.is_alive()),
-        "scene_key": getattr(hotkeys, "scene_key", None),
-        "screenshot_key": getattr(hotkeys, "ss_key", None),
-        "stream_toggle_key": getattr(hotkeys, "stream_toggle_key", None),
-        "scene_map": getattr(hotkeys, "scene_map", {}),
+        "bindings": hotkeys.describe_bindings() if hotkeys is not None else {},
+        "presses": hotkeys.press_stats() if hotkeys is not None else {},
+        "bound_combos": sorted(getattr(hotkeys, "_registered", {}) or {}),
+        "last_reload": getattr(hotkeys, "last_reload", None),
     }
 
     # System/process snapshot
@@ -451,15 +458,15 @@ async def diagnostics(x_diag_token: str | None = Header(default=None)) -> dict:
     return info
 
 
-@router.get("/logs")
-async def get_logs(limit: int = 200, x_diag_token: str | None = Header(default=None)) -> dict:
+@router.get("/logs", response_model=None)
+async def get_logs(limit: int = 200, x_diag_token: str | None = Header(default=None)) -> JSONResponse:
     _ensure_ring_handler()
     _check_diag_token(x_diag_token)
     if limit <= 0:
         limit = 100
     if limit > _LOG_BUFFER_MAX:
         limit = _LOG_BUFFER_MAX
-    return {"logs": _log_records[-limit:]}
+    return api_json({"logs": _log_records[-limit:]})
 
 
 @router.get("/diagnostics/log-level")
@@ -479,8 +486,8 @@ async def set_log_level(level: str, x_diag_token: str | None = Header(default=No
     return {"ok": True, "level": name}
 
 
-@router.get("/diagnostics/threads")
-async def diagnostics_threads(x_diag_token: str | None = Header(default=None), max_frames: int = 20) -> dict:
+@router.get("/diagnostics/threads", response_model=None)
+async def diagnostics_threads(x_diag_token: str | None = Header(default=None), max_frames: int = 20) -> JSONResponse:
     _check_diag_token(x_diag_token)
     frames = sys._current_frames()  # type: ignore[attr-defined]
     threads = []
@@ -498,42 +505,80 @@ async def diagnostics_threads(x_diag_token: str | None = Header(default=None), m
                 "stack": stack_summary,
             }
         )
-    return {"threads": threads}
+    return api_json({"threads": threads})
+
+
+@router.get("/diagnostics/profile", response_model=None)
+async def diagnostics_profile(
+    x_diag_token: str | None = Header(default=None),
+    seconds: float = 10.0,
+    hz: int = 100,
+    format: str = "collapsed",
+    lines: bool = False,
+    thread: str | None = None,
+    top: int = 50,
+) -> PlainTextResponse | dict:
+    _check_diag_token(x_diag_token)
+    seconds = max(0.1, min(float(seconds), float(settings.profiler_max_seconds)))
+    hz = max(1, min(int(hz), int(settings.profiler_max_hz)))
+    fmt = (format or "collapsed").strip().lower()
+    if fmt not in {"collapsed", "json"}:
+        raise HTTPException(status_code=400, detail="format must be 'collapsed' or 'json'")
+    if not try_acquire_profiler():
+        raise HTTPException(status_code=409, detail="profile already in progress")
+    try:
+        import asyncio as _asyncio
+
+        result = await _asyncio.to_thread(sample_stacks, seconds, hz, with_lines=lines, thread_name=thread)
+    finally:
+        release_profiler()
+    if fmt == "json":
+        return result.as_dict(top=max(1, int(top)))
+    return PlainTextResponse(
+        result.collapsed(),
+        headers={
+            "X-Profile-Samples": str(result.samples),
+            "X-Profile-Seconds": f"{result.seconds:.3f}",
+        },
+    )
 
 
-@router.get("/diagnostics/processes")
-async def diagnostics_processes(x_diag_token: str | None = Header(default=None), limit: int = 10) -> dict:
+@router.get("/diagnostics/loop")
+async def diagnostics_loop(x_diag_token: str | None = Header(default=None), stacks: bool = True) -> dict:
+    _check_diag_token(x_diag_token)
+    return get_loop_monitor().snapshot(include_stacks=stacks)
+
+
+@router.get("/diagnostics/processes", response_model=None)
+async def diagnostics_processes(
+    x_diag_token: str | None = Header(default=None), limit: int = 10, sort: str = "cpu"
+) -> JSONResponse:
     _check_diag_token(x_diag_token)
     if limit <= 0:
         limit = 10
-    procs = []
-    # Prime cpu_percent snapshot
-    for p in psutil.process_iter(attrs=["pid", "name", "username"]):
-        try:
-            p.cpu_percent(None)
-        except Exception:
-            pass
-    time.sleep(0.05)
-    for p in psutil.process_iter(attrs=["pid", "name", "username"]):
-        try:
-            with p.oneshot():
-                cpu = p.cpu_percent(None)
-                mem = p.memory_info()
-                procs.append(
-                    {
-                        "pid": p.pid,
-                        "name": p.info.get("name"),
-                        "user": p.info.get("username"),
-                        "cpu_percent": cpu,
-                        "rss_bytes": mem.rss,
-                        "vms_bytes": mem.vms,
-                        "create_time": p.create_time(),
-                    }
-                )
-        except Exception:
-            continue
-    procs.sort(key=lambda x: (x.get("cpu_percent", 0.0), x.get("rss_bytes", 0)), reverse=True)
-    return {"processes": procs[:limit]}
+    sampler = get_process_sampler()
+    sampler.start()
+    # Only the very first request waits (off the loop) for the sampler's first pass
+    import asyncio as _asyncio
+
+    await _asyncio.to_thread(sampler.wait_ready, 3.0)
+    return api_json(sampler.top(limit, (sort or "cpu").strip().lower()))
+
+
+@router.get("/diagnostics/bootstrap")
+async def diagnostics_bootstrap(x_diag_token: str | None = Header(default=None)) -> dict:
+    _check_diag_token(x_diag_token)
+    return {"last": last_bootstrap_report()}
+
+
+@router.post("/diagnostics/bootstrap")
+async def diagnostics_bootstrap_run(x_diag_token: str | None = Header(default=None), dry_run: bool = True) -> dict:
+    # Snapshot + diff against the default layout; applies only with dry_run=false
+    _check_diag_token(x_diag_token)
+    try:
+        return await wire_default_layout(dry_run=dry_run)
+    except Exception as exc:  # noqa: BLE001
+        raise HTTPException(status_code=500, detail=str(exc))
 
 
 @router.get("/diagnostics/services")
@@ -3,6 +3,8 @@ from __future__ import annotations
 from fastapi import APIRouter
 from fastapi.responses import HTMLResponse
 
+from app.presentation.api.asset_routes import assets
+
 
 router = APIRouter(prefix="/settings")
 
@@ -446,6 +448,6 @@ loadHotkeys();
   loadWS();
 </script>
 </body></html>"""
-    return HTMLResponse(content=html)
+    return HTMLResponse(content=assets.rewrite(html))
 
 
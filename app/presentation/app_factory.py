@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
@@ -9,28 +8,36 @@ from app.infrastructure.metrics.metrics import setup_metrics
 from app.infrastructure.logging_setup import init_logging
 from app.presentation.api.routes import router as api_router
 from app.presentation.api.camera_routes import router as camera_router
+from app.presentation.api.layout_routes import router as layout_router
+from app.presentation.api.macro_routes import router as macro_router
+from app.presentation.api.clip_routes import router as clip_router
+from app.presentation.api.composite_routes import router as composite_router
 from app.presentation.api.overlay_routes import router as overlay_router
 from app.presentation.api.settings_routes import router as settings_router
+from app.presentation.api.asset_routes import router as assets_router, assets
+from app.presentation.responses import SelectiveGZipMiddleware, default_response_class
 from app.hotkeys import hotkeys
 from typing import Optional
 import asyncio
-from pathlib import Path
 import os
 
 from app.infrastructure.cleanup.screenshot_retention import retention_loop
 from app.obs_client import obs_manager
 from app.infrastructure.elk.kibana_import import kibana_import_background
+from app.infrastructure.diagnostics.loop_monitor import get_loop_monitor
 
 _guard_stop_event: Optional[asyncio.Event] = None
 _guard_task: Optional[asyncio.Task] = None
 _ret_stop_event: Optional[asyncio.Event] = None
 _ret_task: Optional[asyncio.Task] = None
+_cfg_watcher = None
+_dev_watcher = None
 
 
 def create_app() -> FastAPI:
     # Initialize logging before app construction to capture startup logs
     init_logging()
-    app = FastAPI(title=settings.app_name)
+    app = FastAPI(title=settings.app_name, default_response_class=default_response_class())
 
     app.add_middleware(
         CORSMiddleware,
@@ -39,19 +46,30 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    if settings.api_gzip_enabled:
+        app.add_middleware(
+            SelectiveGZipMiddleware,
+            minimum_size=max(0, int(settings.api_gzip_min_size)),
+            compresslevel=max(1, min(9, int(settings.api_gzip_level))),
+        )
 
     app.include_router(api_router)
     app.include_router(camera_router)
+    app.include_router(layout_router)
+    app.include_router(macro_router)
+    app.include_router(clip_router)
+    app.include_router(composite_router)
     app.include_router(overlay_router)
     app.include_router(settings_router)
 
-    # Serve static assets (icons, images) at /assets
+    # Serve static assets (icons, images, overlay CSS/JS) at /assets: hash, compress
+    # and cache everything once up front so the first OBS browser-source load is warm
+    app.include_router(assets_router)
     try:
-        assets_dir = Path(__file__).resolve().parents[2] / "assets"
-        if assets_dir.exists():
-            app.mount("/assets", StaticFiles(directory=str(assets_dir)), name="assets")
-    except Exception:
-        pass
+        assets.prime()
+    except Exception as exc:
+        import logging
+        logging.getLogger(__name__).warning("asset prime failed: %s", exc)
 
     # Prometheus metrics (/metrics) + psutil system/process gauges
     setup_metrics(app)
@@ -66,6 +84,13 @@ async def _startup() -> None:
     import logging
     logging.getLogger(__name__).info("application startup")
 
+    # Start loop monitor first so slow startup steps are captured as well
+    if settings.loop_monitor_enabled:
+        try:
+            get_loop_monitor().start()
+        except Exception as exc:
+            logging.getLogger(__name__).warning("failed to start loop monitor: %s", exc)
+
     # Ensure OBS is running and reachable before bootstrap/hotkeys
     if settings.obs_autostart:
         try:
@@ -79,6 +104,28 @@ async def _startup() -> None:
         except Exception as exc:
             logging.getLogger(__name__).error("OBS autostart failed: %s", exc)
 
+    # Hot reload of config/*.json (hotkeys rebind, OBS reconnect, retention reschedule)
+    if settings.config_watch_enabled:
+        try:
+            from app.infrastructure.config.watcher import build_config_watcher
+
+            global _cfg_watcher
+            _cfg_watcher = build_config_watcher()
+            _cfg_watcher.start()
+        except Exception as exc:
+            logging.getLogger(__name__).warning("failed to start config watcher: %s", exc)
+
+    # Invalidate the camera device cache on hot-plug (WM_DEVICECHANGE / /dev/video*)
+    if settings.devices_hotplug_watch:
+        try:
+            from app.infrastructure.devices.registry import HotplugWatcher, get_device_registry
+
+            global _dev_watcher
+            _dev_watcher = HotplugWatcher(get_device_registry())
+            _dev_watcher.start()
+        except Exception as exc:
+            logging.getLogger(__name__).warning("failed to start device hot-plug watch: %s", exc)
+
     if settings.auto_bootstrap:
         try:
             from app.infrastructure.obs.bootstrap import wire_default_layout
@@ -157,6 +204,56 @@ async def _shutdown() -> None:
             _ret_task.cancel()
     except Exception:
         pass
+    # stop config watcher
+    global _cfg_watcher
+    try:
+        if _cfg_watcher is not None:
+            from app.infrastructure.config.watcher import unwatch_config_stores
+
+            _cfg_watcher.stop()
+            unwatch_config_stores()
+            _cfg_watcher = None
+    except Exception:
+        pass
+    # stop clip workers (queued clips stay where OBS wrote them)
+    try:
+        from app.infrastructure.media.clip_pipeline import get_clip_pipeline
+
+        get_clip_pipeline().shutdown()
+    except Exception:
+        pass
+    # stop composite workers (cached renders stay on disk)
+    try:
+        from app.infrastructure.media.compositor import get_compositor
+
+        get_compositor().shutdown()
+    except Exception:
+        pass
+    # persist learned scene transitions
+    try:
+        from app.infrastructure.obs.scene_warmup import get_scene_warmup
+
+        get_scene_warmup().stop()
+    except Exception:
+        pass
+    # stop device hot-plug watch
+    global _dev_watcher
+    try:
+        if _dev_watcher is not None:
+            _dev_watcher.stop()
+            _dev_watcher = None
+    except Exception:
+        pass
+    try:
+        get_loop_monitor().stop()
+    except Exception:
+        pass
+    try:
+        from app.infrastructure.diagnostics.process_table import get_process_sampler
+
+        get_process_sampler().stop()
+    except Exception:
+        pass
 
 
 def _is_running_in_docker() -> bool:
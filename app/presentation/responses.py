@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from typing import Any, Sequence
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import settings
+
+try:  # optional
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
+
+def orjson_available() -> bool:
+    return orjson is not None
+
+
+def _default(obj: Any) -> Any:
+    # Anything orjson can't encode natively (Path, Decimal, sets, ...)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return str(obj)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered by orjson, falling back to the stdlib encoder."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        try:
+            return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            return super().render(jsonable_encoder(content))
+
+
+def default_response_class() -> type[JSONResponse]:
+    return ORJSONResponse if settings.api_orjson and orjson is not None else JSONResponse
+
+
+def api_json(content: Any, status_code: int = 200) -> JSONResponse:
+    """Response for large JSON payloads (logs, stacks, process/device lists).
+
+    With ``API_ORJSON`` the payload goes straight to orjson and skips FastAPI's
+    ``jsonable_encoder`` walk, which dominates the cost for these documents.
+    """
+    if settings.api_orjson and orjson is not None:
+        return ORJSONResponse(content, status_code=status_code)
+    return JSONResponse(jsonable_encoder(content), status_code=status_code)
+
+
+class SelectiveGZipMiddleware(GZipMiddleware):
+    """``GZipMiddleware`` that leaves some path prefixes alone.
+
+    ``/assets`` and ``/overlay`` serve their own precompressed bodies (and PNGs
+    that don't shrink), so compressing them again per request is wasted work.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        compresslevel: int = 6,
+        exclude_prefixes: Sequence[str] = ("/assets", "/overlay"),
+    ) -> None:
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.exclude_prefixes = tuple(exclude_prefixes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and str(scope.get("path", "")).startswith(self.exclude_prefixes):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path, PureWindowsPath
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response
+
+try:  # optional
+    import brotli  # type: ignore
+except Exception:  # pragma: no cover
+    brotli = None  # type: ignore
+
+
+_log = logging.getLogger(__name__)
+
+# Below this size compression costs more than it saves
+MIN_COMPRESS_SIZE = 512
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+
+@dataclass(frozen=True, slots=True)
+class CachedBody:
+    """A response body with its precompressed variants and validators.
+
+    Large files keep ``body`` empty and set ``path``; they are streamed from disk.
+    """
+
+    body: bytes
+    media_type: str
+    digest: str
+    mtime: int
+    gzip: Optional[bytes] = None
+    br: Optional[bytes] = None
+    path: Optional[Path] = None
+
+    @classmethod
+    def build(
+        cls, body: bytes | str, media_type: str, mtime: Optional[float] = None, *, compress: bool = True
+    ) -> "CachedBody":
+        raw = body.encode("utf-8") if isinstance(body, str) else body
+        gz = br = None
+        if compress and len(raw) >= MIN_COMPRESS_SIZE:
+            gz = gzip.compress(raw, compresslevel=9, mtime=0)
+            if brotli is not None:
+                try:
+                    br = brotli.compress(raw, quality=11)
+                except Exception:
+                    br = None
+            # Keep a variant only when it is meaningfully smaller
+            limit = len(raw) * 0.95
+            gz = gz if gz is not None and len(gz) < limit else None
+            br = br if br is not None and len(br) < limit else None
+        return cls(
+            body=raw,
+            media_type=media_type,
+            digest=hashlib.blake2b(raw, digest_size=8).hexdigest(),
+            mtime=int(mtime if mtime is not None else time.time()),
+            gzip=gz,
+            br=br,
+        )
+
+    @classmethod
+    def from_file(cls, path: Path, media_type: str, mtime: float) -> "CachedBody":
+        h = hashlib.blake2b(digest_size=8)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                h.update(chunk)
+        return cls(body=b"", media_type=media_type, digest=h.hexdigest(), mtime=int(mtime), path=path)
+
+    @property
+    def last_modified(self) -> str:
+        return formatdate(self.mtime, usegmt=True)
+
+    def etag(self, encoding: str = "identity") -> str:
+        # One strong tag per representation; all of them validate the same content
+        return f'"{self.digest}"' if encoding == "identity" else f'"{self.digest}-{encoding}"'
+
+
+def _accepted_encodings(header: str) -> set[str]:
+    accepted: set[str] = set()
+    for part in (header or "").split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 1.0
+        if q > 0:
+            accepted.add(token)
+    return accepted
+
+
+def choose_encoding(entry: CachedBody, accept_encoding: str) -> str:
+    accepted = _accepted_encodings(accept_encoding)
+    if entry.br is not None and ("br" in accepted or "*" in accepted):
+        return "br"
+    if entry.gzip is not None and ("gzip" in accepted or "*" in accepted):
+        return "gzip"
+    return "identity"
+
+
+def _etag_matches(if_none_match: str, entry: CachedBody) -> bool:
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        tag = tag.strip('"')
+        if tag == entry.digest or tag.partition("-")[0] == entry.digest:
+            return True
+    return False
+
+
+def is_not_modified(request: Request, entry: CachedBody) -> bool:
+    inm = request.headers.get("if-none-match")
+    if inm:
+        # If-None-Match wins over If-Modified-Since (RFC 9110 13.2.2)
+        return _etag_matches(inm, entry)
+    ims = request.headers.get("if-modified-since")
+    if ims:
+        try:
+            return int(parsedate_to_datetime(ims).timestamp()) >= entry.mtime
+        except Exception:
+            return False
+    return False
+
+
+def cached_response(request: Request, entry: CachedBody, *, cache_control: str = REVALIDATE) -> Response:
+    """Serve ``entry`` honouring conditional headers and ``Accept-Encoding``."""
+    encoding = choose_encoding(entry, request.headers.get("accept-encoding", ""))
+    headers = {
+        "ETag": entry.etag(encoding),
+        "Last-Modified": entry.last_modified,
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding",
+    }
+    if is_not_modified(request, entry):
+        return Response(status_code=304, headers=headers)
+    if entry.path is not None:
+        return FileResponse(entry.path, media_type=entry.media_type, headers=headers)
+    body = entry.body
+    if encoding == "br" and entry.br is not None:
+        body = entry.br
+        headers["Content-Encoding"] = "br"
+    elif encoding == "gzip" and entry.gzip is not None:
+        body = entry.gzip
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type=entry.media_type, headers=headers)
+
+
+class RenderCache:
+    """Thread-safe LRU of rendered bodies keyed by everything the render depends on."""
+
+    def __init__(self, maxsize: int = 64) -> None:
+        self.maxsize = max(1, int(maxsize))
+        self._data: "OrderedDict[Hashable, CachedBody]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, render: Callable[[], CachedBody]) -> CachedBody:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        # Render outside the lock; a concurrent miss for the same key renders twice
+        entry = render()
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+_MEDIA_TYPES = {
+    ".css": "text/css; charset=utf-8",
+    ".js": "text/javascript; charset=utf-8",
+    ".json": "application/json",
+    ".html": "text/html; charset=utf-8",
+    ".txt": "text/plain; charset=utf-8",
+    ".svg": "image/svg+xml",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+    ".ico": "image/x-icon",
+}
+# Already-compressed formats are served as-is
+_COMPRESSIBLE = {".css", ".js", ".json", ".html", ".txt", ".svg"}
+_HASHED_NAME = re.compile(r"^(?P<stem>.+)\.(?P<digest>[0-9a-f]{16})(?P<ext>\.[A-Za-z0-9]+)$")
+_URL_IN_TEXT = r"(?P<q>['\"])%s/(?P<name>[\w./-]+\.[A-Za-z0-9]+)(?P=q)"
+
+
+class StaticAssets:
+    """Asset pipeline for one directory: content-hashed URLs, precompression and
+    a memory cache.
+
+    ``url("icons/eye.svg")`` returns ``<prefix>/icons/eye.<hash>.svg``; requests
+    for the hashed name are served with ``Cache-Control: immutable``, plain names
+    still work but must revalidate (ETag/Last-Modified). Files up to
+    ``max_memory_bytes`` are held in memory together with their gzip/brotli
+    variants; larger ones are hashed once and streamed from disk. ``prime()``
+    does all of this up front; afterwards files are re-read only when their
+    mtime/size changes, so edits show up without a restart.
+    """
+
+    def __init__(self, directory: Path, url_prefix: str, *, max_memory_bytes: int = 256 * 1024) -> None:
+        self.directory = Path(directory)
+        self.url_prefix = url_prefix.rstrip("/")
+        self.max_memory_bytes = max(0, int(max_memory_bytes))
+        self._entries: Dict[str, tuple[tuple[int, int], CachedBody]] = {}
+        self._lock = threading.Lock()
+        self._url_re = re.compile(_URL_IN_TEXT % re.escape(self.url_prefix))
+
+    def _resolve(self, name: str) -> Optional[Path]:
+        # Parsed as a Windows path on every host so "C:/..." and "..\\" are caught
+        # wherever the server runs; joining an anchored name would drop the directory
+        win = PureWindowsPath(name)
+        if not name or ":" in name or win.drive or win.anchor or ".." in win.parts:
+            return None
+        root = self.directory.resolve()
+        path = (root / name).resolve()
+        if not path.is_relative_to(root) or not path.is_file():
+            return None
+        return path
+
+    def prime(self) -> int:
+        """Load (hash, compress) every file below the directory; returns the count."""
+        count = 0
+        if not self.directory.is_dir():
+            return 0
+        for path in sorted(self.directory.rglob("*")):
+            if path.is_file() and self.get(path.relative_to(self.directory).as_posix()) is not None:
+                count += 1
+        return count
+
+    def get(self, name: str) -> Optional[CachedBody]:
+        path = self._resolve(name)
+        if path is None:
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        sig = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            cached = self._entries.get(name)
+        if cached is not None and cached[0] == sig:
+            return cached[1]
+        suffix = path.suffix.lower()
+        media_type = _MEDIA_TYPES.get(suffix, "application/octet-stream")
+        try:
+            if st.st_size > self.max_memory_bytes:
+                entry = CachedBody.from_file(path, media_type, st.st_mtime)
+            else:
+                entry = CachedBody.build(path.read_bytes(), media_type, mtime=st.st_mtime, compress=suffix in _COMPRESSIBLE)
+        except OSError as exc:
+            _log.warning("failed to read asset %s: %s", path, exc)
+            return None
+        with self._lock:
+            self._entries[name] = (sig, entry)
+        return entry
+
+    def version(self, name: str) -> str:
+        entry = self.get(name)
+        return entry.digest if entry is not None else "0"
+
+    def hashed_name(self, name: str) -> str:
+        entry = self.get(name)
+        if entry is None:
+            return name
+        stem, dot, ext = name.rpartition(".")
+        return f"{stem}.{entry.digest}.{ext}" if dot else f"{name}.{entry.digest}"
+
+    def url(self, name: str) -> str:
+        return f"{self.url_prefix}/{self.hashed_name(name)}"
+
+    def rewrite(self, text: str) -> str:
+        """Replace quoted ``<prefix>/<name>`` references in HTML/JS with hashed URLs."""
+
+        def sub(m: "re.Match[str]") -> str:
+            name = m.group("name")
+            if self.get(name) is None:
+                return m.group(0)
+            return f"{m.group('q')}{self.url(name)}{m.group('q')}"
+
+        return self._url_re.sub(sub, text)
+
+    def response(self, request: Request, name: str) -> Optional[Response]:
+        entry = self.get(name)
+        immutable = False
+        if entry is None:
+            m = _HASHED_NAME.match(name)
+            if m is None:
+                return None
+            entry = self.get(m.group("stem") + m.group("ext"))
+            if entry is None:
+                return None
+            # A stale hash still gets the current content, just not cached for long
+            immutable = m.group("digest") == entry.digest
+        return cached_response(request, entry, cache_control=IMMUTABLE if immutable else REVALIDATE)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = [e for _, e in self._entries.values()]
+        return {
+            "files": len(entries),
+            "memory_bytes": sum(len(e.body) + len(e.gzip or b"") + len(e.br or b"") for e in entries),
+            "on_disk": sum(1 for e in entries if e.path is not None),
+            "brotli": brotli is not None,
+        }
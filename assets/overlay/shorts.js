@@ -0,0 +1,33 @@
+// Shorts overlay for /overlay/shorts. Page config comes from the #cfg JSON block.
+function getCfg(){ try{ return JSON.parse(document.getElementById('cfg').textContent||'{}'); }catch(_){ return {}; } }
+const CFG = getCfg(); const IDS = Array.isArray(CFG.ids)? CFG.ids: []; const MODE = CFG.mode||'ids'; const LIST_ID = CFG.listId||null;
+let index = Math.min(Math.max(0, ~~(CFG.startIndex||0)), Math.max(0, IDS.length-1));
+let player; let ready=false; let lastSaved=0; let readyTimer=null; let apiLoadTimer=null;
+function switchToEmbed(){ if(CFG.embedFallback!==true) return; try{ const el=document.getElementById('shorts'); const q=[]; q.push('autoplay=1'); q.push('mute='+(CFG.muted?1:0)); q.push('playsinline=1'); q.push('controls='+(CFG.controls?1:0)); const query=q.join('&'); let src=null; if(MODE==='playlist' && LIST_ID){ src='https://www.youtube.com/embed/videoseries?list='+encodeURIComponent(LIST_ID)+'&'+query; } else if(MODE==='ids'){ if(IDS.length===1){ const vid=IDS[0]; src='https://www.youtube.com/embed/'+encodeURIComponent(vid)+'?'+query; } else if(IDS.length>1){ const first=IDS[0]; const rest=IDS.slice(1).map(encodeURIComponent).join(','); const qp=[query]; if(rest){ qp.push('loop=1'); qp.push('playlist='+rest); } src='https://www.youtube.com/embed/'+encodeURIComponent(first)+'?'+qp.join('&'); } } if(!src) return; var iframe=document.createElement('iframe'); iframe.src=src; iframe.setAttribute('frameborder','0'); iframe.setAttribute('allow','autoplay; encrypted-media; picture-in-picture'); iframe.allowFullscreen=true; el.innerHTML=''; el.appendChild(iframe); }catch(_){} }
+function loadYT(){ const tag=document.createElement('script'); tag.src='https://www.youtube.com/iframe_api'; tag.onerror=()=>{ try{ switchToEmbed(); }catch(_){ } }; document.head.appendChild(tag); }
+function mount(id){ if(MODE!=='ids'){ return mountPlaylist(); }
+  const opts={videoId:id, playerVars:{autoplay:1,controls:(CFG.controls?1:0),disablekb:0,modestbranding:1,rel:0,playsinline:1,fs:0,iv_load_policy:3,loop:(CFG.loop?1:0),playlist:(CFG.loop?id:undefined),start:0,enablejsapi:1,origin:location.origin,mute:(CFG.muted?1:0)},
+    events:{onReady:(ev)=>{ ready=true; if(readyTimer){ clearTimeout(readyTimer); readyTimer=null; } try{ if(CFG.muted){ ev.target.mute(); ev.target.setVolume?.(0);} else { ev.target.unMute(); } }catch(_){}; if(CFG.restore){ try{ const t=+(localStorage.getItem('yt:'+id)||'0'); if(t>2) ev.target.seekTo(t,true);}catch(_){}} },
+            onStateChange:(ev)=>{ try{ const s=ev.data; if(s===0){ next(); } }catch(_){ } },
+            onError:(ev)=>{ try{ const code=ev.data; console.warn('YT error', code); if(Array.isArray(IDS) && IDS.length>1){ next(); } else { switchToEmbed(); } }catch(_){ } } } };
+  player = new YT.Player('shorts', opts);
+}
+function mountPlaylist(){
+  const opts={playerVars:{listType:'playlist', list: LIST_ID, autoplay:1, controls:(CFG.controls?1:0), disablekb:0, modestbranding:1, rel:0, playsinline:1, fs:0, iv_load_policy:3, loop:(CFG.loop?1:0), enablejsapi:1, origin:location.origin, mute:(CFG.muted?1:0)},
+    events:{onReady:(ev)=>{ ready=true; if(readyTimer){ clearTimeout(readyTimer); readyTimer=null; } try{ if(CFG.muted){ ev.target.mute(); ev.target.setVolume?.(0);} else { ev.target.unMute(); } }catch(_){}; },
+            onStateChange:(ev)=>{ /* YT handles next automatically in playlist mode; optional hooks here */ },
+            onError:(ev)=>{ try{ const code=ev.data; console.warn('YT error', code); switchToEmbed(); }catch(_){ } } } };
+  player = new YT.Player('shorts', opts);
+}
+function onYouTubeIframeAPIReady(){ if(apiLoadTimer){ clearTimeout(apiLoadTimer); apiLoadTimer=null; } if(MODE==='ids'){ mount(IDS[index]); } else { mountPlaylist(); } if(!readyTimer){ readyTimer = setTimeout(()=>{ if(!ready){ switchToEmbed(); } }, 2000); } }
+window.onYouTubeIframeAPIReady = onYouTubeIframeAPIReady;
+function next(){ try{ index=(index+1)%IDS.length; player.loadVideoById(IDS[index]); }catch(_){ location.href = location.pathname + '?ids='+encodeURIComponent(IDS.join(','))+'&start_index='+index; } }
+document.addEventListener('visibilitychange',()=>{ if(!player||!ready) return; try{ if(document.hidden){player.pauseVideo();} else if(CFG.resumeOnShow){player.playVideo();} }catch(_){ } });
+setInterval(()=>{ if(!player||!ready) return; try{ const t=Math.floor(player.getCurrentTime?.()||0); if(!Number.isFinite(t)) return; if(Math.abs(t-lastSaved)>=2){ localStorage.setItem('yt:'+IDS[index],String(t)); lastSaved=t; } }catch(_){ } },2000);
+// Overlay WS control: pause/resume/next/mute
+let sock; function connect(){ try{ sock=new WebSocket(location.origin.replace(/^http/,'ws')+'/overlay/ws'); }catch(e){ setTimeout(connect,1000); return; }
+sock.onclose=()=>setTimeout(connect,1000);
+sock.onmessage=(ev)=>{ try{ const data=JSON.parse(ev.data); if(data?.type==='overlay_control'){ const a=(data.action||'').toLowerCase(); if(a==='pause'||a==='stop'){ try{ player?.pauseVideo?.(); }catch(_){} } else if(a==='resume'){ try{ player?.playVideo?.(); }catch(_){} } else if(a==='next'){ try{ next(); }catch(_){} } else if(a==='mute'){ try{ player?.mute?.(); player?.setVolume?.(0);}catch(_){} } else if(a==='unmute'){ try{ player?.unMute?.(); }catch(_){} } } }catch(_){ } }; }
+connect();
+apiLoadTimer = setTimeout(()=>{ try{ if(!ready){ switchToEmbed(); } }catch(_){ } }, 2000);
+loadYT();
@@ -0,0 +1,118 @@
+// Toast overlay for /overlay. Page config comes from the #cfg JSON block.
+const CFG = (()=>{ try{ return JSON.parse(document.getElementById('cfg').textContent||'{}'); }catch(_){ return {}; } })();
+const showHeader = !!CFG.showHeader;
+const legion = CFG.legion || '';
+const brandText = CFG.brandText || '';
+const brandColor = CFG.brandColor || '';
+const clockEnabled = !!CFG.clockEnabled;
+const q = new URLSearchParams(location.search);
+const endpoint = (q.get('ws')||'').trim() || (location.origin.replace(/^http/,'ws') + '/overlay/ws');
+const pos = (q.get('pos')||'tr').toLowerCase();
+document.body.classList.add('pos-'+(['tl','tr','bl','br'].includes(pos)?pos:'tr'));
+const maxToasts = Math.max(1, Math.min(6, +(q.get('max')||4)));
+const toasts = document.getElementById('toasts');
+
+// Apply header visibility and toasts offset only when at top positions
+try{
+  const header = document.getElementById('header');
+  const brand = document.getElementById('brand');
+  const clock = document.getElementById('clock');
+  header.style.display = showHeader ? 'flex' : 'none';
+  // brand content/color
+  if(brand){ brand.textContent = brandText || 'MIRRORLESS'; brand.style.color = brandColor || '#ffffff'; }
+  // clock toggle
+  clock.style.display = clockEnabled ? 'block' : 'none';
+  // After layout, compute actual height to set offset precisely
+  requestAnimationFrame(()=>{
+    if(pos === 'tr' || pos === 'tl'){
+      const h = showHeader ? Math.ceil((header.getBoundingClientRect?.().height || 0) + 12) : 16;
+      toasts.style.top = h + 'px';
+    }
+  });
+}catch(e){}
+
+const ICONS = {
+  info: `<svg viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg"><path d="M12 2a10 10 0 100 20 10 10 0 000-20z" fill="currentColor" opacity=".18"/><path d="M11 10h2v7h-2v-7zm0-3h2v2h-2V7z" fill="currentColor"/></svg>`,
+  success: `<svg viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg"><path d="M12 2a10 10 0 100 20 10 10 0 000-20z" fill="currentColor" opacity=".18"/><path d="M17 9l-6.5 6L7 11.5l1.4-1.4L10.5 12l5.1-5 1.4 2z" fill="currentColor"/></svg>`,
+  warning: `<svg viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg"><path d="M12 2l10 18H2L12 2z" fill="currentColor" opacity=".2"/><path d="M11 10h2v4h-2v-4zm0 6h2v2h-2v-2z" fill="currentColor"/></svg>`,
+  error: `<svg viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg"><circle cx="12" cy="12" r="10" fill="currentColor" opacity=".2"/><path d="M15.5 8.5L8.5 15.5m0-7l7 7" stroke="currentColor" stroke-width="2" stroke-linecap="round"/></svg>`
+};
+
+function clamp(n, a, b){ return Math.max(a, Math.min(b, n)); }
+
+function removeToast(el){
+  if(!el) return;
+  el.classList.add('closing');
+  el.addEventListener('animationend', ()=>{ el.remove(); }, {once:true});
+}
+
+function showToast(msg, level='info', timeoutMs=2000){
+  const L = (level||'info').toLowerCase();
+  const dur = clamp(~~(timeoutMs||2000), 600, 10000);
+
+  const d = document.createElement('div');
+  d.className = 'toast entering '+L;
+  d.style.setProperty('--dur', dur+'ms');
+
+  const icon = document.createElement('div'); icon.className='icon'; icon.innerHTML = ICONS[L] || ICONS.info;
+  const content = document.createElement('div'); content.className='content';
+  const msgEl = document.createElement('div'); msgEl.className='msg'; msgEl.textContent = String(msg ?? '');
+  content.appendChild(msgEl);
+  const close = document.createElement('button'); close.className='close'; close.setAttribute('aria-label','Close'); close.textContent='×';
+  const progress = document.createElement('div'); progress.className='progress';
+  const bar = document.createElement('div'); bar.className='bar'; progress.appendChild(bar);
+
+  d.appendChild(icon); d.appendChild(content); d.appendChild(close); d.appendChild(progress);
+  toasts.appendChild(d);
+
+  requestAnimationFrame(()=> d.classList.remove('entering'));
+
+  let timer = setTimeout(()=> removeToast(d), dur + 80);
+  function pause(){ if(timer){ clearTimeout(timer); timer=null; } d.classList.add('paused'); }
+  function resume(){ if(!timer){ d.classList.remove('paused'); timer = setTimeout(()=> removeToast(d), Math.max(300, dur/2)); } }
+  d.addEventListener('mouseenter', pause);
+  d.addEventListener('mouseleave', resume);
+  close.addEventListener('click', ()=> removeToast(d));
+
+  while(toasts.children.length > maxToasts){ removeToast(toasts.firstElementChild); break; }
+}
+
+let sock;
+function connect(){
+  try{ sock = new WebSocket(endpoint); }catch(e){ setTimeout(connect, 1500); return; }
+  sock.onopen = ()=>{};
+  sock.onclose = ()=>{ setTimeout(connect, 1000); };
+  sock.onmessage = (ev)=>{
+    try{
+      const data = JSON.parse(ev.data);
+      if(data?.type==='toast'){ showToast(data.message, data.level, data.timeout_ms); }
+    }catch(e){}
+  };
+}
+connect();
+
+// Clock rendering (locale based on legion)
+if(showHeader && clockEnabled){
+  try{
+    const clockEl = document.getElementById('clock');
+    const locale = legion === 'KOREA' ? 'ko-KR' : undefined;
+    const opts = legion === 'KOREA'
+      ? { hour: '2-digit', minute: '2-digit', second: '2-digit', hour12: false }
+      : { hour: '2-digit', minute: '2-digit', second: '2-digit' };
+    function tick(){
+      const now = new Date();
+      clockEl.textContent = now.toLocaleTimeString(locale, opts);
+    }
+    tick();
+    setInterval(tick, 1000);
+  }catch(e){}
+}
+
+if(q.get('demo')==='1'){
+  setTimeout(()=>{
+    showToast('Connected to overlay', 'success', 1400);
+    setTimeout(()=>showToast('Info message with more details', 'info', 2200), 300);
+    setTimeout(()=>showToast('Warning: check your input source', 'warning', 2600), 650);
+    setTimeout(()=>showToast('Error: failed to save', 'error', 2600), 1100);
+  }, 300);
+}
@@ -0,0 +1,31 @@
+// YouTube overlay for /overlay/youtube. Page config comes from the #cfg JSON block.
+function getCfg(){ try{ return JSON.parse(document.getElementById('cfg').textContent||'{}'); }catch(_){ return {}; } }
+const CFG = getCfg();
+const VIDEO_ID = CFG.videoId;
+const START = Math.max(0, ~~(CFG.start||0));
+const WANT_CONTROLS = !!CFG.controls;
+const WANT_MUTED = !!CFG.muted;
+const WANT_LOOP = !!CFG.loop;
+const RESUME_ON_SHOW = !!CFG.resumeOnShow;
+const RESTORE = !!CFG.restore;
+let player; let ready=false; let lastSaved=0;
+function loadYT(){ const tag=document.createElement('script'); tag.src='https://www.youtube.com/iframe_api'; document.head.appendChild(tag); }
+function onYouTubeIframeAPIReady(){
+  const opts={
+    videoId: VIDEO_ID,
+    playerVars:{autoplay:0,controls:(WANT_CONTROLS?1:0),disablekb:0,modestbranding:1,rel:0,playsinline:1,fs:0,iv_load_policy:3,loop:(WANT_LOOP?1:0),playlist:(WANT_LOOP?VIDEO_ID:undefined),start:(START>0?START:0),enablejsapi:1,origin:location.origin},
+    events:{
+      onReady:(ev)=>{
+        ready=true;
+        try{ if(WANT_MUTED) ev.target.mute(); else ev.target.unMute(); }catch(_){ }
+        if(RESTORE){ try{ const key='yt:'+VIDEO_ID; const pos=+(localStorage.getItem(key)||'0'); if(pos>2) ev.target.seekTo(pos,true); }catch(_){ } }
+      },
+      onStateChange:(_ev)=>{ }
+    }
+  };
+  player=new YT.Player('player',opts);
+}
+window.onYouTubeIframeAPIReady=onYouTubeIframeAPIReady;
+loadYT();
+document.addEventListener('visibilitychange',()=>{ if(!player||!ready) return; try{ if(document.hidden){player.pauseVideo();} else if(RESUME_ON_SHOW){player.playVideo();} }catch(_){ } });
+setInterval(()=>{ if(!player||!ready) return; try{ const t=Math.floor(player.getCurrentTime?.()||0); if(!Number.isFinite(t)) return; if(Math.abs(t-lastSaved)>=2){ localStorage.setItem('yt:'+VIDEO_ID,String(t)); lastSaved=t; } }catch(_){ } },2000);
@@ -0,0 +1,849 @@
+"""In-process OBS WebSocket v5 emulator for benchmarks and local runs without OBS.
+
+Speaks enough of the v5 protocol for ``obsws_python.ReqClient`` and this app:
+Hello/Identify (with optional password auth), single requests (op 6/7) and
+request batches (op 8/9). State covers scenes, scene items (with transforms),
+inputs and their settings, source filters, stream/record status; screenshots
+return generated PNGs.
+
+Latency, jitter, per-request failures and dropped connections can be injected
+through :class:`FakeOBSOptions`, also at runtime via ``server.options``.
+
+    python -m bench.fake_obs --port 4455 --latency-ms 5 --fail-rate 0.01
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import random
+import struct
+import threading
+import time
+import uuid
+import zlib
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from websockets.asyncio.server import ServerConnection, serve
+from websockets.exceptions import ConnectionClosed
+
+
+_log = logging.getLogger("bench.fake_obs")
+
+OBS_VERSION = "30.2.0"
+WS_VERSION = "5.5.0"
+
+# RequestStatus codes (subset of obs-websocket's enum)
+SUCCESS = 100
+MISSING_REQUEST_TYPE = 203
+UNKNOWN_REQUEST_TYPE = 204
+MISSING_REQUEST_FIELD = 300
+INVALID_REQUEST_FIELD = 400
+OUTPUT_RUNNING = 500
+OUTPUT_NOT_RUNNING = 501
+STUDIO_MODE_NOT_ACTIVE = 506
+RESOURCE_NOT_FOUND = 600
+RESOURCE_ALREADY_EXISTS = 601
+REQUEST_PROCESSING_FAILED = 702
+
+# Mirrors app.infrastructure.obs.bootstrap.STANDARD_SCENES
+DEFAULT_SCENES = [
+    "Home",
+    "ReferenceSearch",
+    "LiveFront",
+    "LiveSide",
+    "LiveRear",
+    "Relax",
+    "YouTube",
+    "Reels",
+    "ProcedureBeforeFront",
+    "ProcedureBeforeSide",
+    "ProcedureBeforeRear",
+    "ProcedureAfterFront",
+    "ProcedureAfterSide",
+    "ProcedureAfterRear",
+    "LiveThreeWay",
+]
+
+def default_transform() -> Dict[str, Any]:
+    return {
+        "positionX": 0.0, "positionY": 0.0, "rotation": 0.0, "scaleX": 1.0, "scaleY": 1.0,
+        "alignment": 5, "boundsType": "OBS_BOUNDS_NONE", "boundsAlignment": 0,
+        "boundsWidth": 0.0, "boundsHeight": 0.0,
+        "cropLeft": 0, "cropRight": 0, "cropTop": 0, "cropBottom": 0,
+    }
+
+
+DEFAULT_INPUTS: Dict[str, tuple[str, Dict[str, Any]]] = {
+    "cam_front": ("dshow_input", {"video_device_id": "fake:front"}),
+    "cam_side": ("dshow_input", {"video_device_id": "fake:side"}),
+    "cam_rear": ("dshow_input", {"video_device_id": "fake:rear"}),
+    "window_capture": ("window_capture", {}),
+    "img_before_front": ("image_source", {"file": ""}),
+    "img_before_side": ("image_source", {"file": ""}),
+    "img_before_rear": ("image_source", {"file": ""}),
+    "img_after_front": ("image_source", {"file": ""}),
+    "img_after_side": ("image_source", {"file": ""}),
+    "img_after_rear": ("image_source", {"file": ""}),
+    "img_hair_reference": ("image_source", {"file": ""}),
+}
+
+
+class RequestError(Exception):
+    def __init__(self, code: int, comment: str) -> None:
+        super().__init__(comment)
+        self.code = code
+        self.comment = comment
+
+
+@dataclass
+class FakeOBSOptions:
+    password: str = ""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    # Probability that any request fails with REQUEST_PROCESSING_FAILED
+    fail_rate: float = 0.0
+    # requestType -> failure probability, overrides fail_rate for that type
+    fail_requests: Dict[str, float] = field(default_factory=dict)
+    # requestType -> extra latency in ms (e.g. screenshots are slow in real OBS)
+    request_latency_ms: Dict[str, float] = field(default_factory=dict)
+    # Probability that a request closes the connection instead of answering
+    drop_rate: float = 0.0
+    # Upper bound for generated screenshot dimensions
+    max_image_dim: int = 4096
+    # Where StopRecord/SaveReplayBuffer write dummy media files (None: report paths only)
+    output_dir: Optional[str] = None
+    output_bytes: int = 256 * 1024
+    seed: Optional[int] = None
+
+
+@lru_cache(maxsize=32)
+def make_png(width: int, height: int, shade: int = 0) -> bytes:
+    """Small synthetic RGB PNG: vertical gradient, so rows differ like real frames."""
+    width = max(1, int(width))
+    height = max(1, int(height))
+    rows = []
+    for y in range(height):
+        v = (shade + y * 255 // max(1, height - 1)) & 0xFF
+        rows.append(b"\x00" + bytes((v, 128, 255 - v)) * width)
+    raw = b"".join(rows)
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        body = tag + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xFFFFFFFF)
+
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", ihdr) + chunk(b"IDAT", zlib.compress(raw, 1)) + chunk(b"IEND", b"")
+
+
+class FakeOBSState:
+    """Mutable OBS model shared by all connections of one server."""
+
+    def __init__(self) -> None:
+        self.scenes: Dict[str, list[dict]] = {name: [] for name in DEFAULT_SCENES}
+        self.current_scene = "Home"
+        self.preview_scene: Optional[str] = None
+        self.studio_mode = False
+        self.inputs: Dict[str, dict] = {}
+        self.filters: Dict[str, list[dict]] = {}
+        self.next_item_id = 1
+        self.stream_active = False
+        self.stream_started_at = 0.0
+        self.record_active = False
+        self.record_started_at = 0.0
+        self.replay_active = False
+        self.last_replay: Optional[str] = None
+        self.outputs_written = 0
+        for name, (kind, settings) in DEFAULT_INPUTS.items():
+            self.add_input("Home", name, kind, dict(settings))
+
+    def add_input(self, scene: str, name: str, kind: str, settings: Dict[str, Any]) -> dict:
+        item_id = self.next_item_id
+        self.next_item_id += 1
+        self.inputs[name] = {
+            "inputName": name,
+            "inputKind": kind,
+            "unversionedInputKind": kind,
+            "inputUuid": str(uuid.uuid4()),
+            "inputSettings": dict(settings),
+        }
+        self.filters[name] = []
+        self.scenes.setdefault(scene, []).append(
+            {
+                "sceneItemId": item_id,
+                "sourceName": name,
+                "sceneItemEnabled": True,
+                "sceneItemIndex": len(self.scenes[scene]),
+                "sceneItemTransform": default_transform(),
+            }
+        )
+        return {"inputUuid": self.inputs[name]["inputUuid"], "sceneItemId": item_id}
+
+
+def _require(data: Dict[str, Any], key: str) -> Any:
+    if key not in data or data[key] is None:
+        raise RequestError(MISSING_REQUEST_FIELD, f"Your request is missing the `{key}` field.")
+    return data[key]
+
+
+class FakeOBSServer:
+    def __init__(self, options: Optional[FakeOBSOptions] = None, *, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.options = options or FakeOBSOptions()
+        self.host = host
+        self.port = port
+        self.state = FakeOBSState()
+        self.stats: Counter = Counter()
+        self.failures: Counter = Counter()
+        self.connections: set[ServerConnection] = set()
+        self.total_connections = 0
+        self._rng = random.Random(self.options.seed)
+        self._server = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            "GetVersion": self._get_version,
+            "GetStats": self._get_stats,
+            "GetSceneList": self._get_scene_list,
+            "GetCurrentProgramScene": lambda d: {"currentProgramSceneName": self.state.current_scene, "sceneName": self.state.current_scene},
+            "SetCurrentProgramScene": self._set_program_scene,
+            "GetCurrentPreviewScene": self._get_preview_scene,
+            "SetCurrentPreviewScene": self._set_preview_scene,
+            "GetStudioModeEnabled": lambda d: {"studioModeEnabled": self.state.studio_mode},
+            "SetStudioModeEnabled": self._set_studio_mode,
+            "CreateScene": self._create_scene,
+            "RemoveScene": self._remove_scene,
+            "GetSceneItemList": self._get_scene_item_list,
+            "GetSceneItemId": self._get_scene_item_id,
+            "CreateSceneItem": self._create_scene_item,
+            "SetSceneItemEnabled": self._set_scene_item_enabled,
+            "SetSceneItemTransform": self._set_scene_item_transform,
+            "SetSceneItemIndex": self._set_scene_item_index,
+            "GetSourceFilterList": self._get_source_filter_list,
+            "CreateSourceFilter": self._create_source_filter,
+            "SetSourceFilterSettings": self._set_source_filter_settings,
+            "SetSourceFilterEnabled": self._set_source_filter_enabled,
+            "GetInputList": self._get_input_list,
+            "GetInputSettings": self._get_input_settings,
+            "SetInputSettings": self._set_input_settings,
+            "CreateInput": self._create_input,
+            "RemoveInput": self._remove_input,
+            "GetStreamStatus": self._get_stream_status,
+            "StartStream": self._start_stream,
+            "StopStream": self._stop_stream,
+            "ToggleStream": self._toggle_stream,
+            "GetRecordStatus": self._get_record_status,
+            "StartRecord": self._start_record,
+            "StopRecord": self._stop_record,
+            "ToggleRecord": self._toggle_record,
+            "GetReplayBufferStatus": lambda d: {"outputActive": self.state.replay_active},
+            "StartReplayBuffer": self._start_replay_buffer,
+            "StopReplayBuffer": self._stop_replay_buffer,
+            "ToggleReplayBuffer": self._toggle_replay_buffer,
+            "SaveReplayBuffer": self._save_replay_buffer,
+            "GetLastReplayBufferReplay": self._get_last_replay,
+            "GetSourceScreenshot": self._get_source_screenshot,
+            "SaveSourceScreenshot": self._save_source_screenshot,
+        }
+
+    # ------------------------------------------------------------ extension
+    def register(self, request_type: str, handler: Callable[[Dict[str, Any]], Any]) -> None:
+        """Add or override a request handler (``requestData -> responseData``)."""
+        self._handlers[request_type] = handler
+
+    # ------------------------------------------------------------ requests
+    def _get_version(self, _d: Dict[str, Any]) -> dict:
+        return {
+            "obsVersion": OBS_VERSION,
+            "obsWebSocketVersion": WS_VERSION,
+            "rpcVersion": 1,
+            "availableRequests": sorted(self._handlers),
+            "supportedImageFormats": ["png", "jpg", "jpeg", "bmp"],
+            "platform": "fake",
+            "platformDescription": "bench.fake_obs",
+        }
+
+    def _get_stats(self, _d: Dict[str, Any]) -> dict:
+        return {
+            "cpuUsage": 1.0,
+            "memoryUsage": 100.0,
+            "activeFps": 60.0,
+            "averageFrameRenderTime": 1.0,
+            "renderSkippedFrames": 0,
+            "renderTotalFrames": 0,
+            "outputSkippedFrames": 0,
+            "outputTotalFrames": 0,
+            "webSocketSessionIncomingMessages": sum(self.stats.values()),
+            "webSocketSessionOutgoingMessages": sum(self.stats.values()),
+        }
+
+    def _scene_or_404(self, data: Dict[str, Any]) -> str:
+        name = str(_require(data, "sceneName"))
+        if name not in self.state.scenes:
+            raise RequestError(RESOURCE_NOT_FOUND, f"No source was found by the name of `{name}`.")
+        return name
+
+    def _input_or_404(self, data: Dict[str, Any]) -> dict:
+        name = str(_require(data, "inputName"))
+        inp = self.state.inputs.get(name)
+        if inp is None:
+            raise RequestError(RESOURCE_NOT_FOUND, f"No source was found by the name of `{name}`.")
+        return inp
+
+    def _get_scene_list(self, _d: Dict[str, Any]) -> dict:
+        names = list(self.state.scenes)
+        scenes = [{"sceneName": n, "sceneIndex": len(names) - 1 - i, "sceneUuid": n} for i, n in enumerate(names)]
+        return {
+            "currentProgramSceneName": self.state.current_scene,
+            "currentPreviewSceneName": self.state.preview_scene,
+            "scenes": list(reversed(scenes)),
+        }
+
+    def _set_program_scene(self, data: Dict[str, Any]) -> None:
+        self.state.current_scene = self._scene_or_404(data)
+
+    def _get_preview_scene(self, _d: Dict[str, Any]) -> dict:
+        if not self.state.studio_mode:
+            raise RequestError(STUDIO_MODE_NOT_ACTIVE, "Studio mode is not active.")
+        return {"currentPreviewSceneName": self.state.preview_scene, "sceneName": self.state.preview_scene}
+
+    def _set_preview_scene(self, data: Dict[str, Any]) -> None:
+        if not self.state.studio_mode:
+            raise RequestError(STUDIO_MODE_NOT_ACTIVE, "Studio mode is not active.")
+        self.state.preview_scene = self._scene_or_404(data)
+
+    def _set_studio_mode(self, data: Dict[str, Any]) -> None:
+        self.state.studio_mode = bool(_require(data, "studioModeEnabled"))
+        if self.state.studio_mode and self.state.preview_scene is None:
+            self.state.preview_scene = self.state.current_scene
+
+    def _create_scene(self, data: Dict[str, Any]) -> dict:
+        name = str(_require(data, "sceneName"))
+        if name in self.state.scenes or name in self.state.inputs:
+            raise RequestError(RESOURCE_ALREADY_EXISTS, "A source already exists by that scene name.")
+        self.state.scenes[name] = []
+        return {"sceneUuid": name}
+
+    def _remove_scene(self, data: Dict[str, Any]) -> None:
+        name = self._scene_or_404(data)
+        del self.state.scenes[name]
+        if self.state.current_scene == name:
+            self.state.current_scene = next(iter(self.state.scenes), "")
+
+    def _get_scene_item_list(self, data: Dict[str, Any]) -> dict:
+        name = self._scene_or_404(data)
+        items = []
+        for item in self.state.scenes[name]:
+            inp = self.state.inputs.get(item["sourceName"], {})
+            items.append({**item, "inputKind": inp.get("inputKind"), "sourceType": "OBS_SOURCE_TYPE_INPUT"})
+        return {"sceneItems": items}
+
+    def _get_scene_item_id(self, data: Dict[str, Any]) -> dict:
+        scene = self._scene_or_404(data)
+        source = str(_require(data, "sourceName"))
+        for item in self.state.scenes[scene]:
+            if item["sourceName"] == source:
+                return {"sceneItemId": item["sceneItemId"]}
+        raise RequestError(RESOURCE_NOT_FOUND, "No scene items were found in the specified scene by that name.")
+
+    def _create_scene_item(self, data: Dict[str, Any]) -> dict:
+        scene = self._scene_or_404(data)
+        source = str(_require(data, "sourceName"))
+        if source not in self.state.inputs and source not in self.state.scenes:
+            raise RequestError(RESOURCE_NOT_FOUND, f"No source was found by the name of `{source}`.")
+        item_id = self.state.next_item_id
+        self.state.next_item_id += 1
+        self.state.scenes[scene].append(
+            {
+                "sceneItemId": item_id,
+                "sourceName": source,
+                "sceneItemEnabled": bool(data.get("sceneItemEnabled", True)),
+                "sceneItemIndex": len(self.state.scenes[scene]),
+                "sceneItemTransform": default_transform(),
+            }
+        )
+        return {"sceneItemId": item_id}
+
+    def _set_scene_item_enabled(self, data: Dict[str, Any]) -> None:
+        scene = self._scene_or_404(data)
+        item_id = int(_require(data, "sceneItemId"))
+        for item in self.state.scenes[scene]:
+            if item["sceneItemId"] == item_id:
+                item["sceneItemEnabled"] = bool(_require(data, "sceneItemEnabled"))
+                return
+        raise RequestError(RESOURCE_NOT_FOUND, "No scene item was found by that id.")
+
+    def _scene_item_or_404(self, data: Dict[str, Any]) -> tuple[str, dict]:
+        scene = self._scene_or_404(data)
+        item_id = int(_require(data, "sceneItemId"))
+        for item in self.state.scenes[scene]:
+            if item["sceneItemId"] == item_id:
+                return scene, item
+        raise RequestError(RESOURCE_NOT_FOUND, "No scene item was found by that id.")
+
+    def _set_scene_item_transform(self, data: Dict[str, Any]) -> None:
+        _scene, item = self._scene_item_or_404(data)
+        tf = _require(data, "sceneItemTransform")
+        if not isinstance(tf, dict):
+            raise RequestError(INVALID_REQUEST_FIELD, "sceneItemTransform must be an object.")
+        item["sceneItemTransform"].update(tf)
+
+    def _set_scene_item_index(self, data: Dict[str, Any]) -> None:
+        scene, item = self._scene_item_or_404(data)
+        items = self.state.scenes[scene]
+        items.remove(item)
+        items.insert(max(0, min(len(items), int(_require(data, "sceneItemIndex")))), item)
+        for i, it in enumerate(items):
+            it["sceneItemIndex"] = i
+
+    def _source_filters_or_404(self, data: Dict[str, Any]) -> list[dict]:
+        name = str(_require(data, "sourceName"))
+        if name not in self.state.inputs and name not in self.state.scenes:
+            raise RequestError(RESOURCE_NOT_FOUND, f"No source was found by the name of `{name}`.")
+        return self.state.filters.setdefault(name, [])
+
+    def _filter_or_404(self, data: Dict[str, Any]) -> dict:
+        name = str(_require(data, "filterName"))
+        for f in self._source_filters_or_404(data):
+            if f["filterName"] == name:
+                return f
+        raise RequestError(RESOURCE_NOT_FOUND, "No filter was found in the source by that name.")
+
+    def _get_source_filter_list(self, data: Dict[str, Any]) -> dict:
+        return {"filters": [dict(f, filterSettings=dict(f["filterSettings"])) for f in self._source_filters_or_404(data)]}
+
+    def _create_source_filter(self, data: Dict[str, Any]) -> None:
+        filters = self._source_filters_or_404(data)
+        name = str(_require(data, "filterName"))
+        if any(f["filterName"] == name for f in filters):
+            raise RequestError(RESOURCE_ALREADY_EXISTS, "A filter already exists by that name.")
+        filters.append(
+            {
+                "filterName": name,
+                "filterKind": str(_require(data, "filterKind")),
+                "filterIndex": len(filters),
+                "filterEnabled": True,
+                "filterSettings": dict(data.get("filterSettings") or {}),
+            }
+        )
+
+    def _set_source_filter_settings(self, data: Dict[str, Any]) -> None:
+        f = self._filter_or_404(data)
+        settings = _require(data, "filterSettings")
+        if data.get("overlay", True):
+            f["filterSettings"].update(settings)
+        else:
+            f["filterSettings"] = dict(settings)
+
+    def _set_source_filter_enabled(self, data: Dict[str, Any]) -> None:
+        self._filter_or_404(data)["filterEnabled"] = bool(_require(data, "filterEnabled"))
+
+    def _get_input_list(self, data: Dict[str, Any]) -> dict:
+        kind = data.get("inputKind")
+        return {
+            "inputs": [
+                {k: v for k, v in inp.items() if k != "inputSettings"}
+                for inp in self.state.inputs.values()
+                if not kind or inp["inputKind"] == kind
+            ]
+        }
+
+    def _get_input_settings(self, data: Dict[str, Any]) -> dict:
+        inp = self._input_or_404(data)
+        return {"inputSettings": dict(inp["inputSettings"]), "inputKind": inp["inputKind"]}
+
+    def _set_input_settings(self, data: Dict[str, Any]) -> None:
+        inp = self._input_or_404(data)
+        settings = _require(data, "inputSettings")
+        if not isinstance(settings, dict):
+            raise RequestError(INVALID_REQUEST_FIELD, "inputSettings must be an object.")
+        if data.get("overlay", True):
+            inp["inputSettings"].update(settings)
+        else:
+            inp["inputSettings"] = dict(settings)
+
+    def _create_input(self, data: Dict[str, Any]) -> dict:
+        scene = self._scene_or_404(data)
+        name = str(_require(data, "inputName"))
+        if name in self.state.inputs or name in self.state.scenes:
+            raise RequestError(RESOURCE_ALREADY_EXISTS, "A source already exists by that input name.")
+        kind = str(_require(data, "inputKind"))
+        return self.state.add_input(scene, name, kind, dict(data.get("inputSettings") or {}))
+
+    def _remove_input(self, data: Dict[str, Any]) -> None:
+        inp = self._input_or_404(data)
+        name = inp["inputName"]
+        del self.state.inputs[name]
+        self.state.filters.pop(name, None)
+        for items in self.state.scenes.values():
+            items[:] = [i for i in items if i["sourceName"] != name]
+
+    def _output_status(self, active: bool, started: float) -> dict:
+        ms = int((time.monotonic() - started) * 1000) if active else 0
+        return {
+            "outputActive": active,
+            "outputReconnecting": False,
+            "outputTimecode": time.strftime("%H:%M:%S", time.gmtime(ms / 1000)) + f".{ms % 1000:03d}",
+            "outputDuration": ms,
+            "outputCongestion": 0.0,
+            "outputBytes": ms * 750,
+            "outputSkippedFrames": 0,
+            "outputTotalFrames": ms * 60 // 1000,
+        }
+
+    def _get_stream_status(self, _d: Dict[str, Any]) -> dict:
+        return self._output_status(self.state.stream_active, self.state.stream_started_at)
+
+    def _start_stream(self, _d: Dict[str, Any]) -> None:
+        if self.state.stream_active:
+            raise RequestError(OUTPUT_RUNNING, "The stream output is already running.")
+        self.state.stream_active = True
+        self.state.stream_started_at = time.monotonic()
+
+    def _stop_stream(self, _d: Dict[str, Any]) -> None:
+        if not self.state.stream_active:
+            raise RequestError(OUTPUT_NOT_RUNNING, "The stream output is not running.")
+        self.state.stream_active = False
+
+    def _toggle_stream(self, _d: Dict[str, Any]) -> dict:
+        if self.state.stream_active:
+            self._stop_stream(_d)
+        else:
+            self._start_stream(_d)
+        return {"outputActive": self.state.stream_active}
+
+    def _get_record_status(self, _d: Dict[str, Any]) -> dict:
+        out = self._output_status(self.state.record_active, self.state.record_started_at)
+        out["outputPaused"] = False
+        return out
+
+    def _start_record(self, _d: Dict[str, Any]) -> None:
+        if self.state.record_active:
+            raise RequestError(OUTPUT_RUNNING, "The record output is already running.")
+        self.state.record_active = True
+        self.state.record_started_at = time.monotonic()
+
+    def _stop_record(self, _d: Dict[str, Any]) -> dict:
+        if not self.state.record_active:
+            raise RequestError(OUTPUT_NOT_RUNNING, "The record output is not running.")
+        self.state.record_active = False
+        return {"outputPath": self._write_output("")}
+
+    def _toggle_record(self, d: Dict[str, Any]) -> dict:
+        if self.state.record_active:
+            self._stop_record(d)
+        else:
+            self._start_record(d)
+        return {"outputActive": self.state.record_active}
+
+    def _write_output(self, prefix: str) -> str:
+        """Dummy media file named like OBS does; ``""`` without ``options.output_dir``."""
+        if not self.options.output_dir:
+            return ""
+        self.state.outputs_written += 1
+        stamp = time.strftime("%Y-%m-%d %H-%M-%S")
+        path = Path(self.options.output_dir) / f"{prefix}{stamp}-{self.state.outputs_written}.mkv"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"\x1a\x45\xdf\xa3" + bytes([self.state.outputs_written % 251]) * self.options.output_bytes)
+        return str(path)
+
+    def _start_replay_buffer(self, _d: Dict[str, Any]) -> None:
+        if self.state.replay_active:
+            raise RequestError(OUTPUT_RUNNING, "The replay buffer output is already running.")
+        self.state.replay_active = True
+
+    def _stop_replay_buffer(self, _d: Dict[str, Any]) -> None:
+        if not self.state.replay_active:
+            raise RequestError(OUTPUT_NOT_RUNNING, "The replay buffer output is not running.")
+        self.state.replay_active = False
+
+    def _toggle_replay_buffer(self, d: Dict[str, Any]) -> dict:
+        if self.state.replay_active:
+            self._stop_replay_buffer(d)
+        else:
+            self._start_replay_buffer(d)
+        return {"outputActive": self.state.replay_active}
+
+    def _save_replay_buffer(self, _d: Dict[str, Any]) -> None:
+        if not self.state.replay_active:
+            raise RequestError(OUTPUT_NOT_RUNNING, "The replay buffer output is not running.")
+        path = self._write_output("Replay ") or f"Replay {self.state.outputs_written}.mkv"
+
+        def _saved() -> None:
+            self.state.last_replay = path
+
+        # Like OBS: the request is answered first, the saved path shows up a moment later
+        if self._loop is not None:
+            self._loop.call_later(0.05, _saved)
+        else:
+            _saved()
+
+    def _get_last_replay(self, _d: Dict[str, Any]) -> dict:
+        if not self.state.replay_active:
+            raise RequestError(OUTPUT_NOT_RUNNING, "The replay buffer output is not running.")
+        return {"savedReplayPath": self.state.last_replay}
+
+    def _screenshot_png(self, data: Dict[str, Any]) -> bytes:
+        name = str(_require(data, "sourceName"))
+        if name not in self.state.inputs and name not in self.state.scenes:
+            raise RequestError(RESOURCE_NOT_FOUND, f"No source was found by the name of `{name}`.")
+        fmt = str(_require(data, "imageFormat")).lower()
+        if fmt not in {"png", "jpg", "jpeg", "bmp"}:
+            raise RequestError(INVALID_REQUEST_FIELD, "Your specified image format is invalid or not supported.")
+        cap = max(8, int(self.options.max_image_dim))
+        width = int(data.get("imageWidth") or 1920)
+        height = int(data.get("imageHeight") or 1080)
+        if width < 8 or height < 8:
+            raise RequestError(INVALID_REQUEST_FIELD, "The field value of `imageWidth` is below the minimum of `8`")
+        # Content is always PNG; good enough for pipeline timing
+        return make_png(min(width, cap), min(height, cap), sum(map(ord, name)) & 0xFF)
+
+    def _get_source_screenshot(self, data: Dict[str, Any]) -> dict:
+        png = self._screenshot_png(data)
+        return {"imageData": "data:image/png;base64," + base64.b64encode(png).decode("ascii")}
+
+    def _save_source_screenshot(self, data: Dict[str, Any]) -> None:
+        png = self._screenshot_png(data)
+        path = Path(str(_require(data, "imageFilePath")))
+        if not path.parent.is_dir():
+            raise RequestError(REQUEST_PROCESSING_FAILED, "Failed to save screenshot: directory for your file path does not exist.")
+        path.write_bytes(png)
+
+    # ------------------------------------------------------------ protocol
+    async def _delay_for(self, request_type: str) -> None:
+        opts = self.options
+        ms = float(opts.latency_ms) + float(opts.request_latency_ms.get(request_type, 0.0))
+        if opts.jitter_ms:
+            ms += self._rng.uniform(0.0, float(opts.jitter_ms))
+        if ms > 0:
+            await asyncio.sleep(ms / 1000.0)
+
+    async def _execute(self, request_type: str, request_id: Any, data: Dict[str, Any]) -> dict:
+        self.stats[request_type] += 1
+        status: Dict[str, Any] = {"result": True, "code": SUCCESS}
+        response: Any = None
+        await self._delay_for(request_type)
+        try:
+            if not request_type:
+                raise RequestError(MISSING_REQUEST_TYPE, "Your request is missing a `requestType`")
+            if request_type == "Sleep":
+                await asyncio.sleep(float(data.get("sleepMillis", 0)) / 1000.0)
+            else:
+                handler = self._handlers.get(request_type)
+                if handler is None:
+                    raise RequestError(UNKNOWN_REQUEST_TYPE, "Your request type is not valid.")
+                rate = self.options.fail_requests.get(request_type, self.options.fail_rate)
+                if rate and self._rng.random() < rate:
+                    self.failures[request_type] += 1
+                    raise RequestError(REQUEST_PROCESSING_FAILED, "Injected failure (bench.fake_obs)")
+                result = handler(data)
+                if isawaitable(result):
+                    result = await result
+                response = result
+        except RequestError as exc:
+            status = {"result": False, "code": exc.code, "comment": exc.comment}
+        except Exception as exc:  # noqa: BLE001
+            status = {"result": False, "code": REQUEST_PROCESSING_FAILED, "comment": f"{type(exc).__name__}: {exc}"}
+        out: Dict[str, Any] = {"requestType": request_type, "requestId": request_id, "requestStatus": status}
+        if response is not None:
+            out["responseData"] = response
+        return out
+
+    def _maybe_drop(self) -> bool:
+        return bool(self.options.drop_rate) and self._rng.random() < self.options.drop_rate
+
+    async def _identify(self, ws: ServerConnection) -> bool:
+        hello: Dict[str, Any] = {"obsWebSocketVersion": WS_VERSION, "rpcVersion": 1}
+        secret = challenge = ""
+        if self.options.password:
+            salt = base64.b64encode(os.urandom(24)).decode()
+            challenge = base64.b64encode(os.urandom(24)).decode()
+            secret = base64.b64encode(hashlib.sha256((self.options.password + salt).encode()).digest()).decode()
+            hello["authentication"] = {"challenge": challenge, "salt": salt}
+        await ws.send(json.dumps({"op": 0, "d": hello}))
+        msg = json.loads(await ws.recv())
+        if msg.get("op") != 1:
+            await ws.close(4007, "Not identified")
+            return False
+        if self.options.password:
+            expected = base64.b64encode(hashlib.sha256((secret + challenge).encode()).digest()).decode()
+            if (msg.get("d") or {}).get("authentication") != expected:
+                await ws.close(4009, "Authentication failed.")
+                return False
+        await ws.send(json.dumps({"op": 2, "d": {"negotiatedRpcVersion": 1}}))
+        return True
+
+    async def _handle(self, ws: ServerConnection) -> None:
+        self.connections.add(ws)
+        self.total_connections += 1
+        try:
+            if not await self._identify(ws):
+                return
+            async for raw in ws:
+                msg = json.loads(raw)
+                op, d = msg.get("op"), msg.get("d") or {}
+                if self._maybe_drop():
+                    self.failures["<dropped>"] += 1
+                    await ws.close(1011, "Injected drop (bench.fake_obs)")
+                    return
+                if op == 6:
+                    res = await self._execute(d.get("requestType", ""), d.get("requestId"), d.get("requestData") or {})
+                    await ws.send(json.dumps({"op": 7, "d": res}))
+                elif op == 8:
+                    await ws.send(json.dumps({"op": 9, "d": await self._execute_batch(d)}))
+                elif op == 1 or op == 3:
+                    # Reidentify: nothing to negotiate without events
+                    await ws.send(json.dumps({"op": 2, "d": {"negotiatedRpcVersion": 1}}))
+        except ConnectionClosed:
+            pass
+        finally:
+            self.connections.discard(ws)
+
+    async def _execute_batch(self, d: Dict[str, Any]) -> dict:
+        halt = bool(d.get("haltOnFailure", False))
+        # executionType: 0 SerialRealtime, 1 SerialFrame, 2 Parallel
+        parallel = int(d.get("executionType", 0)) == 2
+        reqs = [r for r in d.get("requests") or [] if isinstance(r, dict)]
+        self.stats["<batch>"] += 1
+
+        def call(r: Dict[str, Any]) -> Awaitable[dict]:
+            return self._execute(r.get("requestType", ""), r.get("requestId"), r.get("requestData") or {})
+
+        results: list[dict] = []
+        if parallel:
+            results = list(await asyncio.gather(*(call(r) for r in reqs)))
+        else:
+            for r in reqs:
+                res = await call(r)
+                results.append(res)
+                if halt and not res["requestStatus"]["result"]:
+                    break
+        return {"requestId": d.get("requestId"), "results": results}
+
+    # ------------------------------------------------------------ lifecycle
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._server = await serve(self._handle, self.host, self.port, max_size=None, compression=None)
+        self.port = self._server.sockets[0].getsockname()[1]
+        _log.info("fake OBS listening on ws://%s:%s", self.host, self.port)
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def start_in_thread(self) -> "FakeOBSServer":
+        """Run on a private event loop in a daemon thread; returns once listening."""
+
+        def _run() -> None:
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self.start())
+            self._ready.set()
+            try:
+                loop.run_forever()
+            finally:
+                loop.run_until_complete(self.close())
+                loop.close()
+
+        self._thread = threading.Thread(target=_run, name="fake-obs", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(10.0):
+            raise RuntimeError("fake OBS server did not start")
+        return self
+
+    def stop_thread(self) -> None:
+        loop = self._loop
+        if loop is not None and loop.is_running():
+            loop.call_soon_threadsafe(loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+        self._thread = None
+
+    def kick_clients(self) -> int:
+        """Abort every client connection (simulates OBS crashing/restarting); thread-safe."""
+        loop = self._loop
+        conns = list(self.connections)
+        if loop is None or not conns:
+            return 0
+
+        def _abort() -> None:
+            for c in conns:
+                c.transport.abort()
+
+        loop.call_soon_threadsafe(_abort)
+        return len(conns)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "requests": dict(self.stats),
+            "failures": dict(self.failures),
+            "connections": len(self.connections),
+            "total_connections": self.total_connections,
+            "current_scene": self.state.current_scene,
+            "stream_active": self.state.stream_active,
+        }
+
+
+def isawaitable(obj: Any) -> bool:
+    return asyncio.iscoroutine(obj) or isinstance(obj, asyncio.Future)
+
+
+def main(argv: list[str] | None = None) -> None:
+    p = argparse.ArgumentParser(description="Fake OBS WebSocket v5 server")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=4455)
+    p.add_argument("--password", default="")
+    p.add_argument("--latency-ms", type=float, default=0.0)
+    p.add_argument("--jitter-ms", type=float, default=0.0)
+    p.add_argument("--fail-rate", type=float, default=0.0)
+    p.add_argument("--drop-rate", type=float, default=0.0)
+    p.add_argument(
+        "--request-latency",
+        action="append",
+        default=[],
+        metavar="TYPE=MS",
+        help="extra latency per request type, e.g. SaveSourceScreenshot=40",
+    )
+    p.add_argument("--seed", type=int, default=None)
+    args = p.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    per_type = {}
+    for item in args.request_latency:
+        k, _, v = item.partition("=")
+        per_type[k.strip()] = float(v)
+    server = FakeOBSServer(
+        FakeOBSOptions(
+            password=args.password,
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            fail_rate=args.fail_rate,
+            drop_rate=args.drop_rate,
+            request_latency_ms=per_type,
+            seed=args.seed,
+        ),
+        host=args.host,
+        port=args.port,
+    )
+
+    async def _serve() -> None:
+        await server.start()
+        await asyncio.Future()
+
+    try:
+        asyncio.run(_serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Shared setup for benchmarks: isolated app environment, fake OBS and stats helpers."""
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from bench.fake_obs import FakeOBSOptions, FakeOBSServer
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def percentile(sorted_values: list[float], p: float) -> Optional[float]:
+    """Linear-interpolated percentile of an ascending list (``p`` in 0..100)."""
+    if not sorted_values:
+        return None
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    k = (len(sorted_values) - 1) * (p / 100.0)
+    lo = math.floor(k)
+    hi = math.ceil(k)
+    if lo == hi:
+        return sorted_values[int(k)]
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarize(samples: Iterable[float], *, errors: int = 0, wall_seconds: Optional[float] = None, **extra: Any) -> Dict[str, Any]:
+    """Latency summary in milliseconds for samples given in seconds."""
+    ms = sorted(s * 1000.0 for s in samples)
+    total = len(ms) + int(errors)
+
+    def r(v: Optional[float]) -> Optional[float]:
+        return None if v is None else round(v, 3)
+
+    out: Dict[str, Any] = {
+        "n": len(ms),
+        "errors": int(errors),
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "mean_ms": r(sum(ms) / len(ms)) if ms else None,
+        "p50_ms": r(percentile(ms, 50)),
+        "p95_ms": r(percentile(ms, 95)),
+        "p99_ms": r(percentile(ms, 99)),
+        "max_ms": r(ms[-1]) if ms else None,
+    }
+    if wall_seconds:
+        out["wall_s"] = round(wall_seconds, 3)
+        out["throughput_per_s"] = round(len(ms) / wall_seconds, 2)
+    out.update(extra)
+    return out
+
+
+def run_meta(extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    try:
+        rev = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, timeout=5
+        ).stdout.strip()
+    except Exception:
+        rev = ""
+    meta: Dict[str, Any] = {
+        "git_rev": rev or None,
+        "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+    meta.update(extra or {})
+    return meta
+
+
+@dataclass
+class BenchEnv:
+    """Temp working directory + env vars + fake OBS, set up before ``app`` is imported.
+
+    The app reads ``config/*.json`` relative to the CWD and its settings from the
+    environment, so the process changes into a scratch directory; the repo's own
+    ``config/`` is never touched. Startup hooks are not run (no OBS launch,
+    bootstrap, Kibana import or hotkey hooks); suites start what they need.
+    """
+
+    obs_options: FakeOBSOptions = field(default_factory=FakeOBSOptions)
+    diag_token: str = "bench"
+    workdir: Optional[Path] = None
+    fake: Optional[FakeOBSServer] = None
+    _tmp: Optional[tempfile.TemporaryDirectory] = None
+    _old_cwd: Optional[str] = None
+
+    def __enter__(self) -> "BenchEnv":
+        if "app" in sys.modules or any(m.startswith("app.") for m in sys.modules):
+            raise RuntimeError("BenchEnv must be entered before importing the app package")
+        if str(REPO_ROOT) not in sys.path:
+            sys.path.insert(0, str(REPO_ROOT))
+        self.fake = FakeOBSServer(self.obs_options).start_in_thread()
+        self._tmp = tempfile.TemporaryDirectory(prefix="obs-bench-")
+        self.workdir = Path(self._tmp.name)
+        (self.workdir / "config").mkdir()
+        (self.workdir / "screenshots").mkdir()
+        (self.workdir / "config" / "obs_ws.json").write_text(
+            json.dumps({"host": self.fake.host, "port": self.fake.port, "password": self.obs_options.password}),
+            encoding="utf-8",
+        )
+        os.environ.update(
+            {
+                "OBS_HOST": self.fake.host,
+                "OBS_PORT": str(self.fake.port),
+                "OBS_PASSWORD": self.obs_options.password,
+                "OBS_AUTOSTART": "false",
+                "OBS_GUARDIAN_ENABLED": "false",
+                "AUTO_BOOTSTRAP": "false",
+                "ELK_AUTO_IMPORT": "false",
+                "CONFIG_WATCH_ENABLED": "false",
+                "HOTKEYS_BACKEND": "simulated",
+                "SCREENSHOT_DIR": str(self.workdir / "screenshots"),
+                "DIAG_TOKEN": self.diag_token,
+                "LOG_LEVEL": os.environ.get("BENCH_LOG_LEVEL", "warning"),
+                "LOG_JSON": "false",
+                "LOG_FILE_ENABLED": "false",
+            }
+        )
+        self._old_cwd = os.getcwd()
+        os.chdir(self.workdir)
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if self.fake is not None:
+            self.fake.stop_thread()
+        if self._old_cwd:
+            os.chdir(self._old_cwd)
+        if self._tmp is not None:
+            self._tmp.cleanup()
+
+    def app(self):
+        from app.presentation.app_factory import app  # imported late on purpose
+
+        # obsws_python logs every failed request with a traceback at ERROR
+        logging.getLogger("obsws_python").setLevel(logging.CRITICAL)
+        return app
+
+
+def wait_until(predicate, timeout: float, interval: float = 0.01) -> bool:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if predicate():
+            return True
+        time.sleep(interval)
+    return bool(predicate())
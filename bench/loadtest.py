@@ -0,0 +1,282 @@
+"""Concurrent HTTP load test for the control API, locust-style.
+
+Virtual users are spawned at ``--spawn-rate`` up to ``--users``. Each user picks
+a profile by weight (Stream Deck bridge, dashboard), then loops: pick a task
+by weight, send it, wait a random think time. Requests go through httpx's ASGI
+transport into the real app factory, and OBS is the fake server from
+``bench.fake_obs``. The report has p50/p95/p99, error rate and req/s per task,
+and ``--thresholds`` turns it into a regression gate.
+
+    python -m bench.loadtest --users 20 --duration 30
+    python -m bench.loadtest --thresholds bench/thresholds.json --out load.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from bench.fake_obs import FakeOBSOptions
+from bench.harness import BenchEnv, run_meta, summarize
+
+SCENES = ["LiveFront", "LiveSide", "LiveRear", "LiveThreeWay", "Home", "YouTube"]
+
+
+@dataclass(frozen=True)
+class Task:
+    name: str
+    method: str
+    path: str
+    weight: int = 1
+
+
+@dataclass(frozen=True)
+class UserProfile:
+    name: str
+    weight: int
+    wait_min: float
+    wait_max: float
+    tasks: tuple[Task, ...]
+
+
+PROFILES: tuple[UserProfile, ...] = (
+    # Stream Deck bridge: mostly scene switches, some screenshots
+    UserProfile(
+        "streamdeck",
+        weight=1,
+        wait_min=0.2,
+        wait_max=1.0,
+        tasks=(
+            Task("POST /api/obs/scene/{scene}", "POST", "/api/obs/scene/{scene}", 8),
+            Task("POST /api/obs/screenshot/front", "POST", "/api/obs/screenshot/front", 1),
+            Task("POST /api/obs/screenshot/side", "POST", "/api/obs/screenshot/side", 1),
+            Task("POST /api/obs/screenshot/rear/after", "POST", "/api/obs/screenshot/rear/after", 1),
+        ),
+    ),
+    # Dashboards polling status
+    UserProfile(
+        "dashboard",
+        weight=3,
+        wait_min=0.5,
+        wait_max=2.0,
+        tasks=(
+            Task("GET /api/diagnostics", "GET", "/api/diagnostics", 3),
+            Task("GET /api/obs/scenes", "GET", "/api/obs/scenes", 3),
+            Task("GET /api/obs/version", "GET", "/api/obs/version", 1),
+            Task("GET /api/health", "GET", "/api/health", 2),
+            Task("GET /api/hotkeys", "GET", "/api/hotkeys", 1),
+            Task("GET /metrics", "GET", "/metrics", 1),
+        ),
+    ),
+)
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.samples: Dict[str, list[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.error_kinds: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def ok(self, name: str, seconds: float) -> None:
+        self.samples[name].append(seconds)
+
+    def fail(self, name: str, kind: str) -> None:
+        self.errors[name] += 1
+        self.error_kinds[name][kind] += 1
+
+    def report(self, wall: float) -> Dict[str, Any]:
+        names = sorted(set(self.samples) | set(self.errors))
+        out: Dict[str, Any] = {}
+        for name in names:
+            out[name] = summarize(
+                self.samples.get(name, []),
+                errors=self.errors.get(name, 0),
+                wall_seconds=wall,
+                error_kinds=dict(self.error_kinds.get(name, {})),
+            )
+        everything = [s for v in self.samples.values() for s in v]
+        out["TOTAL"] = summarize(everything, errors=sum(self.errors.values()), wall_seconds=wall)
+        return out
+
+
+async def _user(
+    uid: int,
+    client: Any,
+    profile: UserProfile,
+    rec: Recorder,
+    stop_at: float,
+    wait_scale: float,
+    headers: Dict[str, str],
+    rng: random.Random,
+) -> None:
+    weights = [t.weight for t in profile.tasks]
+    while time.perf_counter() < stop_at:
+        task = rng.choices(profile.tasks, weights=weights)[0]
+        path = task.path.format(scene=rng.choice(SCENES))
+        t0 = time.perf_counter()
+        try:
+            resp = await client.request(task.method, path, headers=headers)
+            if resp.status_code < 400:
+                rec.ok(task.name, time.perf_counter() - t0)
+            else:
+                rec.fail(task.name, f"http_{resp.status_code}")
+        except Exception as exc:  # noqa: BLE001
+            rec.fail(task.name, type(exc).__name__)
+        if wait_scale > 0:
+            await asyncio.sleep(rng.uniform(profile.wait_min, profile.wait_max) * wait_scale)
+
+
+async def run_load(
+    env: BenchEnv,
+    *,
+    users: int,
+    spawn_rate: float,
+    duration: float,
+    wait_scale: float,
+    profiles: tuple[UserProfile, ...],
+    seed: int,
+) -> Dict[str, Any]:
+    import httpx
+
+    app = env.app()
+    rec = Recorder()
+    rng = random.Random(seed)
+    headers = {"x-diag-token": env.diag_token}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=30.0) as client:
+        # One warm-up round so the first OBS connect is not billed to a random task
+        await client.get("/api/obs/version")
+        t_start = time.perf_counter()
+        stop_at = t_start + duration
+        tasks: list[asyncio.Task] = []
+        for uid in range(users):
+            profile = rng.choices(profiles, weights=[p.weight for p in profiles])[0]
+            user_rng = random.Random(rng.random())
+            tasks.append(asyncio.create_task(_user(uid, client, profile, rec, stop_at, wait_scale, headers, user_rng)))
+            if spawn_rate > 0 and uid + 1 < users:
+                await asyncio.sleep(1.0 / spawn_rate)
+        await asyncio.gather(*tasks)
+        wall = time.perf_counter() - t_start
+    return rec.report(wall)
+
+
+def check_thresholds(report: Dict[str, Any], thresholds: Dict[str, Any]) -> list[str]:
+    """Return violations. A threshold file maps task names (or ``TOTAL``) to limits
+    such as ``p95_ms``/``p99_ms``/``error_rate`` (maximums) or
+    ``min_throughput_per_s``; ``defaults`` applies to every task."""
+    violations: list[str] = []
+    defaults = thresholds.get("defaults", {})
+    limits_by_task = thresholds.get("tasks", {})
+    for name, stats in report.items():
+        limits = {**defaults, **limits_by_task.get(name, {})}
+        for key, limit in limits.items():
+            if key.startswith("min_"):
+                value = stats.get(key[4:])
+                if value is not None and value < limit:
+                    violations.append(f"{name}: {key[4:]}={value} < {limit}")
+            else:
+                value = stats.get(key)
+                if value is not None and value > limit:
+                    violations.append(f"{name}: {key}={value} > {limit}")
+    for name in limits_by_task:
+        if name not in report:
+            violations.append(f"{name}: no samples")
+    return violations
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    print(f"{'task':42} {'n':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'req/s':>8} {'err%':>7}", file=sys.stderr)
+    for name, r in report.items():
+
+        def f(v: Optional[float]) -> str:
+            return "-" if v is None else f"{v:.1f}"
+
+        print(
+            f"{name[:42]:42} {r['n']:>7} {f(r['p50_ms']):>8} {f(r['p95_ms']):>8} {f(r['p99_ms']):>8} "
+            f"{f(r.get('throughput_per_s')):>8} {r['error_rate'] * 100:>6.2f}%",
+            file=sys.stderr,
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(description="HTTP load test against the app with a fake OBS")
+    p.add_argument("--users", type=int, default=20)
+    p.add_argument("--spawn-rate", type=float, default=10.0, help="users started per second")
+    p.add_argument("--duration", type=float, default=20.0, help="seconds after the first user starts")
+    p.add_argument("--wait-scale", type=float, default=1.0, help="think-time multiplier; 0 = no think time")
+    p.add_argument("--profile", default="all", help="all or one of: " + ",".join(pr.name for pr in PROFILES))
+    p.add_argument("--obs-latency-ms", type=float, default=1.0)
+    p.add_argument("--obs-jitter-ms", type=float, default=1.0)
+    p.add_argument("--obs-fail-rate", type=float, default=0.0)
+    p.add_argument("--screenshot-latency-ms", type=float, default=15.0)
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--thresholds", type=Path, default=None, help="JSON limits; exit 1 on violation")
+    p.add_argument("--out", type=Path, default=None)
+    args = p.parse_args(argv)
+
+    profiles = PROFILES if args.profile == "all" else tuple(pr for pr in PROFILES if pr.name == args.profile)
+    if not profiles:
+        p.error(f"unknown profile: {args.profile}")
+
+    options = FakeOBSOptions(
+        latency_ms=args.obs_latency_ms,
+        jitter_ms=args.obs_jitter_ms,
+        fail_rate=args.obs_fail_rate,
+        request_latency_ms={"SaveSourceScreenshot": args.screenshot_latency_ms},
+        seed=args.seed,
+    )
+    with BenchEnv(obs_options=options) as env:
+        env.app()
+        report = asyncio.run(
+            run_load(
+                env,
+                users=args.users,
+                spawn_rate=args.spawn_rate,
+                duration=args.duration,
+                wait_scale=args.wait_scale,
+                profiles=profiles,
+                seed=args.seed,
+            )
+        )
+        fake_stats = env.fake.snapshot()
+
+    _print_report(report)
+    doc = {
+        "meta": run_meta(
+            {
+                "users": args.users,
+                "spawn_rate": args.spawn_rate,
+                "duration_s": args.duration,
+                "wait_scale": args.wait_scale,
+                "profiles": [pr.name for pr in profiles],
+                "obs_latency_ms": args.obs_latency_ms,
+                "obs_fail_rate": args.obs_fail_rate,
+            }
+        ),
+        "results": report,
+        "fake_obs": fake_stats,
+    }
+    text = json.dumps(doc, indent=2, ensure_ascii=False)
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(text + "\n", encoding="utf-8")
+
+    if args.thresholds:
+        violations = check_thresholds(report, json.loads(args.thresholds.read_text(encoding="utf-8")))
+        for v in violations:
+            print(f"THRESHOLD {v}", file=sys.stderr)
+        if violations:
+            return 1
+        print("[loadtest] all thresholds met", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""Payload size and serialization cost of the heaviest JSON endpoints.
+
+For each endpoint the response document is captured once, then encoded with
+FastAPI's default path (``jsonable_encoder`` + ``json.dumps``) and with orjson,
+and compressed with gzip. The routes are also timed end to end with
+``API_ORJSON`` off and on, with and without ``Accept-Encoding: gzip``.
+
+    python -m bench.payloads --iterations 200 --out payloads.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from bench.harness import BenchEnv, run_meta, summarize
+
+ENDPOINTS = [
+    "/api/logs?limit=1000",
+    "/api/diagnostics/threads?max_frames=40",
+    "/api/diagnostics/processes?limit=200",
+    "/api/cams/devices",
+]
+
+
+def _time(fn: Callable[[], Any], iterations: int) -> Dict[str, Any]:
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return summarize(samples)
+
+
+def _fill_log_buffer(n: int) -> None:
+    log = logging.getLogger("bench.payloads")
+    # Only the diagnostics ring buffer should see these, not the console/file handlers
+    muted = [h for h in logging.getLogger().handlers if type(h).__name__ != "_RingBufferHandler"]
+    levels = [h.level for h in muted]
+    for h in muted:
+        h.setLevel(logging.CRITICAL + 1)
+    try:
+        for i in range(n):
+            log.warning("synthetic record %d for payload bench: scene=LiveFront source=cam_front took=%.3fms", i, i * 0.137)
+    finally:
+        for h, level in zip(muted, levels):
+            h.setLevel(level)
+
+
+async def run(env: BenchEnv, iterations: int) -> Dict[str, Any]:
+    import httpx
+    from fastapi.encoders import jsonable_encoder
+
+    from app.config import settings
+    from app.presentation.responses import orjson, orjson_available
+
+    app = env.app()
+    headers = {"x-diag-token": env.diag_token}
+    results: Dict[str, Any] = {"orjson_installed": orjson_available(), "endpoints": {}}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://payloads", timeout=60.0) as client:
+        await client.get("/api/logs?limit=1", headers=headers)  # installs the ring handler
+        _fill_log_buffer(1200)
+        for path in ENDPOINTS:
+            resp = await client.get(path, headers={**headers, "accept-encoding": "identity"})
+            if resp.status_code != 200:
+                results["endpoints"][path] = {"error": f"http_{resp.status_code}"}
+                continue
+            doc = resp.json()
+            raw = json.dumps(jsonable_encoder(doc), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            row: Dict[str, Any] = {
+                "bytes": len(raw),
+                "gzip_bytes": len(gzip.compress(raw, compresslevel=6)),
+                "encode_default": _time(
+                    lambda: json.dumps(jsonable_encoder(doc), ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+                    iterations,
+                ),
+                "gzip_level6": _time(lambda: gzip.compress(raw, compresslevel=6), iterations),
+            }
+            if orjson is not None:
+                row["encode_orjson"] = _time(lambda: orjson.dumps(doc), iterations)
+            # End to end through the app
+            for orjson_on in ([False, True] if orjson is not None else [False]):
+                settings.api_orjson = orjson_on
+                for enc in ("identity", "gzip"):
+                    samples = []
+                    size = 0
+                    for _ in range(max(1, iterations // 4)):
+                        t0 = time.perf_counter()
+                        r = await client.get(path, headers={**headers, "accept-encoding": enc})
+                        samples.append(time.perf_counter() - t0)
+                        size = int(r.headers.get("content-length") or len(r.content))
+                    key = f"route_{'orjson' if orjson_on else 'default'}_{enc}"
+                    row[key] = summarize(samples, wire_bytes=size)
+            settings.api_orjson = False
+            results["endpoints"][path] = row
+    return results
+
+
+def _print(results: Dict[str, Any]) -> None:
+    print(f"{'endpoint':40} {'bytes':>9} {'gzip':>8} {'enc p50':>9} {'orjson':>9} {'route':>9} {'route+oj':>9}", file=sys.stderr)
+    for path, r in results["endpoints"].items():
+        if "error" in r:
+            print(f"{path:40} {r['error']}", file=sys.stderr)
+            continue
+
+        def p50(key: str) -> str:
+            v = (r.get(key) or {}).get("p50_ms")
+            return "-" if v is None else f"{v:.2f}"
+
+        print(
+            f"{path[:40]:40} {r['bytes']:>9} {r['gzip_bytes']:>8} {p50('encode_default'):>9} {p50('encode_orjson'):>9} "
+            f"{p50('route_default_gzip'):>9} {p50('route_orjson_gzip'):>9}",
+            file=sys.stderr,
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(description="JSON payload size/serialization benchmark")
+    p.add_argument("--iterations", type=int, default=200)
+    p.add_argument("--out", type=Path, default=None)
+    args = p.parse_args(argv)
+
+    with BenchEnv() as env:
+        results = asyncio.run(run(env, max(4, args.iterations)))
+    _print(results)
+    doc = {"meta": run_meta({"iterations": args.iterations}), "results": results}
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(doc, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
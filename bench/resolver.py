@@ -0,0 +1,204 @@
+"""Device label resolution: previous multi-pass resolver vs. the precompiled index.
+
+The legacy functions below reproduce the resolver before the index existed
+(regex tokens + normalization of every device name on each call, then linear
+token/exact/contains passes, once over the local list and once over the OBS
+list). Both run against synthetic DirectShow device tables of several sizes.
+
+    python -m bench.resolver --sizes 4,32,256 --out resolver.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from bench.harness import REPO_ROOT, run_meta, summarize
+
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from app.infrastructure.devices.registry import VideoDevice  # noqa: E402
+from app.infrastructure.devices.resolver import DeviceIndex  # noqa: E402
+
+
+def _legacy_tokens(user_label: str) -> list[str]:
+    tokens: list[str] = []
+    for m in re.finditer(r"\(([0-9a-fA-F]{3,8})\)", str(user_label)):
+        tok = m.group(1).lower()
+        tokens.append(tok)
+        if re.fullmatch(r"[0-9]{3,8}", tok):
+            hx = f"{int(tok, 10):04x}"
+            if hx not in tokens:
+                tokens.append(hx)
+    return tokens
+
+
+def _legacy_normalize(s: str) -> str:
+    base = re.sub(r"\s*\([^)]*\)\s*$", "", s or "")
+    return re.sub(r"\s+", " ", base).strip().lower()
+
+
+def legacy_local(user_label: str, det: list[dict]) -> Optional[str]:
+    tokens = _legacy_tokens(user_label)
+    if tokens:
+        for d in det:
+            path = str(d.get("path") or "").lower()
+            if path and any(tok in path for tok in tokens):
+                return str(d.get("path"))
+    uv = _legacy_normalize(str(user_label))
+    for d in det:
+        nm = str(d.get("name") or "")
+        if nm and _legacy_normalize(nm) == uv:
+            return str(d.get("path"))
+    for d in det:
+        nm = str(d.get("name") or "")
+        if not nm:
+            continue
+        nn = _legacy_normalize(nm)
+        if uv and (uv in nn or nn in uv):
+            return str(d.get("path"))
+    return None
+
+
+def legacy_resolve(user_value: str, det: list[dict]) -> str:
+    local = legacy_local(user_value, det)
+    if local:
+        return local
+    items = [{"name": d["name"], "value": d["path"]} for d in det]
+    for it in items:
+        if str(it.get("value")) == str(user_value):
+            return str(user_value)
+    tokens = _legacy_tokens(user_value)
+    if tokens:
+        for it in items:
+            v = str(it.get("value") or "").lower()
+            if any(tok in v for tok in tokens):
+                return str(it.get("value"))
+    uv_norm = _legacy_normalize(str(user_value))
+    for it in items:
+        name = str(it.get("name") or "")
+        if name and _legacy_normalize(name) == uv_norm:
+            return str(it.get("value"))
+    for it in items:
+        name = str(it.get("name") or "")
+        if not name:
+            continue
+        n_norm = _legacy_normalize(name)
+        if uv_norm and (uv_norm in n_norm or n_norm in uv_norm):
+            return str(it.get("value"))
+    return user_value
+
+
+_MODELS = ["HD Pro Webcam C920", "Logitech BRIO", "USB Video Device", "Integrated Camera", "OBS Virtual Camera", "Cam Link 4K", "FaceTime HD", "Razer Kiyo"]
+
+
+def make_devices(n: int, rng: random.Random) -> list[dict]:
+    det = []
+    for i in range(n):
+        vid, pid = rng.randrange(0x1000, 0xFFFF), rng.randrange(0x1000, 0xFFFF)
+        name = f"{_MODELS[i % len(_MODELS)]}" + (f" #{i // len(_MODELS)}" if i >= len(_MODELS) else "")
+        path = (
+            f"@device:pnp:\\\\?\\usb#vid_{vid:04x}&pid_{pid:04x}&mi_00#{rng.randrange(1, 9)}&{rng.randrange(1 << 28):07x}&0&0000"
+            "#{65e8773d-8f56-11d0-a3b9-00a0c9223196}\\global"
+        )
+        det.append({"name": name, "path": path, "vid": f"{vid:04x}", "pid": f"{pid:04x}"})
+    return det
+
+
+def make_labels(det: list[dict], rng: random.Random, count: int) -> list[str]:
+    labels = []
+    for _ in range(count):
+        d = rng.choice(det)
+        kind = rng.randrange(5)
+        if kind == 0:
+            labels.append(f"{d['name']} ({d['pid']})")  # browser-style id suffix
+        elif kind == 1:
+            labels.append(d["name"])
+        elif kind == 2:
+            labels.append(d["name"].upper() + "  ")
+        elif kind == 3:
+            labels.append(d["path"])
+        else:
+            labels.append("Unknown Capture Device")
+    return labels
+
+
+def _time_calls(fn, labels: list[str], rounds: int) -> Dict[str, Any]:
+    samples = []
+    for _ in range(rounds):
+        for lbl in labels:
+            t0 = time.perf_counter()
+            fn(lbl)
+            samples.append(time.perf_counter() - t0)
+    out = summarize(samples)
+    out["us_per_call"] = round(sum(samples) / len(samples) * 1e6, 2) if samples else None
+    return out
+
+
+def run(sizes: list[int], labels_per_size: int, rounds: int, seed: int) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    results: Dict[str, Any] = {}
+    for n in sizes:
+        det = make_devices(n, rng)
+        labels = make_labels(det, rng, labels_per_size)
+        devices = [VideoDevice.make(d["name"], d["path"], "bench") for d in det]
+
+        t0 = time.perf_counter()
+        idx = DeviceIndex.build(devices)
+        build_ms = (time.perf_counter() - t0) * 1000.0
+
+        def indexed(lbl: str, idx: DeviceIndex = idx) -> str:
+            res = idx._resolve(lbl)  # bypass the memo: per-call lookup cost
+            return res.device.path if res is not None else lbl
+
+        def memoized(lbl: str, idx: DeviceIndex = idx) -> str:
+            res = idx.resolve(lbl)
+            return res.device.path if res is not None else lbl
+
+        disagree = sum(1 for lbl in labels if legacy_resolve(lbl, det) != indexed(lbl))
+        results[str(n)] = {
+            "devices": n,
+            "labels": len(labels),
+            "index_build_ms": round(build_ms, 3),
+            "legacy": _time_calls(lambda lbl: legacy_resolve(lbl, det), labels, rounds),
+            "index": _time_calls(indexed, labels, rounds),
+            "index_memo": _time_calls(memoized, labels, rounds),
+            "disagreements": disagree,
+        }
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(description="Device label resolver benchmark")
+    p.add_argument("--sizes", default="4,32,256")
+    p.add_argument("--labels", type=int, default=200)
+    p.add_argument("--rounds", type=int, default=5)
+    p.add_argument("--seed", type=int, default=7)
+    p.add_argument("--out", type=Path, default=None)
+    args = p.parse_args(argv)
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    results = run(sizes, args.labels, args.rounds, args.seed)
+
+    print(f"{'devices':>8} {'build ms':>9} {'legacy us':>10} {'index us':>9} {'memo us':>8} {'speedup':>8} {'diff':>5}", file=sys.stderr)
+    for r in results.values():
+        legacy, index = r["legacy"]["us_per_call"], r["index"]["us_per_call"]
+        print(
+            f"{r['devices']:>8} {r['index_build_ms']:>9.3f} {legacy:>10.2f} {index:>9.2f} {r['index_memo']['us_per_call']:>8.2f} "
+            f"{legacy / index if index else 0:>7.1f}x {r['disagreements']:>5}",
+            file=sys.stderr,
+        )
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        doc = {"meta": run_meta(vars(args) | {"out": str(args.out)}), "results": results}
+        args.out.write_text(json.dumps(doc, indent=2) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,324 @@
+"""End-to-end benchmarks against the fake OBS server.
+
+Suites:
+  api         sequential latency of the main HTTP routes (in-process ASGI, no network)
+  hotkeys     simulated key presses -> policies -> actions -> OBS; throughput and press-to-action latency
+  reconnect   cold connect and recovery time after OBS drops the connection
+  screenshot  save_source_screenshot throughput at several concurrency levels
+
+    python -m bench.run --out results.json
+    python -m bench.run --suite api,screenshot --obs-latency-ms 2 --compare baseline.json --max-regression 25
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from bench.fake_obs import FakeOBSOptions
+from bench.harness import BenchEnv, run_meta, summarize, wait_until
+
+SUITES = ("api", "hotkeys", "reconnect", "screenshot")
+
+API_ENDPOINTS: list[tuple[str, str]] = [
+    ("GET", "/api/health"),
+    ("GET", "/api/obs/version"),
+    ("GET", "/api/obs/scenes"),
+    ("POST", "/api/obs/scene/LiveFront"),
+    ("GET", "/api/hotkeys"),
+    ("GET", "/api/diagnostics"),
+    ("POST", "/api/obs/screenshot/front"),
+    ("GET", "/overlay/"),
+    ("GET", "/metrics"),
+]
+
+
+async def bench_api(env: BenchEnv, iterations: int) -> Dict[str, Any]:
+    import httpx
+
+    app = env.app()
+    headers = {"x-diag-token": env.diag_token}
+    results: Dict[str, Any] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30.0) as client:
+        for method, path in API_ENDPOINTS:
+            for _ in range(max(1, iterations // 10)):  # warm-up: connect, caches, imports
+                await client.request(method, path, headers=headers)
+            samples: list[float] = []
+            errors = 0
+            t_start = time.perf_counter()
+            for _ in range(iterations):
+                t0 = time.perf_counter()
+                try:
+                    resp = await client.request(method, path, headers=headers)
+                    ok = resp.status_code < 400
+                except Exception:
+                    ok = False
+                if ok:
+                    samples.append(time.perf_counter() - t0)
+                else:
+                    errors += 1
+            results[f"api.{method} {path}"] = summarize(samples, errors=errors, wall_seconds=time.perf_counter() - t_start)
+    return results
+
+
+def _run_presses(env: BenchEnv, combos: list[str], presses: int, rate: float, settle: float) -> Dict[str, Any]:
+    from app.hotkeys import hotkeys
+    from app.infrastructure.hotkeys.backends import SimulatedBackend
+
+    sim = SimulatedBackend()
+    hotkeys.use_backend(sim)
+    done: list[float] = []
+    lock = threading.Lock()
+
+    def on_done(_action, elapsed: float) -> None:
+        with lock:
+            done.append(elapsed)
+
+    remove = hotkeys.add_action_listener(on_done)
+    before = hotkeys.press_stats()["suppressed"]
+    hotkeys.start()
+    try:
+        wait_until(lambda: bool(hotkeys._registered), timeout=5.0)
+        interval = 1.0 / max(0.1, rate)
+        script = [(i * interval, combos[i % len(combos)]) for i in range(presses)]
+        t0 = time.perf_counter()
+        lateness = sim.replay(script)
+        # Wait for in-flight actions to drain
+        wait_until(lambda: not hotkeys.press_stats()["in_flight"], timeout=settle)
+        wall = time.perf_counter() - t0
+    finally:
+        remove()
+        hotkeys.stop()
+    after = hotkeys.press_stats()["suppressed"]
+    suppressed = {
+        kind: {r: n - before.get(kind, {}).get(r, 0) for r, n in reasons.items()} for kind, reasons in after.items()
+    }
+    return summarize(
+        done,
+        wall_seconds=wall,
+        presses=presses,
+        press_rate_per_s=rate,
+        replay_max_lateness_ms=round(lateness * 1000.0, 3),
+        suppressed=suppressed,
+    )
+
+
+async def bench_hotkeys(env: BenchEnv, presses: int, rate: float) -> Dict[str, Any]:
+    scenes = ["ctrl+1", "ctrl+2", "ctrl+3", "ctrl+4", "alt+1", "alt+2", "alt+3"]
+    shots = ["f5", "f6", "f7", "shift+f5", "shift+f6", "shift+f7"]
+    return {
+        "hotkeys.scene_burst": await asyncio.to_thread(_run_presses, env, scenes, presses, rate, 10.0),
+        # Each screenshot combo is pressed slower than its 300 ms debounce
+        "hotkeys.screenshot_rotation": await asyncio.to_thread(
+            _run_presses, env, shots, max(12, presses // 4), min(rate, 12.0), 30.0
+        ),
+    }
+
+
+async def bench_reconnect(env: BenchEnv, rounds: int) -> Dict[str, Any]:
+    from app.obs_client import obs_manager
+
+    cold: list[float] = []
+    recover: list[float] = []
+    errors = 0
+    await obs_manager.get_version()
+    for _ in range(rounds):
+        await obs_manager.disconnect()
+        t0 = time.perf_counter()
+        await obs_manager.connect()
+        cold.append(time.perf_counter() - t0)
+    for _ in range(rounds):
+        await obs_manager.get_version()
+        env.fake.kick_clients()
+        await asyncio.sleep(0.02)  # let the abort reach the client socket
+        t0 = time.perf_counter()
+        try:
+            await obs_manager.get_version()
+            recover.append(time.perf_counter() - t0)
+        except Exception:
+            errors += 1
+    return {
+        "reconnect.cold_connect": summarize(cold),
+        "reconnect.after_drop": summarize(recover, errors=errors),
+    }
+
+
+async def bench_screenshot(env: BenchEnv, count: int, concurrency_levels: list[int]) -> Dict[str, Any]:
+    from app.obs_client import obs_manager
+
+    out_dir = env.workdir / "screenshots" / "bench"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    results: Dict[str, Any] = {}
+    await obs_manager.get_version()
+    for conc in concurrency_levels:
+        sem = asyncio.Semaphore(conc)
+        samples: list[float] = []
+        errors = 0
+
+        async def one(i: int) -> None:
+            nonlocal errors
+            async with sem:
+                t0 = time.perf_counter()
+                try:
+                    await obs_manager.save_source_screenshot(
+                        source_name=("cam_front", "cam_side", "cam_rear")[i % 3],
+                        image_file_path=str(out_dir / f"c{conc}_{i}.png"),
+                        image_format="png",
+                        image_width=1080,
+                        image_height=1920,
+                    )
+                    samples.append(time.perf_counter() - t0)
+                except Exception:
+                    errors += 1
+
+        t_start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(count)))
+        results[f"screenshot.c{conc}"] = summarize(samples, errors=errors, wall_seconds=time.perf_counter() - t_start)
+    return results
+
+
+# Lower is better for these keys, higher for throughput
+_LATENCY_KEYS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], max_regression_pct: float, floor_ms: float = 0.5) -> tuple[list[str], int]:
+    """Diff two result files; returns printable lines and the number of regressions."""
+    lines: list[str] = []
+    regressions = 0
+    cur = current.get("results", {})
+    base = baseline.get("results", {})
+    for name in sorted(set(cur) & set(base)):
+        c, b = cur[name], base[name]
+        parts = []
+        worst = False
+        for key in _LATENCY_KEYS:
+            cv, bv = c.get(key), b.get(key)
+            if cv is None or not bv:
+                continue
+            pct = (cv - bv) / bv * 100.0
+            parts.append(f"{key} {bv:.2f}->{cv:.2f} ({pct:+.0f}%)")
+            if pct > max_regression_pct and (cv - bv) > floor_ms:
+                worst = True
+        cv, bv = c.get("throughput_per_s"), b.get("throughput_per_s")
+        if cv is not None and bv:
+            pct = (cv - bv) / bv * 100.0
+            parts.append(f"thr {bv:.1f}->{cv:.1f}/s ({pct:+.0f}%)")
+            if -pct > max_regression_pct:
+                worst = True
+        if c.get("error_rate", 0) > b.get("error_rate", 0) + 0.01:
+            parts.append(f"errors {b.get('error_rate')}->{c.get('error_rate')}")
+            worst = True
+        regressions += int(worst)
+        lines.append(f"{'REGRESSION ' if worst else ''}{name}: " + ", ".join(parts))
+    for name in sorted(set(base) - set(cur)):
+        lines.append(f"missing in current run: {name}")
+    return lines, regressions
+
+
+def _print_table(results: Dict[str, Any]) -> None:
+    print(f"{'benchmark':48} {'n':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'thr/s':>9} {'err':>6}", file=sys.stderr)
+    for name, r in results.items():
+
+        def f(v: Any) -> str:
+            return "-" if v is None else f"{v:.2f}"
+
+        print(
+            f"{name[:48]:48} {r.get('n', 0):>6} {f(r.get('p50_ms')):>9} {f(r.get('p95_ms')):>9} "
+            f"{f(r.get('p99_ms')):>9} {f(r.get('throughput_per_s')):>9} {r.get('errors', 0):>6}",
+            file=sys.stderr,
+        )
+
+
+async def _run_suites(env: BenchEnv, args: argparse.Namespace, suites: list[str]) -> Dict[str, Any]:
+    runners: Dict[str, Callable[[], Any]] = {
+        "api": lambda: bench_api(env, args.iterations),
+        "hotkeys": lambda: bench_hotkeys(env, args.presses, args.press_rate),
+        "reconnect": lambda: bench_reconnect(env, args.rounds),
+        "screenshot": lambda: bench_screenshot(env, args.screenshots, [int(c) for c in args.concurrency.split(",") if c]),
+    }
+    results: Dict[str, Any] = {}
+    for suite in suites:
+        t0 = time.perf_counter()
+        results.update(await runners[suite]())
+        print(f"[bench] {suite} done in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(description="Benchmarks against a fake OBS WebSocket server")
+    p.add_argument("--suite", default=",".join(SUITES), help=f"comma-separated: {','.join(SUITES)}")
+    p.add_argument("--iterations", type=int, default=200, help="requests per API endpoint")
+    p.add_argument("--presses", type=int, default=200, help="simulated presses for the scene burst")
+    p.add_argument("--press-rate", type=float, default=50.0, help="presses per second")
+    p.add_argument("--rounds", type=int, default=20, help="reconnect rounds")
+    p.add_argument("--screenshots", type=int, default=60)
+    p.add_argument("--concurrency", default="1,4")
+    p.add_argument("--obs-latency-ms", type=float, default=1.0)
+    p.add_argument("--obs-jitter-ms", type=float, default=0.0)
+    p.add_argument("--obs-fail-rate", type=float, default=0.0)
+    p.add_argument("--screenshot-latency-ms", type=float, default=15.0, help="extra fake latency for screenshot requests")
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--out", type=Path, default=None, help="write JSON results here (default: stdout)")
+    p.add_argument("--compare", type=Path, default=None, help="baseline JSON from a previous run")
+    p.add_argument("--max-regression", type=float, default=20.0, help="percent; with --compare, exit 1 above this")
+    args = p.parse_args(argv)
+
+    suites = [s.strip() for s in args.suite.split(",") if s.strip()]
+    unknown = [s for s in suites if s not in SUITES]
+    if unknown:
+        p.error(f"unknown suite(s): {', '.join(unknown)}")
+
+    options = FakeOBSOptions(
+        latency_ms=args.obs_latency_ms,
+        jitter_ms=args.obs_jitter_ms,
+        fail_rate=args.obs_fail_rate,
+        request_latency_ms={
+            "SaveSourceScreenshot": args.screenshot_latency_ms,
+            "GetSourceScreenshot": args.screenshot_latency_ms,
+        },
+        seed=args.seed,
+    )
+    with BenchEnv(obs_options=options) as env:
+        env.app()
+        results = asyncio.run(_run_suites(env, args, suites))
+        fake_stats = env.fake.snapshot()
+
+    doc = {
+        "meta": run_meta(
+            {
+                "suites": suites,
+                "obs_latency_ms": args.obs_latency_ms,
+                "obs_jitter_ms": args.obs_jitter_ms,
+                "obs_fail_rate": args.obs_fail_rate,
+                "screenshot_latency_ms": args.screenshot_latency_ms,
+            }
+        ),
+        "results": results,
+        "fake_obs": fake_stats,
+    }
+    _print_table(results)
+    text = json.dumps(doc, indent=2, ensure_ascii=False)
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        lines, regressions = compare(doc, baseline, args.max_regression)
+        print("\n".join(lines), file=sys.stderr)
+        if regressions:
+            print(f"[bench] {regressions} regression(s) above {args.max_regression:.0f}%", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
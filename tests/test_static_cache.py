@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import pytest
+
+from app.presentation.static_cache import StaticAssets
+
+
+@pytest.fixture()
+def assets(tmp_path):
+    root = tmp_path / "assets"
+    (root / "icons").mkdir(parents=True)
+    (root / "icons" / "eye.svg").write_text("<svg/>")
+    (tmp_path / "secret.ini").write_text("[secret]")
+    # On POSIX these names are ordinary files inside the directory; they must
+    # still be refused so the same request can't escape on Windows
+    (root / "C:" / "Windows").mkdir(parents=True)
+    (root / "C:" / "Windows" / "win.ini").write_text("[secret]")
+    (root / "..\\secret.ini").write_text("[secret]")
+    return StaticAssets(root, "/assets")
+
+
+def test_serves_files_inside_the_directory(assets):
+    assert assets.get("icons/eye.svg") is not None
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        "C:/Windows/win.ini",
+        "C:\\Windows\\win.ini",
+        "C:secret.ini",
+        "\\\\server\\share\\secret.ini",
+        "/etc/passwd",
+        "..\\secret.ini",
+        "../secret.ini",
+        "icons/..\\..\\secret.ini",
+        "icons/../../secret.ini",
+    ],
+)
+def test_rejects_names_that_leave_the_directory(assets, name):
+    assert assets._resolve(name) is None
+    assert assets.get(name) is None
+
+
+def test_rejects_symlinks_out_of_the_directory(assets, tmp_path):
+    link = assets.directory / "escape.ini"
+    try:
+        link.symlink_to(tmp_path / "secret.ini")
+    except (OSError, NotImplementedError):
+        pytest.skip("symlinks unavailable")
+    assert assets.get("escape.ini") is None